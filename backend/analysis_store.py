@@ -0,0 +1,350 @@
+# Shared storage backends for Claude analysis results
+
+import os
+import sqlite3
+import threading
+import time
+
+from cache import MemoryCache
+from serializers import Serializer, create_serializer
+from tracing import get_logger
+
+logger = get_logger('analysis_store')
+
+
+class AnalysisStore:
+    """Base class for analysis cache backends.
+
+    Values are the analysis dicts returned by OpenAIService.simplify_article,
+    stored in the encoding of the given Serializer (JSON by default). Every
+    backend supports a TTL and a cap on the total stored size, and keeps
+    per-process hit/miss counters for /api/cache/status.
+    """
+
+    backend = 'base'
+
+    def __init__(self, ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024, serializer=None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.serializer = serializer or Serializer()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, value):
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def keys(self, limit=None):
+        raise NotImplementedError
+
+    def size_bytes(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'serializer': self.serializer.name,
+            'entries': len(self),
+            'bytes': self.size_bytes(),
+            'max_bytes': self.max_bytes,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+
+
+class MemoryAnalysisStore(AnalysisStore):
+    """Per-process store, only useful for development and single-worker setups"""
+
+    backend = 'memory'
+
+    def __init__(self, ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024, max_entries=10000, serializer=None):
+        super().__init__(ttl, max_bytes, serializer)
+        self.cache = MemoryCache(max_entries=max_entries, max_bytes=max_bytes, sweep_interval=0)
+
+    def get(self, key):
+        data = self.cache.get(key)
+        return self._count(self.serializer.loads(data) if data is not None else None)
+
+    def set(self, key, value):
+        self.cache.setex(key, self.ttl, self.serializer.dumps(value))
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.flushdb()
+
+    def keys(self, limit=None):
+        with self.cache.lock:
+            keys = list(self.cache.cache.keys())
+        return keys[:limit] if limit else keys
+
+    def size_bytes(self):
+        return self.cache.total_bytes
+
+    def __len__(self):
+        return len(self.cache)
+
+
+class SQLiteAnalysisStore(AnalysisStore):
+    """Store backed by a local SQLite file, shared by every worker on the host.
+
+    Survives restarts and deploys. When the stored size exceeds max_bytes the
+    oldest entries are evicted first. Triggers keep the total size in a
+    one-row table, so writes don't have to sum the whole store.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path='analysis_cache.db', ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024, serializer=None):
+        super().__init__(ttl, max_bytes, serializer)
+        self.path = path
+        self.local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS analysis ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+                'created REAL NOT NULL, expires REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS analysis_created ON analysis (created)')
+            conn.execute('CREATE INDEX IF NOT EXISTS analysis_expires ON analysis (expires)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS analysis_size ('
+                'id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)'
+            )
+            # Seeds the total from rows written before the triggers existed
+            conn.execute('INSERT OR IGNORE INTO analysis_size VALUES (0, (SELECT COALESCE(SUM(size), 0) FROM analysis))')
+            conn.execute(
+                'CREATE TRIGGER IF NOT EXISTS analysis_size_insert AFTER INSERT ON analysis '
+                'BEGIN UPDATE analysis_size SET total = total + NEW.size; END'
+            )
+            conn.execute(
+                'CREATE TRIGGER IF NOT EXISTS analysis_size_update AFTER UPDATE OF size ON analysis '
+                'BEGIN UPDATE analysis_size SET total = total + NEW.size - OLD.size; END'
+            )
+            conn.execute(
+                'CREATE TRIGGER IF NOT EXISTS analysis_size_delete AFTER DELETE ON analysis '
+                'BEGIN UPDATE analysis_size SET total = total - OLD.size; END'
+            )
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            # WAL lets readers in other workers proceed while one worker writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value FROM analysis WHERE key = ? AND expires > ?', (key, time.time())
+        ).fetchone()
+        return self._count(self.serializer.loads(row[0]) if row else None)
+
+    def set(self, key, value):
+        data = self.serializer.dumps(value)
+        size = len(key) + len(data)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete doesn't fire triggers
+            conn.execute(
+                'INSERT INTO analysis (key, value, size, created, expires) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, '
+                'created = excluded.created, expires = excluded.expires',
+                (key, data, size, now, now + self.ttl)
+            )
+            conn.execute('DELETE FROM analysis WHERE expires <= ?', (now,))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """Delete the oldest entries until the store fits in max_bytes"""
+        total = conn.execute('SELECT total FROM analysis_size').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, size in conn.execute('SELECT key, size FROM analysis ORDER BY created'):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany('DELETE FROM analysis WHERE key = ?', doomed)
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM analysis WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM analysis')
+
+    def keys(self, limit=None):
+        query = 'SELECT key FROM analysis WHERE expires > ? ORDER BY created DESC'
+        params = (time.time(),)
+        if limit:
+            query += ' LIMIT ?'
+            params += (limit,)
+        return [row[0] for row in self._connect().execute(query, params)]
+
+    def size_bytes(self):
+        return self._connect().execute('SELECT total FROM analysis_size').fetchone()[0]
+
+    def __len__(self):
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM analysis WHERE expires > ?', (time.time(),)
+        ).fetchone()[0]
+
+
+# KEYS: value, index, sizes, total; ARGV: key, data, ttl, now, size. Returns the new total.
+SET_SCRIPT = """
+local old = tonumber(redis.call('hget', KEYS[3], ARGV[1]) or 0)
+redis.call('setex', KEYS[1], ARGV[3], ARGV[2])
+redis.call('zadd', KEYS[2], ARGV[4], ARGV[1])
+redis.call('hset', KEYS[3], ARGV[1], ARGV[5])
+return redis.call('incrby', KEYS[4], tonumber(ARGV[5]) - old)
+"""
+
+# KEYS: value, index, sizes, total; ARGV: key. Returns the new total.
+DELETE_SCRIPT = """
+local size = tonumber(redis.call('hget', KEYS[3], ARGV[1]) or 0)
+redis.call('del', KEYS[1])
+redis.call('zrem', KEYS[2], ARGV[1])
+redis.call('hdel', KEYS[3], ARGV[1])
+return redis.call('decrby', KEYS[4], size)
+"""
+
+# Expired index entries removed per write
+EXPIRED_SWEEP = 10
+
+
+def _text(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class RedisAnalysisStore(AnalysisStore):
+    """Store backed by Redis, shared by every worker and host using that Redis.
+
+    Entries expire through Redis TTLs. A sorted set indexes keys by insertion
+    time, a hash tracks their sizes and a counter holds the total, so the
+    oldest entries can be evicted once the stored size exceeds max_bytes.
+    Writes and deletes update all four in one Lua script. Index entries for
+    values Redis has expired are dropped as writes sweep past them.
+    """
+
+    backend = 'redis'
+
+    def __init__(self, client, prefix='analysis:', ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024, serializer=None):
+        super().__init__(ttl, max_bytes, serializer)
+        self.client = client
+        self.prefix = prefix
+        self.index_key = f"{prefix}__index"
+        self.sizes_key = f"{prefix}__sizes"
+        self.total_key = f"{prefix}__total"
+        self._set_script = client.register_script(SET_SCRIPT)
+        self._delete_script = client.register_script(DELETE_SCRIPT)
+        # Stores written before the total was tracked start from their sizes hash
+        if not client.exists(self.total_key):
+            client.setnx(self.total_key, sum(int(size) for size in client.hvals(self.sizes_key)))
+
+    def _keys(self, key):
+        return [self.prefix + key, self.index_key, self.sizes_key, self.total_key]
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        return self._count(self.serializer.loads(data) if data is not None else None)
+
+    def set(self, key, value):
+        data = self.serializer.dumps(value)
+        size = len(key) + len(data)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        total = int(self._set_script(keys=self._keys(key), args=[key, data, self.ttl, now, size]))
+        self._evict(total, now)
+
+    def _evict(self, total, now):
+        """Drop a few expired index entries, then the oldest entries until the store fits in max_bytes"""
+        for key in self.client.zrangebyscore(self.index_key, '-inf', now - self.ttl, start=0, num=EXPIRED_SWEEP):
+            total = self.delete(_text(key))
+        while total > self.max_bytes:
+            oldest = self.client.zrange(self.index_key, 0, 9)
+            if not oldest:
+                break
+            for key in oldest:
+                total = self.delete(_text(key))
+                if total <= self.max_bytes:
+                    break
+
+    def delete(self, key):
+        """Delete an entry and return the remaining total size"""
+        return int(self._delete_script(keys=self._keys(key), args=[key]))
+
+    def clear(self):
+        keys = self.keys()
+        pipe = self.client.pipeline()
+        for key in keys:
+            pipe.delete(self.prefix + key)
+        pipe.delete(self.index_key, self.sizes_key, self.total_key)
+        pipe.execute()
+
+    def keys(self, limit=None):
+        end = limit - 1 if limit else -1
+        return [_text(key) for key in self.client.zrevrange(self.index_key, 0, end)]
+
+    def size_bytes(self):
+        return int(self.client.get(self.total_key) or 0)
+
+    def __len__(self):
+        return self.client.zcard(self.index_key)
+
+
+def create_analysis_store(redis_client=None):
+    """Build the analysis store selected by ANALYSIS_CACHE_BACKEND.
+
+    'auto' (the default) uses Redis when a Redis client is available and a
+    local SQLite file otherwise. Values are encoded with the serializer
+    selected by CACHE_SERIALIZER and CACHE_COMPRESSION.
+    """
+    serializer = create_serializer()
+    backend = os.environ.get('ANALYSIS_CACHE_BACKEND', 'auto').lower()
+    ttl = int(os.environ.get('ANALYSIS_CACHE_TTL', 7 * 24 * 3600))
+    max_bytes = int(os.environ.get('ANALYSIS_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+
+    if backend == 'memory':
+        return MemoryAnalysisStore(ttl=ttl, max_bytes=max_bytes, serializer=serializer)
+    if backend in ('redis', 'auto') and redis_client is not None and not isinstance(redis_client, MemoryCache):
+        return RedisAnalysisStore(redis_client, ttl=ttl, max_bytes=max_bytes, serializer=serializer)
+    if backend == 'redis':
+        logger.warning("Redis not available for analysis cache, using SQLite")
+    path = os.environ.get('ANALYSIS_CACHE_PATH', 'analysis_cache.db')
+    return SQLiteAnalysisStore(path, ttl=ttl, max_bytes=max_bytes, serializer=serializer)
@@ -1,6 +1,6 @@
 # Flask backend main app
 
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, Response, stream_with_context, g
 from flask_cors import CORS
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
@@ -11,8 +11,21 @@ import requests
 from datetime import datetime, timedelta
 import redis
 import hashlib
-from news_api import NewsAPI
+import time
+from news_api import NewsAPI, NewsAPIError, NewsAPICircuitOpen
 from openai_service import OpenAIService
+from cache import MemoryCache
+from analysis_store import create_analysis_store
+from single_flight import SingleFlight
+from feed_refresher import FeedRefresher, parse_intervals
+from article_pool import ArticlePool
+from feed_cache import FeedCache
+from serializers import create_serializer
+from metrics import registry, HTTP_REQUEST_DURATION, CLAUDE_REQUEST_DURATION, record_cache
+from mock_firestore import MockFirestore
+from favorites import FavoritesStore, DEFAULT_PAGE_SIZE as FAVORITES_PAGE_SIZE
+from token_cache import TokenCache, refresh_certificates, verify_test_token
+from tracing import configure_logging, get_logger, start_trace, current_trace, end_trace, stage
 
 # Load environment variables from .env file
 try:
@@ -20,78 +33,256 @@ try:
     # Try to load from parent directory first, then current directory
     load_dotenv('../.env')  # Load from parent directory
     load_dotenv('.env')     # Load from current directory (fallback)
-    print("Environment variables loaded from .env files")
+    dotenv_loaded = True
 except ImportError:
-    print("python-dotenv not installed, using system environment variables")
-    pass
+    dotenv_loaded = False
 
-# Simple in-memory cache fallback
-class SimpleCache:
-    def __init__(self):
-        self.cache = {}
-    
-    def get(self, key):
-        if key in self.cache:
-            data, expiry = self.cache[key]
-            if expiry > datetime.now().timestamp():
-                return data
-            else:
-                del self.cache[key]
-        return None
-    
-    def setex(self, key, seconds, value):
-        expiry = datetime.now().timestamp() + seconds
-        self.cache[key] = (value, expiry)
+# Configure logging once LOG_* settings from .env are available
+configure_logging()
+logger = get_logger('app')
+if dotenv_loaded:
+    logger.info("Environment variables loaded from .env files")
+else:
+    logger.info("python-dotenv not installed, using system environment variables")
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key')
-CORS(app, origins=['http://localhost:3000', 'http://localhost:3001'], supports_credentials=True)
+ALLOWED_ORIGINS = ['http://localhost:3000', 'http://localhost:3001']
+CORS(app, origins=ALLOWED_ORIGINS, supports_credentials=True)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.time()
+    start_trace()
+
+@app.after_request
+def record_request_duration(response):
+    start = g.get('request_start')
+    if start is not None:
+        # Label by route pattern, not raw path, to keep the series count bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_DURATION.observe(
+            time.time() - start,
+            route=route,
+            method=request.method,
+            status=response.status_code
+        )
+    trace = current_trace()
+    if trace is not None:
+        # Stage timings show up in the browser's network panel
+        response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+@app.teardown_request
+def finish_trace(exc):
+    end_trace()
 
 # Initialize Firebase
 try:
     cred = credentials.Certificate('firebase-credentials.json')
     firebase_admin.initialize_app(cred)
     db = firestore.client()
-    print("Firebase initialized successfully")
+    firebase_enabled = True
+    logger.info("Firebase initialized successfully")
 except Exception as e:
-    print(f"Firebase initialization failed: {e}")
-    print("Running in development mode without Firebase")
-    # Create a mock db for development
-    class MockFirestore:
-        def collection(self, name):
-            return MockCollection()
-    
-    class MockCollection:
-        def document(self, doc_id):
-            return MockDocument()
-    
-    class MockDocument:
-        def get(self):
-            return MockDocumentSnapshot()
-        def set(self, data, merge=False):
-            return None
-        def update(self, data):
-            return None
-    
-    class MockDocumentSnapshot:
-        def exists(self):
-            return False
-        def to_dict(self):
-            return {}
-    
+    logger.warning("Firebase initialization failed: %s", e)
+    logger.warning("Running in development mode without Firebase")
+    # Use an in-memory mock db for development
     db = MockFirestore()
+    firebase_enabled = False
 
-# Initialize services
-news_api = NewsAPI()
-openai_service = OpenAIService()
+favorites_store = FavoritesStore(db)
+
+# Load tests run without Firebase; they can sign requests with unsigned 'test:<uid>' tokens
+if not firebase_enabled and os.environ.get('AUTH_TEST_TOKENS', 'false').lower() == 'true':
+    logger.warning("AUTH_TEST_TOKENS is set: accepting unverified test tokens")
+    verify_id_token = verify_test_token
+else:
+    verify_id_token = auth.verify_id_token
+
+# Verified ID tokens are reused until they expire instead of re-verifying on every request
+token_cache = TokenCache(
+    verify_id_token,
+    max_entries=int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 10000)),
+    check_revoked=os.environ.get('AUTH_CHECK_REVOKED', 'false').lower() == 'true',
+    revocation_interval=int(os.environ.get('AUTH_REVOCATION_INTERVAL', 300))
+)
 
 # Redis for caching (fallback to in-memory cache if Redis unavailable)
 try:
-    redis_client = redis.Redis(host='localhost', port=6379, db=0)
+    redis_client = redis.Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
     redis_client.ping()  # Test connection
 except:
-    print("Redis not available, using in-memory cache")
-    redis_client = SimpleCache()
+    logger.warning("Redis not available, using in-memory cache")
+    redis_client = MemoryCache(
+        max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', 1000)),
+        max_bytes=int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+        sweep_interval=int(os.environ.get('CACHE_SWEEP_INTERVAL', 60))
+    )
+
+# Coalesce concurrent cache misses (across workers too when Redis is available)
+single_flight = SingleFlight(
+    None if isinstance(redis_client, MemoryCache) else redis_client,
+    lock_timeout=int(os.environ.get('SINGLE_FLIGHT_TIMEOUT', 30))
+)
+
+# Initialize services
+news_api = NewsAPI()
+openai_service = OpenAIService(
+    analysis_cache=create_analysis_store(redis_client),
+    single_flight=single_flight
+)
+
+# Largest number of articles accepted by /api/simplify/batch
+SIMPLIFY_BATCH_MAX = int(os.environ.get('SIMPLIFY_BATCH_MAX', 50))
+
+# Articles ingested once from a broad stream and indexed by detected category
+article_pool = ArticlePool(
+    news_api,
+    pages=int(os.environ.get('NEWS_POOL_PAGES', 3)),
+    max_articles=int(os.environ.get('NEWS_POOL_MAX_ARTICLES', 5000))
+)
+
+registry.gauge('simply_article_pool_articles', 'Articles held in the ingested pool', lambda: article_pool.count('general'))
+registry.gauge('simply_newsapi_circuit_open', '1 while NewsAPI calls are short-circuited', lambda: int(news_api.circuit.state != 'closed'))
+if isinstance(redis_client, MemoryCache):
+    registry.gauge('simply_news_cache_entries', 'Entries in the in-memory news cache', lambda: len(redis_client))
+
+# News cache timing: entries are fresh for NEWS_CACHE_TTL and may be served
+# stale (while a background refresh runs) for NEWS_STALE_TTL after that
+NEWS_CACHE_TTL = int(os.environ.get('NEWS_CACHE_TTL', 1800))
+NEWS_STALE_TTL = int(os.environ.get('NEWS_STALE_TTL', 6 * 3600))
+# After a failed NewsAPI fetch, requests for that feed skip NewsAPI for this long
+NEWS_FAILURE_TTL = int(os.environ.get('NEWS_FAILURE_TTL', 30))
+
+# The feed the frontend requests by default for each category
+DEFAULT_FEED_PAGE_SIZE = int(os.environ.get('NEWS_REFRESH_PAGE_SIZE', 25))
+DEFAULT_FEED_PAGES = int(os.environ.get('NEWS_REFRESH_PAGES', 1))
+
+def news_cache_key(category, page, page_size, search_query, sort_by):
+    return f"news:{category}:{page}:{page_size}:{search_query}:{sort_by}"
+
+# Feeds are cached compactly in Redis with each article stored once; every worker
+# keeps the rendered (and precompressed) responses for recent ETags. The in-memory
+# fallback counts entries, so there each feed is stored whole
+feed_cache = FeedCache(
+    redis_client,
+    serializer=create_serializer(),
+    share_articles=not isinstance(redis_client, MemoryCache),
+    rendered_entries=int(os.environ.get('FEED_RENDER_CACHE_ENTRIES', 256)),
+    rendered_bytes=int(os.environ.get('FEED_RENDER_CACHE_BYTES', 32 * 1024 * 1024))
+)
+
+def load_cached_news(cache_key):
+    return feed_cache.load(cache_key)
+
+def pooled_news(category, page, page_size, search_query, sort_by):
+    """Return (articles, total_pages) from the shared pool, or None if the feed needs a NewsAPI query.
+
+    Only pages the pool can fill are served from it; a sparse category gets the
+    per-category query, which tops up from a broader one.
+    """
+    if search_query or sort_by != 'publishedAt' or article_pool.count(category) < page * page_size:
+        return None
+    with stage('select'):
+        raw_articles = article_pool.get_page(category, page, page_size)
+    return raw_articles, max(1, -(-article_pool.count(category) // page_size))
+
+def store_news(cache_key, raw_articles, page, page_size, total_pages=None):
+    """Cache a fetched feed and return it, keeping the cached one if the fetch came back empty"""
+    # Never replace a cached feed with an empty one (failed fetches raise NewsAPIError instead)
+    if not raw_articles:
+        cached = load_cached_news(cache_key)
+        if cached is not None and cached.get('articles'):
+            return cached
+    
+    # Return raw articles without OpenAI processing
+    result = {
+        'articles': raw_articles,
+        'page': page,
+        'total_pages': total_pages or len(raw_articles) // page_size + 1
+    }
+    
+    # Keep the entry past its freshness window so it can be served stale
+    with stage('serialize'):
+        feed_cache.store(cache_key, result, NEWS_CACHE_TTL + NEWS_STALE_TTL)
+    redis_client.setex(f"{cache_key}:fresh", NEWS_CACHE_TTL, '1')
+    return result
+
+def news_failed_recently(cache_key):
+    return bool(redis_client.get(f"{cache_key}:failed"))
+
+def record_news_failure(cache_key, error):
+    # The open circuit already fails fast, and marking the feed would outlast its recovery
+    if isinstance(error, NewsAPICircuitOpen):
+        return
+    logger.warning("NewsAPI fetch for %s failed: %s", cache_key, error)
+    redis_client.setex(f"{cache_key}:failed", NEWS_FAILURE_TTL, '1')
+
+def last_good_news(cache_key):
+    """Return the cached feed, even if stale, when NewsAPI can't refresh it; raises NewsAPIError if there is none"""
+    cached = load_cached_news(cache_key)
+    if cached is not None and cached.get('articles'):
+        return cached
+    raise NewsAPIError('News is temporarily unavailable')
+
+def news_unavailable_response(error):
+    response = jsonify({'error': str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(NEWS_FAILURE_TTL)
+    return response
+
+def refresh_news(category, page, page_size, search_query, sort_by, force=False):
+    """Fetch a feed from NewsAPI and cache it, coalescing concurrent refreshes"""
+    cache_key = news_cache_key(category, page, page_size, search_query, sort_by)
+    
+    def fetch_news():
+        # Another request may have refreshed the entry while we waited to lead
+        if not force and redis_client.get(f"{cache_key}:fresh"):
+            cached = load_cached_news(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Serve category feeds from the shared pool instead of a per-category query
+        pooled = pooled_news(category, page, page_size, search_query, sort_by)
+        if pooled is not None:
+            raw_articles, total_pages = pooled
+        else:
+            # A feed that just failed is served from what we have without retrying NewsAPI
+            if news_failed_recently(cache_key):
+                return last_good_news(cache_key)
+            try:
+                # Fetch raw news (no OpenAI processing)
+                raw_articles = news_api.get_articles(
+                    category=category, 
+                    page=page, 
+                    page_size=page_size,
+                    search_query=search_query,
+                    sort_by=sort_by
+                )
+            except NewsAPIError as e:
+                record_news_failure(cache_key, e)
+                return last_good_news(cache_key)
+            total_pages = None
+        
+        return store_news(cache_key, raw_articles, page, page_size, total_pages)
+    
+    # Concurrent misses for the same key share a single upstream fetch
+    return single_flight.do(cache_key, fetch_news, lookup=lambda: load_cached_news(cache_key))
+
+def news_response(body, etag, encoding='identity'):
+    """Build a response from cached feed bytes, or a 304 when body is None"""
+    if body is None:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag, weak=True)
+    # Clients may keep the feed but must revalidate it with If-None-Match
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 @app.route('/api/news', methods=['GET'])
 def get_news():
@@ -105,36 +296,75 @@ def get_news():
         sort_by = request.args.get('sortBy', 'publishedAt')
         
         # Check cache first
-        cache_key = f"news:{category}:{page}:{page_size}:{search_query}:{sort_by}"
-        cached_result = redis_client.get(cache_key)
-        
-        if cached_result:
-            return jsonify(json.loads(cached_result))
+        cache_key = news_cache_key(category, page, page_size, search_query, sort_by)
+        with stage('cache'):
+            etag, fresh = feed_cache.lookup(cache_key)
+        record_cache('news', etag is not None)
         
-        # Fetch raw news (no OpenAI processing)
-        raw_articles = news_api.get_articles(
-            category=category, 
-            page=page, 
-            page_size=page_size,
-            search_query=search_query,
-            sort_by=sort_by
-        )
-        
-        # Return raw articles without OpenAI processing
-        result = {
-            'articles': raw_articles,
-            'page': page,
-            'total_pages': len(raw_articles) // page_size + 1
-        }
+        if etag is not None:
+            if not fresh:
+                # Serve the stale copy now and refresh it in the background
+                feed_refresher.refresh_async(
+                    cache_key,
+                    lambda: refresh_news(category, page, page_size, search_query, sort_by)
+                )
+            if request.if_none_match.contains_weak(etag):
+                return news_response(None, etag)
         
-        # Cache the result for 30 minutes
-        redis_client.setex(cache_key, 1800, json.dumps(result))
+        encoding = feed_cache.choose_encoding(request.accept_encodings)
+        entry = None
+        if etag is not None:
+            with stage('cache'):
+                entry = feed_cache.get(cache_key, encoding, etag)
+        if entry is None:
+            # A miss, or the entry expired since the lookup: answer from the feed just fetched
+            result = refresh_news(category, page, page_size, search_query, sort_by)
+            with stage('serialize'):
+                entry = feed_cache.response(result, encoding)
         
-        return jsonify(result)
+        return news_response(entry[1], entry[0], encoding)
     
+    except NewsAPIError as e:
+        return news_unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Keep the default feed of every category warm so users never wait on NewsAPI
+feed_refresher = FeedRefresher(None if isinstance(redis_client, MemoryCache) else redis_client)
+# Every worker keeps its own pool, so ingestion runs per process ahead of the feed refreshes
+feed_refresher.schedule(
+    'pool:ingest',
+    int(os.environ.get('NEWS_POOL_INTERVAL', 600)),
+    article_pool.ingest,
+    shared=False
+)
+refresh_intervals = parse_intervals(os.environ.get('NEWS_REFRESH_INTERVALS', ''))
+for refresh_category in news_api.get_categories():
+    for refresh_page in range(1, DEFAULT_FEED_PAGES + 1):
+        feed_refresher.schedule(
+            news_cache_key(refresh_category, refresh_page, DEFAULT_FEED_PAGE_SIZE, '', 'publishedAt'),
+            refresh_intervals.get(refresh_category, int(os.environ.get('NEWS_REFRESH_INTERVAL', 900))),
+            lambda c=refresh_category, p=refresh_page: refresh_news(c, p, DEFAULT_FEED_PAGE_SIZE, '', 'publishedAt', force=True)
+        )
+if firebase_enabled:
+    # Keep Google's token-signing certificates fresh so token verification never waits on them
+    feed_refresher.schedule(
+        'auth:certs',
+        int(os.environ.get('AUTH_CERT_REFRESH_INTERVAL', 3600)),
+        refresh_certificates,
+        shared=False
+    )
+
+def start_background_refresh():
+    """Start the feed refresher in this process.
+
+    Called by the server entry points (below, gunicorn.conf.py and the ASGI
+    lifespan) rather than at import, so tools and tests that import the app
+    don't start hitting NewsAPI.
+    """
+    if os.environ.get('NEWS_REFRESH_ENABLED', 'true').lower() == 'true':
+        feed_refresher.start()
+
 @app.route('/api/user/preferences', methods=['GET'])
 def get_user_preferences():
     """Get user preferences"""
@@ -175,18 +405,29 @@ def update_user_preferences():
 
 @app.route('/api/user/favorites', methods=['GET'])
 def get_favorites():
-    """Get user's favorite articles"""
+    """Get a page of the user's favorite articles, newest first"""
     try:
         user_id = get_user_id_from_token()
         if not user_id:
             return jsonify({'error': 'Unauthorized'}), 401
         
-        user_doc = db.collection('users').document(user_id).get()
-        if user_doc.exists:
-            user_data = user_doc.to_dict()
-            return jsonify({'favorites': user_data.get('favorites', [])})
-        else:
-            return jsonify({'favorites': []})
+        limit = int(request.args.get('limit', FAVORITES_PAGE_SIZE))
+        cursor = request.args.get('cursor')
+        favorites, next_cursor = favorites_store.list(user_id, limit=limit, cursor=cursor)
+        return jsonify({'favorites': favorites, 'next_cursor': next_cursor})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/user/favorites/<path:article_id>', methods=['GET'])
+def check_favorite(article_id):
+    """Check whether an article (by URL) is in the user's favorites"""
+    try:
+        user_id = get_user_id_from_token()
+        if not user_id:
+            return jsonify({'error': 'Unauthorized'}), 401
+        
+        return jsonify({'favorited': favorites_store.contains(user_id, article_id)})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -201,26 +442,17 @@ def add_favorite():
         
         article_data = request.json
         
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
-        
-        if user_doc.exists:
-            user_data = user_doc.to_dict()
-            favorites = user_data.get('favorites', [])
-            
-            # Check if article already exists
-            article_exists = any(fav.get('url') == article_data.get('url') for fav in favorites)
-            
-            if not article_exists:
-                favorites.append(article_data)
-                user_ref.update({'favorites': favorites})
+        # Adding an article that is already a favorite is a no-op
+        favorites_store.add(user_id, article_data)
         
         return jsonify({'message': 'Article added to favorites'})
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/user/favorites/<article_id>', methods=['DELETE'])
+@app.route('/api/user/favorites/<path:article_id>', methods=['DELETE'])
 def remove_favorite(article_id):
     """Remove article from favorites"""
     try:
@@ -228,16 +460,8 @@ def remove_favorite(article_id):
         if not user_id:
             return jsonify({'error': 'Unauthorized'}), 401
         
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
-        
-        if user_doc.exists:
-            user_data = user_doc.to_dict()
-            favorites = user_data.get('favorites', [])
-            
-            # Remove article by URL
-            favorites = [fav for fav in favorites if fav.get('url') != article_id]
-            user_ref.update({'favorites': favorites})
+        # Remove article by URL
+        favorites_store.remove(user_id, article_id)
         
         return jsonify({'message': 'Article removed from favorites'})
     
@@ -252,7 +476,7 @@ def get_user_id_from_token():
     
     token = auth_header.split('Bearer ')[1]
     try:
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = token_cache.verify_token(token)
         return decoded_token['uid']
     except:
         return None
@@ -281,11 +505,19 @@ def debug_news():
 def cache_status():
     """Get cache status and performance metrics"""
     try:
+        analysis_cache = openai_service.analysis_cache
         cache_info = {
-            'cache_size': len(openai_service.analysis_cache),
-            'cache_keys': list(openai_service.analysis_cache.keys())[:10],  # Show first 10 keys
+            'cache_size': len(analysis_cache),
+            'cache_keys': analysis_cache.keys(limit=10),  # Show first 10 keys
+            'analysis_cache': analysis_cache.stats(),
+            'analysis_content_cache': openai_service.content_cache_stats(),
+            'newsapi_circuit': news_api.circuit.stats(),
             'timestamp': datetime.now().isoformat()
         }
+        if isinstance(redis_client, MemoryCache):
+            cache_info['news_cache'] = redis_client.stats()
+        cache_info['feed_render_cache'] = feed_cache.rendered.stats()
+        cache_info['article_pool'] = article_pool.stats()
         return jsonify(cache_info)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -313,13 +545,19 @@ def get_current_model():
 
 @app.route('/api/model/performance', methods=['GET'])
 def get_model_performance():
-    """Get performance metrics for Claude Haiku"""
+    """Get performance metrics for Claude Haiku measured since startup"""
     try:
+        latency = CLAUDE_REQUEST_DURATION.summary()
+        failures = CLAUDE_REQUEST_DURATION.summary(outcome='error')['count']
+        usage = openai_service.usage_stats()
+        
         performance_data = {
             'claude-haiku': {
-                'avg_response_time': '1-2s', 
-                'cost_per_request': '$0.001-0.003', 
-                'reliability': '99%',
+                'avg_response_time': f"{latency['mean']:.2f}s" if latency['count'] else 'n/a',
+                'p95_response_time': f"{latency['p95']:.2f}s" if latency['count'] else 'n/a',
+                'cost_per_request': f"${usage['cost'] / usage['requests']:.4f}" if usage['requests'] else 'n/a',
+                'reliability': f"{100 * (1 - failures / latency['count']):.1f}%" if latency['count'] else 'n/a',
+                'requests': latency['count'],
                 'description': 'Fastest AI model available for analysis'
             }
         }
@@ -345,5 +583,90 @@ def simplify_article_on_demand():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/simplify/batch', methods=['POST'])
+def simplify_articles_batch():
+    """Analyze several articles, streaming results as NDJSON in completion order"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    articles = data.get('articles')
+    if not articles or not isinstance(articles, list):
+        return jsonify({'error': 'Missing articles list'}), 400
+    if len(articles) > SIMPLIFY_BATCH_MAX:
+        return jsonify({'error': f'At most {SIMPLIFY_BATCH_MAX} articles per batch'}), 400
+    if not all(isinstance(article, dict) for article in articles):
+        return jsonify({'error': 'Every article must be a JSON object'}), 400
+    
+    # One reading level for the whole batch, or one per article
+    reading_levels = data.get('reading_levels') or [data.get('reading_level', '5th_grade')] * len(articles)
+    if not isinstance(reading_levels, list) or len(reading_levels) != len(articles):
+        return jsonify({'error': 'reading_levels must be a list with one entry per article'}), 400
+    if not all(isinstance(reading_level, str) for reading_level in reading_levels):
+        return jsonify({'error': 'Reading levels must be strings'}), 400
+    
+    def line(index, analysis=None, error=None):
+        item = {
+            'index': index,
+            'url': articles[index].get('url', ''),
+            'reading_level': reading_levels[index]
+        }
+        if error is None:
+            item['analysis'] = analysis
+        else:
+            item['error'] = error
+        return json.dumps(item) + '\n'
+    
+    def generate():
+        remaining = set(range(len(articles)))
+        try:
+            for index, analysis, error in openai_service.iter_simplify_articles(articles, reading_levels):
+                try:
+                    payload = line(index, analysis, error)
+                except Exception as e:
+                    payload = line(index, error=str(e))
+                remaining.discard(index)
+                yield payload
+        except Exception as e:
+            # Finish the stream with an error line for every article not yet answered
+            logger.error("Error in batch analysis: %s", e)
+            for index in sorted(remaining):
+                yield line(index, error=str(e))
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/simplify/stream', methods=['POST'])
+def simplify_article_stream():
+    """Simplify a single article, streaming fields as Server-Sent Events"""
+    data = request.get_json(silent=True) or {}
+    article = data.get('article')
+    if not article:
+        return jsonify({'error': 'Missing article data'}), 400
+    
+    def generate():
+        try:
+            for event, payload in openai_service.stream_simplify_article(article, '5th_grade'):
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            logger.error("Error streaming analysis: %s", e)
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics for this worker"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
+    # The reloader runs this in a watcher process too; only the serving process refreshes
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_refresh()
     app.run(debug=True, host='0.0.0.0', port=5003)
@@ -0,0 +1,99 @@
+# Shared pool of ingested articles indexed by detected category
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from tracing import get_logger
+
+logger = get_logger('article_pool')
+
+
+def _parse_published_at(value):
+    """Parse NewsAPI's ISO 8601 publishedAt, treating missing values as very old and naive ones as UTC"""
+    try:
+        parsed = datetime.fromisoformat((value or '').replace('Z', '+00:00'))
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class ArticlePool:
+    """Articles pulled from one broad NewsAPI stream, deduped by URL.
+
+    ingest() fetches a few pages of NewsAPI.fetch_stream, merges them into
+    the pool and rebuilds a per-category index ordered by publishedAt (newest
+    first). Every category and page is then served from that index instead
+    of one upstream query per category. The index holds one article per
+    story: syndicated copies are listed on the newest copy's also_covered_by.
+    The 'general' index holds every story in the pool.
+    """
+
+    def __init__(self, news_api, pages=3, max_articles=5000, max_age_hours=48):
+        self.news_api = news_api
+        self.pages = pages
+        self.max_articles = max_articles
+        self.max_age = timedelta(hours=max_age_hours)
+        self.articles = {}  # url -> article
+        self.index = {}  # category -> [article, ...] newest first
+        self.last_ingest = None
+        self.lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return bool(self.index)
+
+    def ingest(self):
+        """Pull the broad stream and rebuild the category index, returning new article count"""
+        fetched = []
+        for page in range(1, self.pages + 1):
+            articles = self.news_api.fetch_stream(page=page)
+            fetched.extend(articles)
+            if len(articles) < 100:
+                # A short page means the stream is exhausted
+                break
+
+        with self.lock:
+            articles = dict(self.articles)
+            new_count = 0
+            for article in fetched:
+                if article['url'] not in articles:
+                    new_count += 1
+                articles[article['url']] = article
+
+            # Drop articles that are too old, then cap the pool at the newest max_articles
+            cutoff = datetime.now(timezone.utc) - self.max_age
+            ordered = sorted(
+                (article for article in articles.values() if _parse_published_at(article.get('publishedAt')) >= cutoff),
+                key=lambda article: _parse_published_at(article.get('publishedAt')),
+                reverse=True
+            )[:self.max_articles]
+
+            # Index copies so also_covered_by is rebuilt from scratch on every ingest
+            stories = self.news_api.collapse_duplicates([dict(article) for article in ordered])
+            index = {'general': stories}
+            for article in stories:
+                if article['category'] != 'general':
+                    index.setdefault(article['category'], []).append(article)
+
+            # Swap in the new pool in one step so readers never see a partial index
+            self.articles = {article['url']: article for article in ordered}
+            self.index = index
+            self.last_ingest = datetime.now().isoformat()
+
+        logger.info("Article pool ingested %d articles (%d new), holding %d", len(fetched), new_count, len(self.articles))
+        return new_count
+
+    def get_page(self, category, page=1, page_size=30):
+        """Return one page of a category's articles, newest first"""
+        start = (page - 1) * page_size
+        return self.index.get(category, [])[start:start + page_size]
+
+    def count(self, category):
+        return len(self.index.get(category, []))
+
+    def stats(self):
+        return {
+            'articles': len(self.articles),
+            'categories': {category: len(articles) for category, articles in self.index.items()},
+            'last_ingest': self.last_ingest
+        }
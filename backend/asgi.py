@@ -0,0 +1,225 @@
+# ASGI entry point: /api/news and /api/simplify run natively on the event loop,
+# every other route is served by the Flask app in a thread pool
+#
+# Usage (from backend/): uvicorn asgi:application --workers 4
+#
+# NewsAPI and Claude calls are awaited. The cache still uses the synchronous
+# Redis client, so cache reads and writes (and rendering compressed feeds)
+# run in threads with asyncio.to_thread to keep them off the event loop.
+
+import asyncio
+import json
+import os
+import time
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.http import parse_accept_header, parse_etags
+
+from app import (
+    app as flask_app, ALLOWED_ORIGINS, NEWS_FAILURE_TTL, feed_cache, feed_refresher, last_good_news,
+    load_cached_news, news_api, news_cache_key, news_failed_recently, openai_service, pooled_news,
+    record_news_failure, redis_client, refresh_news, single_flight, start_background_refresh, store_news
+)
+from news_api import NewsAPIError
+from metrics import HTTP_REQUEST_DURATION, record_cache
+from tracing import current_trace, end_trace, get_logger, stage, start_trace
+
+logger = get_logger('asgi')
+
+# Threads serving the Flask routes in each process
+wsgi_app = WSGIMiddleware(flask_app, workers=int(os.environ.get('ASGI_WSGI_THREADS', 16)))
+
+
+class Request:
+    """The parts of an ASGI HTTP request the async handlers need"""
+
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.receive = receive
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = {name: values[0] for name, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+        self.headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+
+    async def body(self):
+        chunks = []
+        while True:
+            message = await self.receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def json(self):
+        try:
+            return json.loads(await self.body() or b'null')
+        except ValueError:
+            return None
+
+
+def json_body(value):
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+async def send_response(request, send, status, body=b'', headers=None, content_type='application/json'):
+    headers = dict(headers or {})
+    if body or status != 304:
+        headers['Content-Type'] = content_type
+        headers['Content-Length'] = str(len(body))
+    origin = request.headers.get('origin')
+    if origin in ALLOWED_ORIGINS:
+        # Mirrors flask_cors for the routes that bypass Flask
+        headers['Access-Control-Allow-Origin'] = origin
+        headers['Access-Control-Allow-Credentials'] = 'true'
+        headers['Vary'] = f"{headers['Vary']}, Origin" if 'Vary' in headers else 'Origin'
+    trace = current_trace()
+    if trace is not None:
+        headers['Server-Timing'] = trace.server_timing()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def refresh_news_async(category, page, page_size, search_query, sort_by):
+    """refresh_news for the event loop, coalescing concurrent misses through the same single-flight key"""
+    cache_key = news_cache_key(category, page, page_size, search_query, sort_by)
+
+    async def fetch_news():
+        # Another worker may have refreshed the entry while we waited to lead
+        if await asyncio.to_thread(redis_client.get, f"{cache_key}:fresh"):
+            cached = await asyncio.to_thread(load_cached_news, cache_key)
+            if cached is not None:
+                return cached
+
+        pooled = await asyncio.to_thread(pooled_news, category, page, page_size, search_query, sort_by)
+        if pooled is not None:
+            raw_articles, total_pages = pooled
+            return await asyncio.to_thread(store_news, cache_key, raw_articles, page, page_size, total_pages)
+        if await asyncio.to_thread(news_failed_recently, cache_key):
+            return await asyncio.to_thread(last_good_news, cache_key)
+        try:
+            raw_articles = await news_api.get_articles_async(
+                category=category,
+                page=page,
+                page_size=page_size,
+                search_query=search_query,
+                sort_by=sort_by
+            )
+        except NewsAPIError as e:
+            await asyncio.to_thread(record_news_failure, cache_key, e)
+            return await asyncio.to_thread(last_good_news, cache_key)
+        return await asyncio.to_thread(store_news, cache_key, raw_articles, page, page_size)
+
+    return await single_flight.do_async(cache_key, fetch_news, lookup=lambda: load_cached_news(cache_key))
+
+
+async def get_news(request, send):
+    """Async GET /api/news, answering like the Flask route (ETag, 304, precompressed bodies)"""
+    category = request.args.get('category', 'general')
+    page = int(request.args.get('page', 1))
+    page_size = int(request.args.get('page_size', 30))
+    search_query = request.args.get('q', '')
+    sort_by = request.args.get('sortBy', 'publishedAt')
+
+    cache_key = news_cache_key(category, page, page_size, search_query, sort_by)
+    with stage('cache'):
+        etag, fresh = await asyncio.to_thread(feed_cache.lookup, cache_key)
+    record_cache('news', etag is not None)
+
+    if etag is not None:
+        if not fresh:
+            # Serve the stale copy now and refresh it in the background
+            feed_refresher.refresh_async(
+                cache_key,
+                lambda: refresh_news(category, page, page_size, search_query, sort_by)
+            )
+        if parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+            await send_response(request, send, 304, headers=feed_headers(etag))
+            return
+
+    encoding = feed_cache.choose_encoding(parse_accept_header(request.headers.get('accept-encoding')))
+    entry = None
+    if etag is not None:
+        with stage('cache'):
+            entry = await asyncio.to_thread(feed_cache.get, cache_key, encoding, etag)
+    if entry is None:
+        # A miss, or the entry expired since the lookup: answer from the feed just fetched
+        result = await refresh_news_async(category, page, page_size, search_query, sort_by)
+        with stage('serialize'):
+            entry = await asyncio.to_thread(feed_cache.response, result, encoding)
+
+    etag, body = entry
+    headers = feed_headers(etag)
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    await send_response(request, send, 200, body, headers)
+
+
+def feed_headers(etag):
+    # Same caching headers as news_response in app.py
+    return {'ETag': f'W/"{etag}"', 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+
+
+async def simplify_article(request, send):
+    """Async POST /api/simplify"""
+    data = await request.json() or {}
+    article = data.get('article') if isinstance(data, dict) else None
+    if not article:
+        await send_response(request, send, 400, json_body({'error': 'Missing article data'}))
+        return
+    simplified = await openai_service.simplify_article_async(article, '5th_grade')
+    await send_response(request, send, 200, json_body(simplified))
+
+
+ROUTES = {
+    ('GET', '/api/news'): get_news,
+    ('POST', '/api/simplify'): simplify_article,
+}
+
+
+async def lifespan(receive, send):
+    """Start the background feed refresh once the server process is up"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            start_background_refresh()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    handler = ROUTES.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+    if handler is None:
+        # Everything else, including CORS preflights, goes through Flask
+        await wsgi_app(scope, receive, send)
+        return
+
+    request = Request(scope, receive)
+    start = time.time()
+    start_trace()
+    status = 500
+    try:
+        async def tracked_send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+        try:
+            await handler(request, tracked_send)
+        except NewsAPIError as e:
+            await send_response(request, tracked_send, 503, json_body({'error': str(e)}),
+                                {'Retry-After': str(NEWS_FAILURE_TTL)})
+        except Exception as e:
+            logger.error("Error handling %s %s: %s", request.method, request.path, e)
+            await send_response(request, tracked_send, 500, json_body({'error': str(e)}))
+    finally:
+        HTTP_REQUEST_DURATION.observe(time.time() - start, route=request.path, method=request.method, status=status)
+        end_trace()
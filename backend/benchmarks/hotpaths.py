@@ -0,0 +1,339 @@
+# Offline microbenchmarks for the request hot paths, checked against a stored baseline
+#
+# Usage (from backend/):
+#   python benchmarks/hotpaths.py                    # compare with baseline.json, exit 1 on regression
+#   python benchmarks/hotpaths.py --update-baseline  # record the current timings as the baseline
+#   python benchmarks/hotpaths.py --only get_news_cache_hit,memory_cache_churn
+#
+# NewsAPI responses come from fixtures/ (the /v2/everything format, including
+# syndicated copies, tracking-parameter URLs and a removed article), so runs
+# need no network and every run does the same work. Each benchmark reports
+# the best of several rounds in microseconds per operation. Each round is
+# paired with a round of a fixed pure-Python loop, and changes are measured
+# relative to it so a machine that is slower or busier than when the baseline
+# was recorded doesn't count as a regression. Rounds run with the garbage
+# collector off and are lengthened to at least MIN_ROUND_SECONDS. A benchmark
+# fails when its relative time exceeds the baseline's by more than the
+# threshold (25% unless --threshold or the baseline file says otherwise) in
+# every one of 1 + CONFIRM_RUNS measurements. Record the baseline on the kind
+# of machine that runs the comparison.
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# The app module reads these at import time; keep it offline and quiet
+os.environ.setdefault('NEWS_REFRESH_ENABLED', 'false')
+os.environ.setdefault('ANALYSIS_CACHE_BACKEND', 'memory')
+os.environ.setdefault('LOG_LEVEL', 'CRITICAL')
+
+import requests  # noqa: E402
+
+from tracing import configure_logging  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, 'fixtures')
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+ROUNDS = 9
+CALIBRATION_NUMBER = 10
+# Rounds shorter than this are lengthened, since timer and scheduler noise dominates them
+MIN_ROUND_SECONDS = 0.1
+# A benchmark over the threshold is measured again up to this many times before it counts
+CONFIRM_RUNS = 2
+
+BENCHMARKS = {}  # name -> (setup, number)
+
+
+def benchmark(number):
+    """Register a setup function returning the operation to time, run `number` times per round"""
+    def register(setup):
+        BENCHMARKS[setup.__name__] = (setup, number)
+        return setup
+    return register
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+class FixtureSession:
+    """Stands in for requests.Session, answering NewsAPI queries from fixtures"""
+
+    def __init__(self, news_api):
+        self.primary = load_fixture('newsapi_everything.json').encode('utf-8')
+        self.broader = load_fixture('newsapi_everything_broader.json').encode('utf-8')
+        self.broader_queries = {news_api._get_broader_query(category) for category in news_api.get_categories()}
+
+    def get(self, url, params=None, timeout=None):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.broader if params.get('q') in self.broader_queries else self.primary
+        return response
+
+
+def offline_news_api():
+    from news_api import NewsAPI
+    news_api = NewsAPI()
+    news_api.session = FixtureSession(news_api)
+    news_api.min_request_interval = 0
+    return news_api
+
+
+def fixture_articles():
+    return json.loads(load_fixture('newsapi_everything.json'))['articles']
+
+
+@benchmark(number=15)
+def detect_category():
+    news_api = offline_news_api()
+    articles = fixture_articles()
+
+    def run():
+        for article in articles:
+            news_api._detect_category(article.get('title'), article.get('description'), article.get('content'))
+    return run
+
+
+@benchmark(number=10)
+def is_somewhat_relevant():
+    news_api = offline_news_api()
+    articles = [news_api._process_article(article, 'general') for article in fixture_articles()]
+    categories = ['business', 'technology', 'sports', 'health']
+
+    def run():
+        for category in categories:
+            for article in articles:
+                news_api._is_somewhat_relevant(article, category)
+    return run
+
+
+@benchmark(number=6)
+def get_articles_general():
+    news_api = offline_news_api()
+    return lambda: news_api.get_articles('general', page_size=30)
+
+
+@benchmark(number=6)
+def get_articles_category():
+    # Few technology matches, so this also runs the relevance pass and the broader query
+    news_api = offline_news_api()
+    return lambda: news_api.get_articles('technology', page_size=30)
+
+
+@benchmark(number=12)
+def collapse_duplicates():
+    news_api = offline_news_api()
+    articles = [news_api._process_article(article, 'general') for article in fixture_articles()]
+    return lambda: news_api.collapse_duplicates([dict(article) for article in articles])
+
+
+@benchmark(number=4)
+def memory_cache_churn():
+    from cache import MemoryCache
+    cache = MemoryCache(max_entries=1000, sweep_interval=0)
+    value = b'x' * 1024
+    # A fixed key sequence over 5x more keys than fit, so reads miss and writes evict
+    keys = [f"news:{(i * 7919) % 5000}" for i in range(10000)]
+
+    def run():
+        for key in keys:
+            if cache.get(key) is None:
+                cache.setex(key, 3600, value)
+    return run
+
+
+def analysis_service():
+    from analysis_store import MemoryAnalysisStore
+    from openai_service import OpenAIService
+    return OpenAIService(analysis_cache=MemoryAnalysisStore())
+
+
+ANALYSIS = {
+    'simplified_summary': 'The Federal Reserve kept interest rates the same and expects to lower them twice this year.',
+    'pros': ['Prices are rising more slowly', 'Borrowing may get cheaper', 'The job market is still strong'],
+    'cons': ['Loans stay expensive for now', 'Home buyers still face high rates', 'Cuts could come later than hoped'],
+    'full_content': 'The Federal Reserve left its benchmark interest rate unchanged on Wednesday. ' * 8,
+    'reading_level': '5th_grade'
+}
+
+
+@benchmark(number=2000)
+def parse_analysis():
+    service = analysis_service()
+    article = fixture_articles()[0]
+    response_text = json.dumps(ANALYSIS, indent=4)
+    return lambda: service._parse_analysis(response_text, article, '5th_grade')
+
+
+@benchmark(number=5000)
+def parse_analysis_repair():
+    # A response cut off inside full_content: parsing fails, repair is attempted and fails too
+    service = analysis_service()
+    article = fixture_articles()[0]
+    response_text = json.dumps(ANALYSIS, indent=4)[:-40]
+
+    def run():
+        try:
+            service._parse_analysis(response_text, article, '5th_grade')
+        except Exception:
+            pass
+    return run
+
+
+def cached_feed_client():
+    """Return (test client, query string, etag) for a feed stored in the app's news cache"""
+    import app
+    news_api = offline_news_api()
+    category, page, page_size = 'technology', 1, 30
+    result = {'articles': news_api.get_articles(category, page=page, page_size=page_size), 'page': page, 'total_pages': 1}
+    cache_key = app.news_cache_key(category, page, page_size, '', 'publishedAt')
+    etag = app.feed_cache.store(cache_key, result, 3600)
+    app.redis_client.setex(f"{cache_key}:fresh", 3600, '1')
+    return app.app.test_client(), f"/api/news?category={category}&page={page}&page_size={page_size}", etag
+
+
+@benchmark(number=250)
+def get_news_cache_hit():
+    client, path, etag = cached_feed_client()
+    return lambda: client.get(path, headers={'Accept-Encoding': 'gzip'})
+
+
+@benchmark(number=250)
+def get_news_not_modified():
+    client, path, etag = cached_feed_client()
+    return lambda: client.get(path, headers={'If-None-Match': f'W/"{etag}"'})
+
+
+def calibration():
+    """A fixed interpreter workload that benchmark timings are measured against"""
+    def run():
+        total = 0
+        for i in range(20000):
+            total += i * i % 7
+        return {str(i): i for i in range(2000)}, total
+    return run
+
+
+def time_round(run, number):
+    # Like timeit, keep collections out of the timing; they land in whichever round happens to trigger them
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        return (time.perf_counter() - start) / number
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def round_number(run, number):
+    """Raise number until a round takes at least MIN_ROUND_SECONDS"""
+    elapsed = time_round(run, number) * number
+    if elapsed < MIN_ROUND_SECONDS:
+        number = int(number * MIN_ROUND_SECONDS / max(elapsed, 1e-6)) + 1
+    return number
+
+
+def measure(setup, number, rounds=ROUNDS):
+    """Return (best microseconds per operation, best time relative to the calibration loop).
+
+    A calibration round runs before every benchmark round, so both see the
+    same machine conditions.
+    """
+    run = setup()
+    run()  # Warm caches and lazy initialization before timing
+    number = round_number(run, number)
+    calibrate = calibration()
+    calibration_number = round_number(calibrate, CALIBRATION_NUMBER)
+    best = best_calibration = None
+    for _ in range(rounds):
+        elapsed = time_round(calibrate, calibration_number)
+        best_calibration = elapsed if best_calibration is None else min(best_calibration, elapsed)
+        elapsed = time_round(run, number)
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6, best / best_calibration
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks for the backend hot paths')
+    parser.add_argument('--update-baseline', action='store_true', help='write the current timings to baseline.json')
+    parser.add_argument('--threshold', type=float, help='allowed slowdown as a fraction (default 0.25)')
+    parser.add_argument('--only', help='comma-separated benchmark names')
+    args = parser.parse_args()
+
+    configure_logging()
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    baseline = load_baseline()
+    threshold = args.threshold if args.threshold is not None else baseline.get('threshold', DEFAULT_THRESHOLD)
+    expected = baseline.get('results', {})
+
+    results = {}
+    relative = {}
+    regressions = []
+    print(f"{'benchmark':26} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name in names:
+        setup, number = BENCHMARKS[name]
+        current, relative[name] = results[name] = measure(setup, number)
+        previous = expected.get(name)
+        if previous is None:
+            print(f"{name:26} {'-':>12} {current:>12.1f} {'new':>8}")
+            continue
+        # Compared relative to the calibration loop, which cancels out overall machine speed
+        change = relative[name] / previous['relative'] - 1
+        for _ in range(CONFIRM_RUNS):
+            if change <= threshold:
+                break
+            # A burst of load from elsewhere can slow one measurement; a real regression persists
+            current, relative[name] = results[name] = min(results[name], measure(setup, number), key=lambda r: r[1])
+            change = relative[name] / previous['relative'] - 1
+        previous = previous['us']
+        status = ''
+        if change > threshold:
+            regressions.append(name)
+            status = '  REGRESSION'
+        print(f"{name:26} {previous:>12.1f} {current:>12.1f} {change:>+8.0%}{status}")
+
+    if args.update_baseline:
+        results = dict(expected, **{
+            name: {'us': round(us, 2), 'relative': round(rel, 4)} for name, (us, rel) in results.items()
+        })
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'threshold': threshold,
+                'results': dict(sorted(results.items()))
+            }, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
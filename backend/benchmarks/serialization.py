@@ -0,0 +1,118 @@
+# Compares cache encodings and the shared-article feed layout
+#
+# Usage (from backend/): python benchmarks/serialization.py
+#
+# Builds synthetic feeds shaped like /api/news results (every category plus
+# 'general', which repeats them, at two page sizes) and reports, per
+# serializer, the bytes the news cache would hold and the time to encode and
+# load one feed. The 'json (per-feed copies)' row is the old layout: each
+# feed key holding its own JSON copy of every article. Loads of the shared
+# layout include fetching the articles from the cache.
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from cache import MemoryCache  # noqa: E402
+from feed_cache import FeedCache  # noqa: E402
+from serializers import Serializer, msgpack, zstandard  # noqa: E402
+
+CATEGORIES = ['business', 'entertainment', 'health', 'science', 'sports', 'technology', 'politics']
+PAGES = 3
+PAGE_SIZES = (25, 30)  # The frontend's page size and the API default
+ROUNDS = 200
+
+WORDS = ('market economy team season study patients election policy launch device court results '
+         'growth players researchers officials company report announced record data').split()
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def make_article(rng, index, category):
+    return {
+        'id': f"https://news.example.com/{category}/{index}",
+        'title': sentence(rng, 10),
+        'description': sentence(rng, 30),
+        'content': ' '.join(sentence(rng, 15) for _ in range(4)) + ' [+2345 chars]',
+        'url': f"https://news.example.com/{category}/{index}",
+        'urlToImage': f"https://images.example.com/{category}/{index}.jpg",
+        'publishedAt': f"2024-05-{1 + index % 28:02d}T{index % 24:02d}:00:00Z",
+        'source': rng.choice(['Reuters', 'AP', 'BBC News', 'The Verge', 'ESPN']),
+        'author': rng.choice(['Jane Doe', 'John Smith', None]),
+        'category': category,
+        'videoUrl': None
+    }
+
+
+def make_feeds(seed=7):
+    rng = random.Random(seed)
+    by_category = {
+        category: [make_article(rng, i, category) for i in range(PAGES * max(PAGE_SIZES))]
+        for category in CATEGORIES
+    }
+    everything = [article for articles in zip(*by_category.values()) for article in articles]
+    feeds = {}
+    for category, articles in list(by_category.items()) + [('general', everything)]:
+        for page_size in PAGE_SIZES:
+            for page in range(PAGES):
+                feeds[f"news:{category}:{page + 1}:{page_size}::publishedAt"] = {
+                    'articles': articles[page * page_size:(page + 1) * page_size],
+                    'page': page + 1,
+                    'total_pages': PAGES
+                }
+    return feeds
+
+
+def timed(fn, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def measure(name, serializer, feeds, shared):
+    store = MemoryCache(max_entries=100000, max_bytes=1 << 30, sweep_interval=0)
+    sample = next(iter(feeds.values()))
+    if shared:
+        cache = FeedCache(store, serializer)
+        for key, feed in feeds.items():
+            cache.store(key, feed, 3600)
+        size = sum(size for key, (value, expiry, size) in store.cache.items() if not key.endswith(':etag'))
+        cache.store('sample', sample, 3600)
+        encode = timed(lambda: cache.encode(sample))
+        decode = timed(lambda: cache.load('sample'))
+    else:
+        for key, feed in feeds.items():
+            store.setex(key, 3600, serializer.dumps(feed))
+        size = store.total_bytes
+        data = serializer.dumps(sample)
+        encode = timed(lambda: serializer.dumps(sample))
+        decode = timed(lambda: serializer.loads(data))
+    return name, size, encode, decode
+
+
+def main():
+    feeds = make_feeds()
+    rows = [measure('json (per-feed copies)', Serializer('json'), feeds, shared=False)]
+    rows.append(measure('json (shared articles)', Serializer('json'), feeds, shared=True))
+    if zstandard is not None:
+        rows.append(measure('json+zstd (shared articles)', Serializer('json', 'zstd'), feeds, shared=True))
+    if msgpack is not None:
+        rows.append(measure('msgpack (shared articles)', Serializer('msgpack'), feeds, shared=True))
+        if zstandard is not None:
+            rows.append(measure('msgpack+zstd (shared articles)', Serializer('msgpack', 'zstd'), feeds, shared=True))
+
+    baseline = rows[0][1]
+    print(f"{len(feeds)} feeds ({', '.join(map(str, PAGE_SIZES))} articles per page)")
+    print(f"{'layout':34} {'bytes':>10} {'vs old':>8} {'encode us':>10} {'load us':>10}")
+    for name, size, encode, decode in rows:
+        print(f"{name:34} {size:>10} {size / baseline:>7.0%} {encode:>10.1f} {decode:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
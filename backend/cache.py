@@ -0,0 +1,133 @@
+# Bounded in-memory cache used when Redis is not available
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCache:
+    """Thread-safe LRU cache with per-key TTL and entry/byte limits.
+
+    Exposes the subset of the Redis client interface the app uses (get, mget,
+    setex, delete), so it can stand in for Redis without changing callers.
+    Expired entries are dropped when read and by a periodic background sweep;
+    when either limit is exceeded the least recently used entries are evicted.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024, sweep_interval=60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.cache = OrderedDict()  # key -> (value, expiry, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.lock = threading.RLock()
+        self._sweeper = None
+        if sweep_interval:
+            self._start_sweeper()
+
+    def _start_sweeper(self):
+        """Start the daemon thread that periodically removes expired entries"""
+        def sweep_forever():
+            while True:
+                time.sleep(self.sweep_interval)
+                self.sweep()
+
+        self._sweeper = threading.Thread(target=sweep_forever, name='cache-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def _size_of(self, key, value):
+        """Approximate memory used by an entry"""
+        if isinstance(value, (bytes, bytearray)):
+            value_size = len(value)
+        elif isinstance(value, str):
+            value_size = len(value.encode('utf-8'))
+        else:
+            value_size = sys.getsizeof(value)
+        return len(key) + value_size
+
+    def _remove(self, key):
+        value, expiry, size = self.cache.pop(key)
+        self.total_bytes -= size
+
+    def get(self, key):
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expiry, size = entry
+            if expiry <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def setex(self, key, seconds, value):
+        size = self._size_of(key, value)
+        with self.lock:
+            if key in self.cache:
+                self._remove(key)
+            if size > self.max_bytes:
+                # Never cache a single value larger than the whole budget
+                return False
+            self.cache[key] = (value, time.time() + seconds, size)
+            self.total_bytes += size
+            while len(self.cache) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest_key = next(iter(self.cache))
+                self._remove(oldest_key)
+                self.evictions += 1
+            return True
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def delete(self, *keys):
+        removed = 0
+        with self.lock:
+            for key in keys:
+                if key in self.cache:
+                    self._remove(key)
+                    removed += 1
+        return removed
+
+    def sweep(self):
+        """Remove every expired entry, returning how many were dropped"""
+        now = time.time()
+        with self.lock:
+            expired = [key for key, (value, expiry, size) in self.cache.items() if expiry <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def flushdb(self):
+        with self.lock:
+            self.cache.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """Return size and hit/miss/eviction counters"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.cache),
+                'bytes': self.total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def __len__(self):
+        return len(self.cache)
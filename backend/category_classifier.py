@@ -0,0 +1,156 @@
+# Keyword-based category classification for news articles
+
+import re
+
+import numpy as np
+
+# Keywords used to detect an article's category from its full text
+CATEGORY_KEYWORDS = {
+    'business': ['business', 'economy', 'market', 'stock', 'finance', 'investment', 'company', 'corporate', 'trade', 'economic', 'financial', 'wall street', 'nasdaq', 's&p', 'earnings', 'revenue', 'profit', 'ceo', 'cfo', 'startup', 'venture capital'],
+    'technology': ['technology', 'tech', 'software', 'ai', 'artificial intelligence', 'machine learning', 'blockchain', 'cryptocurrency', 'bitcoin', 'ethereum', 'startup', 'app', 'mobile', 'internet', 'cybersecurity', 'data', 'cloud', 'google', 'apple', 'microsoft', 'facebook', 'amazon', 'tesla', 'spacex', 'robotics', 'automation'],
+    'entertainment': ['entertainment', 'movie', 'film', 'tv', 'television', 'show', 'actor', 'actress', 'celebrity', 'hollywood', 'music', 'song', 'album', 'artist', 'singer', 'rapper', 'concert', 'award', 'oscar', 'grammy', 'netflix', 'disney', 'marvel', 'star wars', 'game of thrones', 'reality tv', 'comedy'],
+    'health': ['health', 'medical', 'medicine', 'doctor', 'hospital', 'patient', 'disease', 'cancer', 'covid', 'coronavirus', 'vaccine', 'treatment', 'therapy', 'surgery', 'pharmaceutical', 'drug', 'mental health', 'psychology', 'wellness', 'fitness', 'nutrition', 'diet', 'exercise', 'gym', 'workout'],
+    'science': ['science', 'research', 'study', 'scientist', 'laboratory', 'experiment', 'discovery', 'innovation', 'physics', 'chemistry', 'biology', 'astronomy', 'space', 'nasa', 'mars', 'moon', 'planet', 'galaxy', 'universe', 'climate', 'environment', 'ecology', 'evolution', 'genetics', 'dna'],
+    'sports': ['sports', 'football', 'basketball', 'baseball', 'soccer', 'tennis', 'golf', 'olympics', 'nfl', 'nba', 'mlb', 'nhl', 'championship', 'tournament', 'game', 'match', 'player', 'team', 'coach', 'athlete', 'champion', 'victory', 'defeat', 'score', 'league', 'season'],
+    'politics': ['politics', 'political', 'government', 'election', 'vote', 'democrat', 'republican', 'congress', 'senate', 'house', 'president', 'senator', 'representative', 'policy', 'law', 'legislation', 'bill', 'act', 'administration', 'federal', 'state', 'local', 'campaign', 'poll', 'polling', 'democracy', 'republic']
+}
+
+# Broader keywords used to decide whether an article is somewhat relevant to a category
+RELEVANCE_KEYWORDS = {
+    'general': ['news', 'latest', 'breaking', 'update', 'report', 'announcement', 'world', 'national', 'international', 'headline', 'story', 'event'],
+    'business': ['business', 'economy', 'market', 'finance', 'company', 'corporate', 'trade', 'economic', 'financial', 'investment', 'stock', 'ceo', 'startup'],
+    'technology': ['technology', 'tech', 'digital', 'software', 'computer', 'internet', 'ai', 'artificial intelligence', 'innovation', 'startup', 'app', 'mobile'],
+    'entertainment': ['entertainment', 'media', 'culture', 'arts', 'celebrity', 'show', 'performance', 'movie', 'music', 'tv', 'film'],
+    'health': ['health', 'wellness', 'medical', 'fitness', 'nutrition', 'lifestyle', 'medicine', 'doctor', 'hospital', 'treatment'],
+    'science': ['science', 'research', 'discovery', 'innovation', 'study', 'experiment', 'laboratory', 'scientist'],
+    'sports': ['sports', 'athletics', 'competition', 'game', 'match', 'tournament', 'player', 'team', 'champion'],
+    'politics': ['politics', 'government', 'policy', 'law', 'democracy', 'society', 'election', 'congress', 'senate', 'president']
+}
+
+# Words are runs of letters/digits, optionally joined by '&' (e.g. "s&p", "at&t")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:&[a-z0-9]+)*")
+
+
+class KeywordClassifier:
+    """Scores text against per-category keyword lists in a single pass.
+
+    The keyword lists are compiled once into a phrase table mapping every
+    keyword (single words and multi-word phrases) to the categories it counts
+    towards. Text is tokenized with one compiled regex and each 1..n word
+    window is looked up in that table, so keywords only match whole words
+    ("ai" no longer matches "said") and overlapping phrases such as "game" and
+    "game of thrones" are both counted. As before, each keyword counts at most
+    once per text.
+    """
+
+    def __init__(self, keywords_by_category, default=None):
+        self.categories = list(keywords_by_category.keys())
+        self.default = default
+        self.phrases = {}
+        for index, category in enumerate(self.categories):
+            for keyword in keywords_by_category[category]:
+                phrase = ' '.join(TOKEN_PATTERN.findall(keyword.lower()))
+                self.phrases.setdefault(phrase, [])
+                if index not in self.phrases[phrase]:
+                    self.phrases[phrase].append(index)
+        self.max_phrase_words = max(len(phrase.split(' ')) for phrase in self.phrases)
+
+        # Keyword x category matrix used by score_batch: 1 where a keyword counts towards a category
+        self.vocabulary = {phrase: row for row, phrase in enumerate(self.phrases)}
+        self.weights = np.zeros((len(self.vocabulary), len(self.categories)), dtype=np.int32)
+        for phrase, row in self.vocabulary.items():
+            self.weights[row, self.phrases[phrase]] = 1
+
+    def match_phrases(self, text):
+        """Return the set of keywords that appear in the text as whole words"""
+        tokens = TOKEN_PATTERN.findall((text or '').lower())
+        phrases = self.phrases
+        matched = set()
+        for i in range(len(tokens)):
+            window = tokens[i]
+            if window in phrases:
+                matched.add(window)
+            for j in range(i + 1, min(i + self.max_phrase_words, len(tokens))):
+                window = f"{window} {tokens[j]}"
+                if window in phrases:
+                    matched.add(window)
+        return matched
+
+    def score_list(self, text):
+        """Return keyword match counts in category order"""
+        scores = [0] * len(self.categories)
+        for phrase in self.match_phrases(text):
+            for index in self.phrases[phrase]:
+                scores[index] += 1
+        return scores
+
+    def scores(self, text):
+        """Return a dict of category -> number of distinct keywords matched"""
+        return dict(zip(self.categories, self.score_list(text)))
+
+    def score(self, text, category):
+        """Return the number of distinct keywords matched for one category"""
+        if category not in self.categories:
+            return 0
+        return self.score_list(text)[self.categories.index(category)]
+
+    def classify(self, text):
+        """Return the best scoring category, or the default if nothing matched"""
+        scores = self.score_list(text)
+        best = max(range(len(scores)), key=scores.__getitem__)
+        if scores[best] >= 1:
+            return self.categories[best]
+        return self.default
+
+    def classify_many(self, articles, fields=('title', 'description', 'content')):
+        """Classify a list of article dicts, returning one category per article"""
+        return [self.classify(article_text(article, fields)) for article in articles]
+
+    def term_matrix(self, texts):
+        """Return the sparse (texts x keywords) presence matrix as (rows, columns) coordinates"""
+        rows, columns = [], []
+        for row, text in enumerate(texts):
+            for phrase in self.match_phrases(text):
+                rows.append(row)
+                columns.append(self.vocabulary[phrase])
+        return np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)
+
+    def score_batch(self, texts):
+        """Return a (texts x categories) array of distinct keyword match counts.
+
+        The presence matrix stays in coordinate form, so its product with the
+        weight matrix is one row addition per matched keyword.
+        """
+        rows, columns = self.term_matrix(texts)
+        scores = np.zeros((len(texts), len(self.categories)), dtype=np.int32)
+        np.add.at(scores, rows, self.weights[columns])
+        return scores
+
+    def classify_batch(self, articles, fields=('title', 'description', 'content')):
+        """Classify many articles at once, returning the same categories as classify_many.
+
+        Scores every article with one sparse product, for backfills over
+        stored articles. Tokenizing still dominates the cost, so this runs at
+        about the speed of classify_many, which the request path keeps using.
+        """
+        scores = self.score_batch([article_text(article, fields) for article in articles])
+        # argmax returns the first maximum, matching max() in classify
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(best)), best]
+        return [
+            self.categories[index] if score >= 1 else self.default
+            for index, score in zip(best.tolist(), best_scores.tolist())
+        ]
+
+    def relevant_batch(self, articles, category, fields=('title', 'description')):
+        """Return one bool per article: does it match at least one keyword of the category"""
+        if category not in self.categories:
+            return [False] * len(articles)
+        column = self.categories.index(category)
+        scores = self.score_batch([article_text(article, fields) for article in articles])
+        return (scores[:, column] >= 1).tolist()
+
+
+def article_text(article, fields=('title', 'description', 'content')):
+    """Join the given article fields into a single string for classification"""
+    return ' '.join(article.get(field, '') or '' for field in fields)
@@ -0,0 +1,64 @@
+# Circuit breaking for upstream APIs
+
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after repeated failures, then probes it.
+
+    Closed: calls go through, and failure_threshold consecutive failures
+    open the circuit. Open: allow() refuses calls for reset_timeout seconds,
+    after which the circuit is half-open and one probe call is let through.
+    The probe's success closes the circuit; its failure reopens it. If the
+    probe never reports back, another is allowed after reset_timeout.
+    State is per process.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.retry_at = 0
+        self.opened = 0  # Times the circuit has opened
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may go ahead"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if now < self.retry_at:
+                return False
+            # Let one probe through; the next waits for its result or another reset_timeout
+            self.state = HALF_OPEN
+            self.retry_at = now + self.reset_timeout
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.retry_at = time.monotonic() + self.reset_timeout
+                self.opened += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'retry_in': round(max(0.0, self.retry_at - time.monotonic()), 1) if self.state != CLOSED else 0,
+                'times_opened': self.opened
+            }
@@ -0,0 +1,181 @@
+# Story identity: URL normalization, content fingerprints and near-duplicate
+# detection (MinHash signatures over title and description, LSH-indexed)
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+NON_WORD_PATTERN = re.compile(r'[^a-z0-9]+')
+# Outlets append their name to syndicated titles ("... - Reuters", "... | AP News")
+TITLE_SUFFIX_PATTERN = re.compile(r'\s+[-|–—]\s+[^-|–—]{1,40}$')
+
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+TRUNCATION_MARKER_PATTERN = re.compile(r'\[\+\d+ chars\]')
+
+# Query parameters added by campaign and click tracking, which don't change the page
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'yclid', '_ga', 'ocid', 'cmpid'}
+
+# Other outlets listed on a representative article
+MAX_ALSO_COVERED = 10
+
+
+def normalize_url(url):
+    """Lowercase the scheme and host and drop the fragment, utm_* and click-tracking parameters"""
+    if not url:
+        return url or ''
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    query = parts.query
+    if query:
+        params = parse_qsl(query, keep_blank_values=True)
+        kept = [(name, value) for name, value in params
+                if not name.lower().startswith('utm_') and name.lower() not in TRACKING_PARAMS]
+        if len(kept) != len(params):
+            query = urlencode(kept)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ''))
+
+
+def story_text(article):
+    """Normalized title and description an article is compared on"""
+    title = TITLE_SUFFIX_PATTERN.sub('', article.get('title') or '')
+    text = HTML_TAG_PATTERN.sub(' ', f"{title} {article.get('description') or ''}").lower()
+    return NON_WORD_PATTERN.sub(' ', text).strip()
+
+
+def content_fingerprint(article):
+    """SHA-256 of an article's normalized title, description and content, or None if they're empty.
+
+    Case, punctuation, HTML tags, outlet title suffixes and NewsAPI's
+    "[+N chars]" marker are ignored, so syndicated copies of a story share a
+    fingerprint.
+    """
+    content = HTML_TAG_PATTERN.sub(' ', article.get('content') or '')
+    content = NON_WORD_PATTERN.sub(' ', TRUNCATION_MARKER_PATTERN.sub('', content).lower()).strip()
+    text = f"{story_text(article)} {content}".strip()
+    if not text:
+        return None
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class MinHasher:
+    """Computes MinHash signatures of character shingles (byte n-grams).
+
+    The fraction of positions at which two signatures agree estimates the
+    Jaccard similarity of the texts' shingle sets. Each permutation is a
+    multiply-shift hash ((a * x + b) mod 2**64) >> 32, which numpy computes
+    without a modulo. Coefficients are drawn from a fixed seed, so signatures
+    are comparable across processes.
+    """
+
+    def __init__(self, num_perm=64, shingle_size=5, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(0, 2 ** 64 - 1, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self.b = rng.randint(0, 2 ** 64 - 1, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text):
+        """Return the signature of text as a uint64 array, or None for empty text"""
+        data = np.frombuffer(text.encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+        if not len(data):
+            return None
+        size = min(self.shingle_size, len(data))
+        count = len(data) - size + 1
+        # Polynomial hash of every shingle at once (257 ** 5 fits comfortably in 64 bits)
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(size):
+            hashes = hashes * np.uint64(257) + data[offset:offset + count]
+        # Products wrap around modulo 2 ** 64, as the hash family requires
+        return ((self.a * hashes + self.b) >> np.uint64(32)).min(axis=1)
+
+
+class StoryIndex:
+    """Groups syndicated copies of a story under the first copy added.
+
+    Signatures are split into bands; articles sharing any band are candidate
+    duplicates and count as copies when their estimated similarity reaches
+    threshold. Each lookup is a handful of dict probes rather than a scan of
+    every article already added. Articles with the same URL (ignoring
+    tracking parameters) are always copies. Copies from other outlets are listed on their representative's
+    also_covered_by as {'source', 'url'}.
+    """
+
+    def __init__(self, hasher, threshold=0.5, bands=16):
+        if hasher.num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.hasher = hasher
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = hasher.num_perm // bands
+        self.buckets = {}  # (band, band bytes) -> [representative index, ...]
+        self.signatures = []  # representative index -> signature
+        self.representatives = []
+        self.by_url = {}  # url -> representative
+
+    def _bands(self, signature):
+        return list(enumerate(row.tobytes() for row in signature.reshape(self.bands, self.rows)))
+
+    def find(self, article, signature=None):
+        """Return the representative article is a copy of, or None"""
+        url = normalize_url(article.get('url'))
+        if url and url in self.by_url:
+            return self.by_url[url]
+        if signature is None:
+            signature = self.hasher.signature(story_text(article))
+        if signature is None:
+            return None
+        checked = set()
+        for key in self._bands(signature):
+            for index in self.buckets.get(key, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                if np.count_nonzero(self.signatures[index] == signature) >= self.threshold * self.hasher.num_perm:
+                    return self.representatives[index]
+        return None
+
+    def add(self, article):
+        """Add an article, returning True if it is a new story and False if it is a copy"""
+        signature = self.hasher.signature(story_text(article))
+        representative = self.find(article, signature)
+        if representative is not None:
+            if representative is not article:
+                self._cover(representative, article)
+            return False
+
+        url = normalize_url(article.get('url'))
+        if url:
+            self.by_url[url] = article
+        index = len(self.representatives)
+        self.representatives.append(article)
+        self.signatures.append(signature)
+        if signature is not None:
+            for key in self._bands(signature):
+                self.buckets.setdefault(key, []).append(index)
+        return True
+
+    def _cover(self, representative, copy):
+        source = copy.get('source')
+        url = copy.get('url')
+        if url:
+            self.by_url.setdefault(normalize_url(url), representative)
+        covered = representative.get('also_covered_by', [])
+        if not source or source == representative.get('source') or len(covered) >= MAX_ALSO_COVERED:
+            return
+        if any(entry['source'] == source for entry in covered):
+            return
+        representative['also_covered_by'] = covered + [{'source': source, 'url': url}]
+
+
+def collapse_duplicates(articles, hasher, threshold=0.5):
+    """Return one article per story, in order, with later copies listed on the first.
+
+    Representatives are annotated in place; pass copies to keep the input
+    articles unchanged.
+    """
+    index = StoryIndex(hasher, threshold)
+    return [article for article in articles if index.add(article)]
@@ -0,0 +1,69 @@
+# Per-user favorites stored as one Firestore document per article
+
+import hashlib
+from datetime import datetime, timezone
+
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def favorite_id(url):
+    """Document id for a favorited article: a hash of its URL (URLs can't be document ids)"""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def article_url(article):
+    # Articles from the feed carry 'url'; analyzed articles carry 'original_url'
+    return article.get('url') or article.get('original_url') or ''
+
+
+class FavoritesStore:
+    """Favorites live in users/{uid}/favorites/{sha256(url)}.
+
+    Adding, removing and checking a favorite each touch one document, so
+    the cost doesn't grow with the number of favorites. Listing is ordered
+    by saved_at, newest first, and paginated with the id of the last
+    document of the previous page as the cursor.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def _collection(self, user_id):
+        return self.db.collection('users').document(user_id).collection('favorites')
+
+    def add(self, user_id, article, saved_at=None):
+        """Save an article; returns False if it was already a favorite"""
+        url = article_url(article)
+        if not url:
+            raise ValueError('Article has no URL')
+        data = dict(article)
+        data['saved_at'] = saved_at or datetime.now(timezone.utc).isoformat()
+        try:
+            self._collection(user_id).document(favorite_id(url)).create(data)
+        except AlreadyExists:
+            return False
+        return True
+
+    def remove(self, user_id, url):
+        self._collection(user_id).document(favorite_id(url)).delete()
+
+    def contains(self, user_id, url):
+        return self._collection(user_id).document(favorite_id(url)).get().exists
+
+    def list(self, user_id, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """Return (favorites, next_cursor); next_cursor is None on the last page"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        collection = self._collection(user_id)
+        query = collection.order_by('saved_at', direction=firestore.Query.DESCENDING)
+        if cursor:
+            cursor_doc = collection.document(cursor).get()
+            if cursor_doc.exists:
+                query = query.start_after(cursor_doc)
+        # Read one extra document to know whether another page exists
+        docs = list(query.limit(limit + 1).stream())
+        next_cursor = docs[limit - 1].id if len(docs) > limit else None
+        return [doc.to_dict() for doc in docs[:limit]], next_cursor
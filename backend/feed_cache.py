@@ -0,0 +1,165 @@
+# Cached /api/news responses: compact feeds in Redis, precompressed bytes per worker
+
+import gzip
+import hashlib
+import json
+
+from cache import MemoryCache
+from serializers import Serializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+
+def _text(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class FeedCache:
+    """Stores feeds once in Redis and their rendered responses in each worker.
+
+    A feed under key K is written to Redis as K, holding the page fields and
+    a list of article ids, and K:etag. Each article is stored once under
+    article:{id}, so an article that appears in several categories and pages
+    takes one copy. The id is a hash of the article's encoded form rather
+    than of its URL: the same URL can come back with a different title,
+    description or category on a later fetch, and with content ids a feed's
+    ETag (a hash of its ids) always names exactly the articles it was
+    stored with. A feed whose article has been evicted is reported missing
+    and gets refetched. Values use the given Serializer.
+
+    With share_articles=False the articles are stored inline in K instead.
+    That suits the per-worker MemoryCache fallback, which limits entries and
+    would otherwise spend N+3 of them on an N-article feed.
+
+    The final response bytes, gzip and brotli (when installed) copies are
+    kept in a per-worker LRU keyed by ETag. They are made once per worker
+    when the feed is stored or first served, so cache hits return bytes
+    directly and a matching If-None-Match needs only the ETag.
+    """
+
+    def __init__(self, redis_client, serializer=None, rendered_entries=256, rendered_bytes=32 * 1024 * 1024,
+                 rendered_ttl=3600, share_articles=True):
+        self.redis_client = redis_client
+        self.share_articles = share_articles
+        self.rendered_ttl = rendered_ttl
+        self.serializer = serializer or Serializer()
+        self.encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+        self.rendered = MemoryCache(max_entries=rendered_entries, max_bytes=rendered_bytes, sweep_interval=0)
+
+    def render(self, result):
+        """Return {encoding: bytes} for a feed result"""
+        body = json.dumps(result, separators=(',', ':')).encode('utf-8')
+        variants = {'identity': body, 'gzip': gzip.compress(body, compresslevel=GZIP_LEVEL)}
+        if brotli is not None:
+            variants['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+        return variants
+
+    def _remember(self, etag, result):
+        variants = self.render(result)
+        for encoding, body in variants.items():
+            # A tag always names the same bytes, so entries only leave by LRU or rendered_ttl
+            self.rendered.setex(f"{etag}:{encoding}", self.rendered_ttl, body)
+        return variants
+
+    def encode(self, result):
+        """Return (etag, feed value, {article id: article value}) for a feed result"""
+        if not self.share_articles:
+            feed_data = self.serializer.dumps(result)
+            return hashlib.sha256(feed_data).hexdigest()[:32], feed_data, {}
+
+        articles = {}
+        ids = []
+        for article in result.get('articles', []):
+            data = self.serializer.dumps(article)
+            article_id = hashlib.sha256(data).hexdigest()[:24]
+            articles[article_id] = data
+            ids.append(article_id)
+
+        feed = dict(result)
+        feed['articles'] = ids
+        feed_data = self.serializer.dumps(feed)
+        # The feed value names every article by content hash, so its hash identifies the response
+        etag = hashlib.sha256(feed_data).hexdigest()[:32]
+        return etag, feed_data, articles
+
+    def store(self, key, result, ttl):
+        """Write a feed and its articles, returning the feed's ETag"""
+        etag, feed_data, articles = self.encode(result)
+
+        # Articles are rewritten with the feed's TTL so they outlive every feed that references them
+        pipe = self.redis_client.pipeline(transaction=False) if hasattr(self.redis_client, 'pipeline') else self.redis_client
+        for article_id, data in articles.items():
+            pipe.setex(f"article:{article_id}", ttl, data)
+        pipe.setex(key, ttl, feed_data)
+        # Written last so a matching tag always has a feed behind it
+        pipe.setex(f"{key}:etag", ttl, etag)
+        if pipe is not self.redis_client:
+            pipe.execute()
+
+        self._remember(etag, result)
+        return etag
+
+    def lookup(self, key):
+        """Return (etag, fresh) for a cached feed in one round trip; etag is None on a miss"""
+        etag, fresh = self.redis_client.mget([f"{key}:etag", f"{key}:fresh"])
+        return _text(etag), bool(fresh)
+
+    def _load(self, key):
+        """Return (etag, feed dict) assembled from Redis, or None if the feed or an article is gone"""
+        feed_data = self.redis_client.get(key)
+        if feed_data is None:
+            return None
+        feed = self.serializer.loads(feed_data)
+        if not self.share_articles:
+            return hashlib.sha256(feed_data).hexdigest()[:32], feed
+        ids = feed['articles']
+        values = self.redis_client.mget([f"article:{article_id}" for article_id in ids]) if ids else []
+        if any(value is None for value in values):
+            return None
+        feed['articles'] = [self.serializer.loads(value) for value in values]
+        return hashlib.sha256(feed_data).hexdigest()[:32], feed
+
+    def get(self, key, encoding='identity', etag=None):
+        """Return (etag, body) for the requested encoding, or None if the feed is missing.
+
+        With the ETag from lookup(), a worker that has already rendered the
+        feed answers without another Redis read.
+        """
+        if etag is not None:
+            body = self.rendered.get(f"{etag}:{encoding}")
+            if body is not None:
+                return etag, body
+        loaded = self._load(key)
+        if loaded is None:
+            return None
+        etag, feed = loaded
+        body = self.rendered.get(f"{etag}:{encoding}")
+        if body is None:
+            body = self._remember(etag, feed)[encoding]
+        return etag, body
+
+    def response(self, result, encoding='identity'):
+        """Return (etag, body) for a feed result already in hand, such as one just stored"""
+        etag = self.encode(result)[0]
+        body = self.rendered.get(f"{etag}:{encoding}")
+        if body is None:
+            body = self._remember(etag, result)[encoding]
+        return etag, body
+
+    def load(self, key):
+        """Return the cached feed as a dict, or None"""
+        loaded = self._load(key)
+        return loaded[1] if loaded else None
+
+    def choose_encoding(self, accept_encodings):
+        """Pick the best stored encoding the client accepts (a werkzeug Accept object)"""
+        for encoding in self.encodings:
+            if accept_encodings[encoding]:
+                return encoding
+        return 'identity'
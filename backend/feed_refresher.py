@@ -0,0 +1,97 @@
+# Background refreshing of cached news feeds
+
+import threading
+import time
+
+from tracing import get_logger
+
+logger = get_logger('feed_refresher')
+
+
+def parse_intervals(spec):
+    """Parse "general=300,sports=900" into {'general': 300, 'sports': 900}"""
+    intervals = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, seconds = item.split('=', 1)
+        try:
+            intervals[name.strip()] = int(seconds)
+        except ValueError:
+            logger.warning("Ignoring invalid refresh interval: %s", item)
+    return intervals
+
+
+class FeedRefresher:
+    """Refreshes feeds on a schedule and on demand, off the request path.
+
+    Scheduled jobs run on one daemon thread, each at its own interval. When a
+    Redis client is given, a job is claimed with SET NX before it runs so
+    that only one worker refreshes a shared feed per interval. refresh_async
+    runs a one-off refresh on a background thread, skipping keys that are
+    already being refreshed.
+    """
+
+    def __init__(self, redis_client=None, tick=1.0):
+        self.redis_client = redis_client
+        self.tick = tick
+        self.jobs = {}  # name -> (interval, fn, shared)
+        self.next_run = {}
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def schedule(self, name, interval, fn, shared=True):
+        """Run fn every interval seconds, starting as soon as the refresher starts.
+
+        Shared jobs update state every worker sees (such as Redis) and run in
+        one worker per interval; other jobs run in every worker.
+        """
+        self.jobs[name] = (interval, fn, shared)
+        self.next_run[name] = 0
+
+    def start(self):
+        if self.thread is None and self.jobs:
+            self.thread = threading.Thread(target=self._run, name='feed-refresher', daemon=True)
+            self.thread.start()
+
+    def _claim(self, name, interval):
+        """Return True if this worker should run the job for the current interval"""
+        if self.redis_client is None:
+            return True
+        try:
+            return bool(self.redis_client.set(f"refresh:{name}", 1, nx=True, ex=max(1, int(interval * 0.9))))
+        except Exception:
+            return True
+
+    def _run(self):
+        while True:
+            now = time.time()
+            for name, (interval, fn, shared) in list(self.jobs.items()):
+                if self.next_run[name] > now:
+                    continue
+                self.next_run[name] = now + interval
+                if not shared or self._claim(name, interval):
+                    self._run_job(name, fn)
+            time.sleep(self.tick)
+
+    def _run_job(self, name, fn):
+        with self.lock:
+            if name in self.pending:
+                return
+            self.pending.add(name)
+        try:
+            fn()
+        except Exception as e:
+            logger.error("Background refresh of %s failed: %s", name, e)
+        finally:
+            with self.lock:
+                self.pending.discard(name)
+
+    def refresh_async(self, name, fn):
+        """Run fn on a background thread unless a refresh of name is already running"""
+        with self.lock:
+            if name in self.pending:
+                return False
+        threading.Thread(target=self._run_job, args=(name, fn), daemon=True).start()
+        return True
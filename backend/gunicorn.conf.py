@@ -0,0 +1,11 @@
+# Gunicorn settings, read from the working directory by `gunicorn app:app`
+
+
+def post_fork(server, worker):
+    """Start the background feed refresh in each worker.
+
+    Runs after the fork, so the refresher thread lives in the worker even
+    when the app is preloaded in the master.
+    """
+    import app
+    app.start_background_refresh()
@@ -0,0 +1,68 @@
+# Long-lived HTTP connection pools for upstream APIs
+
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def create_session(pool_connections=None, pool_maxsize=None, retries=None, backoff_factor=None):
+    """Build a requests.Session with keep-alive pooling and retry with backoff.
+
+    Defaults come from HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_RETRIES
+    and HTTP_RETRY_BACKOFF. Only idempotent requests are retried, and only
+    when the connection fails: a read timeout or a 429/5xx response goes
+    straight back to the caller, so a failing upstream is not hit again and
+    the circuit breaker sees the failure.
+    """
+    if pool_connections is None:
+        pool_connections = int(os.environ.get('HTTP_POOL_CONNECTIONS', 4))
+    if pool_maxsize is None:
+        pool_maxsize = int(os.environ.get('HTTP_POOL_MAXSIZE', 32))
+    if retries is None:
+        retries = int(os.environ.get('HTTP_RETRIES', 2))
+    if backoff_factor is None:
+        backoff_factor = float(os.environ.get('HTTP_RETRY_BACKOFF', 0.3))
+
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=False,  # Re-raise read timeouts as they are
+        status=0,
+        other=0,
+        backoff_factor=backoff_factor,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def create_async_client(max_connections=None, max_keepalive=None, retries=None):
+    """Build an httpx.AsyncClient for the async server.
+
+    One client holds up to HTTP_ASYNC_MAX_CONNECTIONS concurrent upstream
+    connections (keeping HTTP_POOL_MAXSIZE alive between requests) and
+    retries failed connection attempts HTTP_RETRIES times, like create_session.
+    """
+    if httpx is None:
+        raise RuntimeError('httpx is required for the async server')
+    if max_connections is None:
+        max_connections = int(os.environ.get('HTTP_ASYNC_MAX_CONNECTIONS', 200))
+    if max_keepalive is None:
+        max_keepalive = int(os.environ.get('HTTP_POOL_MAXSIZE', 32))
+    if retries is None:
+        retries = int(os.environ.get('HTTP_RETRIES', 2))
+
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+    return httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(retries=retries, limits=limits), limits=limits)
@@ -0,0 +1,221 @@
+# Load generator: drives a mix of /api/news, /api/simplify and favorites traffic
+# at a running backend and reports throughput, latency percentiles and upstream calls
+#
+# Usage (from backend/, with loadtest/stubs.py and the backend running):
+#   python loadtest/loadgen.py --duration 60 --concurrency 50
+#   python loadtest/loadgen.py --mix news=80,simplify=10,favorites=10 --json report.json
+#
+# Each worker thread keeps its own keep-alive session and loops until the
+# duration is up. News requests pick a category and page (earlier pages are
+# more popular) and revalidate with If-None-Match once they have an ETag, like
+# a browser. Simplify requests analyze articles seen in earlier feeds.
+# Favorites requests act as one of --users users, signed with the
+# "test:<uid>" tokens the backend accepts when AUTH_TEST_TOKENS=true.
+# Upstream call counts are read from the stubs' /__stats before and after.
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+import requests
+
+CATEGORIES = ['general', 'business', 'technology', 'entertainment', 'health', 'science', 'sports', 'politics']
+PAGE_WEIGHTS = [0.7, 0.2, 0.1]
+FAVORITE_ACTIONS = [('favorites_list', 0.5), ('favorites_check', 0.2), ('favorites_add', 0.2), ('favorites_remove', 0.1)]
+MAX_POOL_ARTICLES = 2000
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ('news', 'simplify', 'favorites'):
+            raise argparse.ArgumentTypeError(f"unknown request type: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}  # route -> [seconds]
+        self.errors = {}  # route -> {status: count}
+
+    def record(self, route, latency, status):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(latency)
+            if status is None or status >= 400:
+                counts = self.errors.setdefault(route, {})
+                key = str(status or 'connection')
+                counts[key] = counts.get(key, 0) + 1
+
+
+class LoadGenerator:
+    def __init__(self, args):
+        self.args = args
+        self.results = Results()
+        self.articles = []  # Articles seen in feeds, for simplify and favorites requests
+        self.articles_lock = threading.Lock()
+
+    def request(self, session, route, method, path, **kwargs):
+        start = time.perf_counter()
+        status = None
+        try:
+            response = session.request(method, self.args.base_url + path, timeout=self.args.timeout, **kwargs)
+            status = response.status_code
+            return response
+        except requests.RequestException:
+            return None
+        finally:
+            self.results.record(route, time.perf_counter() - start, status)
+
+    def random_article(self, rng):
+        with self.articles_lock:
+            return rng.choice(self.articles) if self.articles else None
+
+    def news(self, session, rng, etags):
+        category = rng.choice(CATEGORIES)
+        page = rng.choices(range(1, self.args.pages + 1), PAGE_WEIGHTS[:self.args.pages] or None)[0]
+        path = f"/api/news?category={category}&page={page}&page_size=30"
+        headers = {'If-None-Match': etags[path]} if path in etags else {}
+        response = self.request(session, 'news', 'GET', path, headers=headers)
+        if response is None or response.status_code != 200:
+            return
+        if response.headers.get('ETag'):
+            etags[path] = response.headers['ETag']
+        articles = response.json().get('articles', [])
+        with self.articles_lock:
+            if len(self.articles) < MAX_POOL_ARTICLES:
+                self.articles.extend(articles[:MAX_POOL_ARTICLES - len(self.articles)])
+
+    def simplify(self, session, rng, etags):
+        article = self.random_article(rng)
+        if article is None:
+            return self.news(session, rng, etags)
+        self.request(session, 'simplify', 'POST', '/api/simplify', json={'article': article})
+
+    def favorites(self, session, rng, etags):
+        article = self.random_article(rng)
+        headers = {'Authorization': f"Bearer test:loadtest-user-{rng.randrange(self.args.users)}"}
+        action = rng.choices([name for name, _ in FAVORITE_ACTIONS], [weight for _, weight in FAVORITE_ACTIONS])[0]
+        if action == 'favorites_list' or article is None:
+            self.request(session, 'favorites_list', 'GET', '/api/user/favorites?limit=50', headers=headers)
+        elif action == 'favorites_check':
+            self.request(session, action, 'GET', f"/api/user/favorites/{quote(article['url'], safe='')}", headers=headers)
+        elif action == 'favorites_add':
+            self.request(session, action, 'POST', '/api/user/favorites', json=article, headers=headers)
+        else:
+            self.request(session, action, 'DELETE', f"/api/user/favorites/{quote(article['url'], safe='')}", headers=headers)
+
+    def worker(self, index, deadline):
+        rng = random.Random(self.args.seed * 1000 + index)
+        session = requests.Session()
+        etags = {}
+        kinds = list(self.args.mix)
+        weights = [self.args.mix[kind] for kind in kinds]
+        while time.time() < deadline:
+            getattr(self, rng.choices(kinds, weights)[0])(session, rng, etags)
+
+    def run(self):
+        deadline = time.time() + self.args.duration
+        threads = [
+            threading.Thread(target=self.worker, args=(index, deadline), daemon=True)
+            for index in range(self.args.concurrency)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+
+def stub_stats(url):
+    try:
+        return requests.get(f"{url}/__stats", timeout=5).json()
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def report(results, elapsed, upstream):
+    rows = []
+    all_latencies = []
+    for route in sorted(results.latencies):
+        latencies = sorted(results.latencies[route])
+        all_latencies.extend(latencies)
+        rows.append((route, latencies, sum(results.errors.get(route, {}).values())))
+    rows.append(('total', sorted(all_latencies), sum(sum(counts.values()) for counts in results.errors.values())))
+
+    summary = {'duration': round(elapsed, 2), 'routes': {}, 'errors': results.errors, 'upstream': upstream}
+    print(f"{'route':18} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, latencies, errors in rows:
+        stats = {
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput': round(len(latencies) / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        }
+        summary['routes'][route] = stats
+        print(f"{route:18} {stats['requests']:>9} {errors:>7} {stats['throughput']:>8.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    for route, counts in sorted(results.errors.items()):
+        print(f"  {route} errors by status: {counts}")
+    for name, calls in upstream.items():
+        if calls is None:
+            print(f"{name}: stats unavailable")
+        else:
+            print(f"{name}: {calls['requests']} upstream calls ({calls['errors']} failed)")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load generator for the backend API')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5003')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run')
+    parser.add_argument('--concurrency', type=int, default=20, help='worker threads, each with one request in flight')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('news=70,simplify=20,favorites=10'),
+                        help='relative weights of news, simplify and favorites requests')
+    parser.add_argument('--users', type=int, default=100, help='distinct users for favorites requests')
+    parser.add_argument('--pages', type=int, default=3, choices=[1, 2, 3], help='feed pages requested per category')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--newsapi-url', default='http://127.0.0.1:8701', help='NewsAPI stub, for upstream call counts')
+    parser.add_argument('--anthropic-url', default='http://127.0.0.1:8702', help='Anthropic stub, for upstream call counts')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    stubs = {'NewsAPI': args.newsapi_url, 'Anthropic': args.anthropic_url}
+    before = {name: stub_stats(url) for name, url in stubs.items()}
+    generator = LoadGenerator(args)
+    elapsed = generator.run()
+    upstream = {}
+    for name, url in stubs.items():
+        after = stub_stats(url)
+        if before[name] is None or after is None:
+            upstream[name] = None
+        else:
+            upstream[name] = {key: after[key] - before[name][key] for key in ('requests', 'errors')}
+
+    summary = report(generator.results, elapsed, upstream)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 0 if summary['routes']['total']['requests'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
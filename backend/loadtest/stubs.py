@@ -0,0 +1,332 @@
+# Local stand-ins for NewsAPI, the Anthropic Messages API and (optionally) Redis,
+# so the backend can be load-tested on one machine without network access
+#
+# Usage (from backend/):
+#   python loadtest/stubs.py --newsapi-latency 300 --claude-latency 1500 --claude-error-rate 0.02
+#
+# then start the backend with the environment printed at startup, e.g.
+#   NEWS_API_BASE_URL=http://127.0.0.1:8701/v2 ANTHROPIC_BASE_URL=http://127.0.0.1:8702 \
+#   ANTHROPIC_API_KEY=stub NEWS_API_KEY=stub AUTH_TEST_TOKENS=true uvicorn asgi:application --workers 4
+#
+# Each stub sleeps for its latency (milliseconds, normally distributed with
+# the given jitter), fails the given fraction of requests with a 5xx, and
+# returns payloads of the configured size. Responses are generated from the
+# query, so repeated queries get the same articles. GET /__stats on a stub
+# returns its request and error counts; POST /__reset zeroes them.
+#
+# --redis-port serves an in-process Redis (fakeredis, with its [lua] extra for
+# the single-flight lock script) for multi-worker runs; without it each
+# worker falls back to its own in-memory cache. Firestore is replaced by the
+# backend's in-memory MockFirestore whenever firebase-credentials.json is
+# missing, and AUTH_TEST_TOKENS=true makes it accept "test:<uid>" tokens.
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from fakeredis import TcpFakeServer
+except ImportError:
+    TcpFakeServer = None
+
+QUERY_WORD_PATTERN = re.compile(r'[A-Za-z]+')
+QUERY_OPERATORS = {'OR', 'AND', 'NOT'}
+PROMPT_URL_PATTERN = re.compile(r'^URL: (\S+)$', re.MULTILINE)
+PROMPT_LEVEL_PATTERN = re.compile(r'"reading_level": "(\w+)"')
+
+WORDS = (
+    'market report city council season plan study launch vote record team price deal data court school '
+    'storm energy health budget union trial museum airline harbor festival river policy network patient '
+    'factory election league climate vaccine startup drought bridge satellite library orchestra highway'
+).split()
+SOURCES = ['Daily Ledger', 'Metro Tribune', 'Coastal Herald', 'Valley Post', 'Wire Service', 'Evening Star']
+
+
+class StubStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.errors = 0
+            self.by_path = {}
+
+    def record(self, path, error):
+        with self.lock:
+            self.requests += 1
+            self.errors += error
+            self.by_path[path] = self.by_path.get(path, 0) + 1
+
+    def to_dict(self):
+        with self.lock:
+            return {'requests': self.requests, 'errors': self.errors, 'by_path': dict(self.by_path)}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Shared plumbing: keep-alive, latency and error injection, /__stats and /__reset"""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real APIs
+    options = None  # latency, jitter, error_rate; set on each subclass by serve()
+    stats = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, value):
+        self.send_body(status, json.dumps(value).encode('utf-8'))
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def handle_stats(self):
+        path = urlsplit(self.path).path
+        if path == '/__stats':
+            self.send_json(200, self.stats.to_dict())
+        elif path == '/__reset':
+            self.stats.reset()
+            self.send_json(200, {'reset': True})
+        else:
+            return False
+        return True
+
+    def simulate(self):
+        """Sleep for the configured latency and return True if this request should fail"""
+        delay = random.gauss(self.options['latency'], self.options['jitter']) / 1000
+        if delay > 0:
+            time.sleep(delay)
+        error = random.random() < self.options['error_rate']
+        self.stats.record(urlsplit(self.path).path, error)
+        return error
+
+
+class NewsAPIHandler(StubHandler):
+    """GET /v2/everything in NewsAPI's response format"""
+
+    def do_GET(self):
+        if self.handle_stats():
+            return
+        parts = urlsplit(self.path)
+        if parts.path != '/v2/everything':
+            self.send_json(404, {'status': 'error', 'code': 'routeNotFound', 'message': 'Not found'})
+            return
+        if self.simulate():
+            self.send_json(500, {'status': 'error', 'code': 'unexpectedError', 'message': 'Injected failure'})
+            return
+
+        params = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        page_size = min(int(params.get('pageSize', 20)), self.options['articles'])
+        page = int(params.get('page', 1))
+        articles = everything_articles(params.get('q', ''), page, page_size, self.options)
+        self.send_json(200, {'status': 'ok', 'totalResults': page_size * 5, 'articles': articles})
+
+    do_POST = do_GET
+
+
+def everything_articles(query, page, count, options):
+    """Articles for a query page, reproducible from its inputs.
+
+    Titles and descriptions use the query's own keywords, so the backend's
+    category filters keep them, and a fraction are syndicated copies of the
+    previous article under another outlet's name.
+    """
+    keywords = [word.lower() for word in QUERY_WORD_PATTERN.findall(query) if word not in QUERY_OPERATORS] or WORDS
+    rng = random.Random(f"{query}|{page}")
+    slug = hashlib.sha1(query.encode('utf-8')).hexdigest()[:8]  # Distinct URLs per query
+    now = datetime.now(timezone.utc)
+    articles = []
+    for i in range(count):
+        if articles and rng.random() < options['duplicates']:
+            copy = dict(articles[-1])
+            source = rng.choice(SOURCES)
+            copy['source'] = {'id': None, 'name': source}
+            copy['title'] = f"{copy['title'].rsplit(' - ', 1)[0]} - {source}"
+            copy['url'] = f"https://{source.lower().replace(' ', '')}.example.com/{slug}/{page}/{i}"
+            articles.append(copy)
+            continue
+        topic = rng.sample(keywords, min(2, len(keywords)))
+        detail = rng.sample(WORDS, 6)
+        source = rng.choice(SOURCES)
+        headline = f"{' '.join(topic).title()} {detail[0]} {detail[1]} {detail[2]} after {detail[3]} {page}-{i}"
+        body = ' '.join(rng.choice(WORDS + keywords) for _ in range(max(1, options['content_chars'] // 7)))
+        articles.append({
+            'source': {'id': None, 'name': source},
+            'author': 'Staff',
+            'title': f"{headline} - {source}",
+            'description': f"The {detail[4]} {topic[0]} {detail[5]} drew attention as {' '.join(detail)} unfolded.",
+            'url': f"https://{source.lower().replace(' ', '')}.example.com/{slug}/{page}/{i}",
+            'urlToImage': f"https://images.example.com/{slug}/{page}/{i}.jpg",
+            'publishedAt': (now - timedelta(minutes=page * 100 + i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'content': f"{body[:options['content_chars']]}… [+{options['content_chars'] * 3} chars]"
+        })
+    return articles
+
+
+class AnthropicHandler(StubHandler):
+    """POST /v1/messages, plain and streamed, answering analysis prompts with valid JSON"""
+
+    def do_POST(self):
+        if self.handle_stats():
+            return
+        request = self.read_json()
+        if urlsplit(self.path).path != '/v1/messages':
+            self.send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': 'Not found'}})
+            return
+        if self.simulate():
+            self.send_json(529, {'type': 'error', 'error': {'type': 'overloaded_error', 'message': 'Injected failure'}})
+            return
+
+        prompt = ''.join(
+            message['content'] if isinstance(message['content'], str)
+            else ''.join(block.get('text', '') for block in message['content'])
+            for message in request.get('messages', [])
+        )
+        text = analysis_text(prompt, self.options)
+        input_tokens = len(prompt) // 4
+        output_tokens = len(text) // 4
+        message_id = 'msg_' + hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:24]
+        model = request.get('model', 'claude-3-haiku-20240307')
+
+        if request.get('stream'):
+            self.send_body(200, stream_events(message_id, model, text, input_tokens, output_tokens), 'text/event-stream')
+            return
+        self.send_json(200, {
+            'id': message_id,
+            'type': 'message',
+            'role': 'assistant',
+            'model': model,
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': input_tokens, 'output_tokens': output_tokens}
+        })
+
+    do_GET = do_POST
+
+
+def analysis_text(prompt, options):
+    """The JSON an analysis prompt asks for: one object, or an array for packed prompts"""
+    level_match = PROMPT_LEVEL_PATTERN.search(prompt)
+    reading_level = level_match.group(1) if level_match else '5th_grade'
+    sentence = 'This story explains what happened, who it affects and what could come next. '
+    analysis = {
+        'full_content': (sentence * (options['content_chars'] // len(sentence) + 1))[:options['content_chars']],
+        'pros': ['It gives people useful news', 'Experts explain the details', 'Readers can plan ahead'],
+        'cons': ['Some facts are still unclear', 'It may cost money', 'Not everyone agrees'],
+        'simplified_summary': 'Something important happened, and people are working out what it means.',
+        'reading_level': reading_level
+    }
+    urls = PROMPT_URL_PATTERN.findall(prompt)
+    if urls:
+        return json.dumps([dict(analysis, url=url) for url in urls])
+    return json.dumps(analysis)
+
+
+def stream_events(message_id, model, text, input_tokens, output_tokens):
+    """The Messages API server-sent event sequence for a text response"""
+    events = [
+        ('message_start', {'type': 'message_start', 'message': {
+            'id': message_id, 'type': 'message', 'role': 'assistant', 'model': model, 'content': [],
+            'stop_reason': None, 'stop_sequence': None, 'usage': {'input_tokens': input_tokens, 'output_tokens': 1}
+        }}),
+        ('content_block_start', {'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}}),
+    ]
+    for start in range(0, len(text), 40):
+        events.append(('content_block_delta', {
+            'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': text[start:start + 40]}
+        }))
+    events += [
+        ('content_block_stop', {'type': 'content_block_stop', 'index': 0}),
+        ('message_delta', {
+            'type': 'message_delta', 'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+            'usage': {'output_tokens': output_tokens}
+        }),
+        ('message_stop', {'type': 'message_stop'}),
+    ]
+    return ''.join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in events).encode('utf-8')
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Accept bursts of new connections without refusing them
+
+
+def serve(handler, host, port, options):
+    """Start a stub server on a daemon thread and return it"""
+    handler = type(handler.__name__, (handler,), {'options': options, 'stats': StubStats()})
+    server = StubServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local NewsAPI, Anthropic and Redis stand-ins for load tests')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--newsapi-port', type=int, default=8701)
+    parser.add_argument('--anthropic-port', type=int, default=8702)
+    parser.add_argument('--redis-port', type=int, default=0, help='serve fakeredis on this port (0 = off)')
+    for name, latency, content_chars in (('newsapi', 250, 200), ('claude', 1200, 1200)):
+        parser.add_argument(f'--{name}-latency', type=float, default=latency, help='mean latency in ms')
+        parser.add_argument(f'--{name}-jitter', type=float, default=latency / 4, help='latency standard deviation in ms')
+        parser.add_argument(f'--{name}-error-rate', type=float, default=0.0, help='fraction of requests that fail')
+        parser.add_argument(f'--{name}-content-chars', type=int, default=content_chars,
+                            help='characters of article content (newsapi) or full_content (claude)')
+    parser.add_argument('--newsapi-articles', type=int, default=100, help='most articles per response')
+    parser.add_argument('--newsapi-duplicates', type=float, default=0.1, help='fraction of articles that are syndicated copies')
+    args = parser.parse_args()
+
+    def options(name, **extra):
+        return dict(
+            latency=getattr(args, f'{name}_latency'),
+            jitter=getattr(args, f'{name}_jitter'),
+            error_rate=getattr(args, f'{name}_error_rate'),
+            content_chars=getattr(args, f'{name}_content_chars'),
+            **extra
+        )
+
+    serve(NewsAPIHandler, args.host, args.newsapi_port,
+          options('newsapi', articles=args.newsapi_articles, duplicates=args.newsapi_duplicates))
+    serve(AnthropicHandler, args.host, args.anthropic_port, options('claude'))
+    environment = [
+        f"NEWS_API_BASE_URL=http://{args.host}:{args.newsapi_port}/v2",
+        f"ANTHROPIC_BASE_URL=http://{args.host}:{args.anthropic_port}",
+        'NEWS_API_KEY=stub',
+        'ANTHROPIC_API_KEY=stub',
+        'AUTH_TEST_TOKENS=true',
+    ]
+    if args.redis_port:
+        if TcpFakeServer is None:
+            parser.error('--redis-port requires the fakeredis package')
+        redis_server = TcpFakeServer((args.host, args.redis_port))
+        threading.Thread(target=redis_server.serve_forever, daemon=True).start()
+        environment.append(f"REDIS_URL=redis://{args.host}:{args.redis_port}/0")
+
+    print(f"NewsAPI stub on :{args.newsapi_port}, Anthropic stub on :{args.anthropic_port}"
+          + (f", Redis on :{args.redis_port}" if args.redis_port else ''))
+    print('Start the backend with:')
+    print('  ' + ' '.join(environment))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
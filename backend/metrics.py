@@ -0,0 +1,199 @@
+# In-process metrics exposed in Prometheus text format at /api/metrics
+
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        return self.values.get(key, 0)
+
+    def total(self):
+        with self.lock:
+            return sum(self.values.values())
+
+    def collect(self):
+        with self.lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self.values.items())
+            ]
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self.series = {}  # labels -> [bucket counts, sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def summary(self, **labels):
+        """Return count, sum, mean and approximate p50/p95/p99, merging series that match labels"""
+        with self.lock:
+            matching = [
+                series for key, series in self.series.items()
+                if all(key[self.labelnames.index(name)] == str(value) for name, value in labels.items())
+            ]
+            counts = [sum(series[0][i] for series in matching) for i in range(len(self.buckets))]
+            total = sum(series[1] for series in matching)
+            count = sum(series[2] for series in matching)
+        return {
+            'count': count,
+            'sum': total,
+            'mean': total / count if count else None,
+            'p50': self._quantile(counts, count, 0.5),
+            'p95': self._quantile(counts, count, 0.95),
+            'p99': self._quantile(counts, count, 0.99)
+        }
+
+    def _quantile(self, counts, count, q):
+        """Estimate a quantile by interpolating inside the bucket that contains it"""
+        if not count:
+            return None
+        rank = q * count
+        cumulative = 0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets, counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if bound == float('inf'):
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            if bound != float('inf'):
+                lower = bound
+        return lower
+
+    def collect(self):
+        lines = []
+        with self.lock:
+            for key, (counts, total, count) in sorted(self.series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, callback):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def collect(self):
+        try:
+            return [f"{self.name} {_format_value(self.callback())}"]
+        except Exception:
+            return []
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, callback):
+        return self.register(Gauge(name, documentation, callback))
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+# Metrics are per process; each worker reports its own series
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    'simply_http_request_duration_seconds', 'Time spent handling API requests', ('route', 'method', 'status'))
+NEWSAPI_REQUEST_DURATION = registry.histogram(
+    'simply_newsapi_request_duration_seconds', 'NewsAPI request latency', ('query', 'status'))
+CLAUDE_REQUEST_DURATION = registry.histogram(
+    'simply_claude_request_duration_seconds', 'Claude request latency', ('mode', 'outcome'))
+CLAUDE_TOKENS = registry.histogram(
+    'simply_claude_tokens_per_call', 'Tokens used per Claude call', ('direction',), buckets=TOKEN_BUCKETS)
+CLAUDE_COST = registry.counter(
+    'simply_claude_cost_dollars_total', 'Estimated Claude spend in dollars')
+CACHE_REQUESTS = registry.counter(
+    'simply_cache_requests_total', 'Cache lookups by cache and result', ('cache', 'result'))
+RATE_LIMIT_WAIT = registry.histogram(
+    'simply_rate_limiter_wait_seconds', 'Time spent waiting on rate limiters', ('limiter',))
+CIRCUIT_REJECTED = registry.counter(
+    'simply_circuit_rejected_total', 'Upstream calls skipped because the circuit was open', ('upstream',))
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
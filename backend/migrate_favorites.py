@@ -0,0 +1,78 @@
+# One-time migration of embedded favorites arrays into per-user subcollections
+#
+# Usage (from backend/, with firebase-credentials.json present):
+#   python migrate_favorites.py --dry-run
+#   python migrate_favorites.py
+#
+# Each favorite in users/{uid}.favorites is written to
+# users/{uid}/favorites/{sha256(url)} and the array is then removed. Running
+# it again is safe: users without a favorites array are skipped.
+
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from favorites import article_url, favorite_id
+
+# Firestore allows at most 500 writes per batch
+BATCH_LIMIT = 500
+
+
+def migrate_user(db, user_doc, dry_run=False):
+    """Move one user's favorites array into the subcollection; returns the number moved"""
+    favorites = (user_doc.to_dict() or {}).get('favorites')
+    if not isinstance(favorites, list):
+        return 0
+
+    # Keep the array order: the last favorite in it becomes the newest
+    base = datetime.now(timezone.utc) - timedelta(seconds=len(favorites))
+    documents = {}
+    for position, article in enumerate(favorites):
+        url = article_url(article) if isinstance(article, dict) else ''
+        if not url:
+            continue
+        data = dict(article)
+        data.setdefault('saved_at', (base + timedelta(seconds=position)).isoformat())
+        documents[favorite_id(url)] = data
+
+    if dry_run:
+        print(f"{user_doc.id}: would move {len(documents)} favorites")
+        return len(documents)
+
+    collection = user_doc.reference.collection('favorites')
+    items = list(documents.items())
+    for start in range(0, len(items), BATCH_LIMIT):
+        batch = db.batch()
+        for doc_id, data in items[start:start + BATCH_LIMIT]:
+            batch.set(collection.document(doc_id), data)
+        batch.commit()
+
+    # Only drop the array once every favorite has been written
+    user_doc.reference.update({'favorites': firestore.DELETE_FIELD})
+    print(f"{user_doc.id}: moved {len(documents)} favorites")
+    return len(documents)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Move embedded favorites arrays into subcollections')
+    parser.add_argument('--credentials', default='firebase-credentials.json')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would be moved without writing')
+    args = parser.parse_args()
+
+    firebase_admin.initialize_app(credentials.Certificate(args.credentials))
+    db = firestore.client()
+
+    users = 0
+    moved = 0
+    for user_doc in db.collection('users').stream():
+        count = migrate_user(db, user_doc, dry_run=args.dry_run)
+        if count:
+            users += 1
+            moved += count
+    print(f"{'Would move' if args.dry_run else 'Moved'} {moved} favorites for {users} users")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+# In-memory stand-in for Firestore, used in development when credentials are missing
+
+import threading
+
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
+
+
+class MockFirestore:
+    """Keeps documents in a dict keyed by path, e.g. 'users/abc/favorites/123'"""
+
+    def __init__(self):
+        self.documents = {}
+        self.lock = threading.Lock()
+
+    def collection(self, name):
+        return MockCollection(self, name)
+
+    def batch(self):
+        return MockBatch()
+
+
+class MockCollection:
+    def __init__(self, store, path, order=None, limit_count=None, start_after_id=None):
+        self.store = store
+        self.path = path
+        self.order = order  # (field, direction)
+        self.limit_count = limit_count
+        self.start_after_id = start_after_id
+
+    def document(self, doc_id):
+        return MockDocument(self.store, f"{self.path}/{doc_id}")
+
+    def _copy(self, **changes):
+        state = {
+            'order': self.order,
+            'limit_count': self.limit_count,
+            'start_after_id': self.start_after_id
+        }
+        state.update(changes)
+        return MockCollection(self.store, self.path, **state)
+
+    def order_by(self, field, direction='ASCENDING'):
+        return self._copy(order=(field, direction))
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    def start_after(self, snapshot):
+        return self._copy(start_after_id=snapshot.id)
+
+    def stream(self):
+        prefix = self.path + '/'
+        with self.store.lock:
+            snapshots = [
+                MockDocumentSnapshot(MockDocument(self.store, path), dict(data))
+                for path, data in self.store.documents.items()
+                if path.startswith(prefix) and '/' not in path[len(prefix):]
+            ]
+        snapshots.sort(key=lambda snapshot: snapshot.id)
+        if self.order:
+            field, direction = self.order
+            # Stable sort keeps document id order for ties, like Firestore
+            snapshots.sort(key=lambda snapshot: snapshot.to_dict().get(field) or '', reverse=direction == 'DESCENDING')
+        if self.start_after_id is not None:
+            ids = [snapshot.id for snapshot in snapshots]
+            if self.start_after_id in ids:
+                snapshots = snapshots[ids.index(self.start_after_id) + 1:]
+        if self.limit_count is not None:
+            snapshots = snapshots[:self.limit_count]
+        return iter(snapshots)
+
+
+class MockDocument:
+    def __init__(self, store, path):
+        self.store = store
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def collection(self, name):
+        return MockCollection(self.store, f"{self.path}/{name}")
+
+    def get(self):
+        with self.store.lock:
+            data = self.store.documents.get(self.path)
+        return MockDocumentSnapshot(self, dict(data) if data is not None else None)
+
+    def set(self, data, merge=False):
+        with self.store.lock:
+            if merge and self.path in self.store.documents:
+                self.store.documents[self.path].update(data)
+            else:
+                self.store.documents[self.path] = dict(data)
+
+    def create(self, data):
+        with self.store.lock:
+            if self.path in self.store.documents:
+                raise AlreadyExists(f"Document already exists: {self.path}")
+            self.store.documents[self.path] = dict(data)
+
+    def update(self, data):
+        with self.store.lock:
+            document = self.store.documents.setdefault(self.path, {})
+            for field, value in data.items():
+                if value is firestore.DELETE_FIELD:
+                    document.pop(field, None)
+                else:
+                    document[field] = value
+
+    def delete(self):
+        with self.store.lock:
+            self.store.documents.pop(self.path, None)
+
+
+class MockDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class MockBatch:
+    """Applies queued writes when committed"""
+
+    def __init__(self):
+        self.writes = []
+
+    def set(self, reference, data, merge=False):
+        self.writes.append(lambda: reference.set(data, merge=merge))
+
+    def update(self, reference, data):
+        self.writes.append(lambda: reference.update(data))
+
+    def delete(self, reference):
+        self.writes.append(reference.delete)
+
+    def commit(self):
+        for write in self.writes:
+            write()
+        self.writes = []
@@ -1,230 +1,339 @@
 # Handles fetching articles from News API
 
-import requests
+import asyncio
+import logging
 import os
 from datetime import datetime, timedelta
 import time
+from category_classifier import KeywordClassifier, CATEGORY_KEYWORDS, RELEVANCE_KEYWORDS
+from circuit_breaker import CircuitBreaker
+from dedup import MinHasher, StoryIndex, collapse_duplicates
+from http_client import create_session, create_async_client
+from metrics import CIRCUIT_REJECTED, NEWSAPI_REQUEST_DURATION, RATE_LIMIT_WAIT
+from tracing import get_logger, record_stage, stage
+
+logger = get_logger('news_api')
+
+
+class NewsAPIError(Exception):
+    """NewsAPI failed, or was not called because its circuit is open"""
+
+
+class NewsAPICircuitOpen(NewsAPIError):
+    """NewsAPI was not called because its circuit is open"""
+
 
 class NewsAPI:
-    def __init__(self):
+    def __init__(self, session=None):
         self.api_key = os.environ.get('NEWS_API_KEY', '')
-        self.base_url = 'https://newsapi.org/v2'
+        # Overridable so load tests can point at a local stand-in
+        self.base_url = os.environ.get('NEWS_API_BASE_URL', 'https://newsapi.org/v2').rstrip('/')
+        # Keep-alive connection pool reused by every NewsAPI request
+        self.session = session if session is not None else create_session()
+        self.async_client = None  # Created on first async request, inside the server's event loop
         self.last_request_time = 0
         self.min_request_interval = 0.1  # 100ms between requests
+        # Keyword tables are compiled once and shared by every request
+        self.category_classifier = KeywordClassifier(CATEGORY_KEYWORDS, default='general')
+        self.relevance_classifier = KeywordClassifier(RELEVANCE_KEYWORDS)
+        # Syndicated copies of a story (same wire copy across outlets) are served as one article
+        self.story_hasher = MinHasher()
+        self.dedup_threshold = float(os.environ.get('NEWS_DEDUP_THRESHOLD', 0.5))
+        # Fail fast while NewsAPI is down instead of waiting out the timeout on every request
+        self.circuit = CircuitBreaker(
+            failure_threshold=int(os.environ.get('NEWSAPI_FAILURE_THRESHOLD', 5)),
+            reset_timeout=float(os.environ.get('NEWSAPI_RESET_TIMEOUT', 30))
+        )
         
+    def _reserve_slot(self):
+        """Claim the next request slot and return how long to wait for it"""
+        current_time = time.time()
+        wait = max(0, self.min_request_interval - (current_time - self.last_request_time))
+        # Record the slot's start up front so concurrent async callers queue behind it
+        self.last_request_time = current_time + wait
+        RATE_LIMIT_WAIT.observe(wait, limiter='newsapi')
+        return wait
+    
     def _rate_limit(self):
         """Ensure we don't exceed rate limits"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+        wait = self._reserve_slot()
+        if wait:
+            time.sleep(wait)
+    
+    async def _rate_limit_async(self):
+        wait = self._reserve_slot()
+        if wait:
+            await asyncio.sleep(wait)
+    
+    def _check_circuit(self):
+        if not self.circuit.allow():
+            CIRCUIT_REJECTED.inc(upstream='newsapi')
+            raise NewsAPICircuitOpen('NewsAPI is unavailable (circuit open)')
+    
+    def _record_outcome(self, status):
+        # Rate limiting and server errors mean NewsAPI is unhealthy; other statuses are about the request
+        if status == 'error' or status == 429 or status >= 500:
+            self.circuit.record_failure()
+        else:
+            self.circuit.record_success()
+    
+    def _get(self, url, params, query):
+        """GET from NewsAPI, recording latency and status code under the given query type"""
+        start_time = time.time()
+        status = 'error'
+        try:
+            response = self.session.get(url, params=params, timeout=10)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.time() - start_time
+            NEWSAPI_REQUEST_DURATION.observe(elapsed, query=query, status=status)
+            record_stage('upstream', elapsed)
+            self._record_outcome(status)
+    
+    async def _get_async(self, url, params, query):
+        """Async _get over a shared httpx connection pool"""
+        if self.async_client is None:
+            self.async_client = create_async_client()
+        start_time = time.time()
+        status = 'error'
+        try:
+            response = await self.async_client.get(url, params=params, timeout=10)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.time() - start_time
+            NEWSAPI_REQUEST_DURATION.observe(elapsed, query=query, status=status)
+            record_stage('upstream', elapsed)
+            self._record_outcome(status)
     
     def _detect_category(self, title, description, content):
         """Intelligently detect the category based on article content"""
         # Combine all text for analysis
-        text = f"{title or ''} {description or ''} {content or ''}".lower()
+        text = f"{title or ''} {description or ''} {content or ''}"
+        return self.category_classifier.classify(text)
+    
+    def _process_article(self, article, category):
+        """Convert a raw NewsAPI article into the shape served to the frontend"""
+        return {
+            'title': article.get('title', ''),
+            'description': article.get('description', ''),
+            'content': article.get('content', ''),
+            'url': article.get('url', ''),
+            'urlToImage': article.get('urlToImage', ''),
+            'publishedAt': article.get('publishedAt', ''),
+            'source': (article.get('source') or {}).get('name', ''),
+            'author': article.get('author', ''),
+            'category': category,
+            'videoUrl': article.get('videoUrl', None)  # Support for video URLs
+        }
+    
+    def story_index(self):
+        """Return an empty StoryIndex for deduplicating one feed"""
+        return StoryIndex(self.story_hasher, self.dedup_threshold)
+    
+    def collapse_duplicates(self, articles):
+        """Keep the first copy of each story, listing the other outlets on it (mutates the kept articles)"""
+        return collapse_duplicates(articles, self.story_hasher, self.dedup_threshold)
+    
+    def _articles_params(self, category, page, page_size, sort_by):
+        """Build the primary query for a category feed"""
+        # Fetch more articles initially to account for filtering (respecting NewsAPI limits)
+        fetch_size = min(max(page_size * 3, 100), 100)  # Max 100 due to API limits
         
-        # Define category keywords
-        category_keywords = {
-            'business': ['business', 'economy', 'market', 'stock', 'finance', 'investment', 'company', 'corporate', 'trade', 'economic', 'financial', 'wall street', 'nasdaq', 's&p', 'earnings', 'revenue', 'profit', 'ceo', 'cfo', 'startup', 'venture capital'],
-            'technology': ['technology', 'tech', 'software', 'ai', 'artificial intelligence', 'machine learning', 'blockchain', 'cryptocurrency', 'bitcoin', 'ethereum', 'startup', 'app', 'mobile', 'internet', 'cybersecurity', 'data', 'cloud', 'google', 'apple', 'microsoft', 'facebook', 'amazon', 'tesla', 'spacex', 'robotics', 'automation'],
-            'entertainment': ['entertainment', 'movie', 'film', 'tv', 'television', 'show', 'actor', 'actress', 'celebrity', 'hollywood', 'music', 'song', 'album', 'artist', 'singer', 'rapper', 'concert', 'award', 'oscar', 'grammy', 'netflix', 'disney', 'marvel', 'star wars', 'game of thrones', 'reality tv', 'comedy'],
-            'health': ['health', 'medical', 'medicine', 'doctor', 'hospital', 'patient', 'disease', 'cancer', 'covid', 'coronavirus', 'vaccine', 'treatment', 'therapy', 'surgery', 'pharmaceutical', 'drug', 'mental health', 'psychology', 'wellness', 'fitness', 'nutrition', 'diet', 'exercise', 'gym', 'workout'],
-            'science': ['science', 'research', 'study', 'scientist', 'laboratory', 'experiment', 'discovery', 'innovation', 'physics', 'chemistry', 'biology', 'astronomy', 'space', 'nasa', 'mars', 'moon', 'planet', 'galaxy', 'universe', 'climate', 'environment', 'ecology', 'evolution', 'genetics', 'dna'],
-            'sports': ['sports', 'football', 'basketball', 'baseball', 'soccer', 'tennis', 'golf', 'olympics', 'nfl', 'nba', 'mlb', 'nhl', 'championship', 'tournament', 'game', 'match', 'player', 'team', 'coach', 'athlete', 'champion', 'victory', 'defeat', 'score', 'league', 'season'],
-            'politics': ['politics', 'political', 'government', 'election', 'vote', 'democrat', 'republican', 'congress', 'senate', 'house', 'president', 'senator', 'representative', 'policy', 'law', 'legislation', 'bill', 'act', 'administration', 'federal', 'state', 'local', 'campaign', 'poll', 'polling', 'democracy', 'republic']
+        return {
+            'apiKey': self.api_key,
+            'q': self._get_category_query(category),
+            'pageSize': fetch_size,
+            'page': page,
+            'language': 'en',
+            'sortBy': sort_by,
+            'from': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
+            'to': datetime.now().strftime('%Y-%m-%d')
         }
+    
+    def _broader_params(self, params, category, page_size):
+        """Build the fallback query used when the primary one yields too few articles"""
+        broader_params = params.copy()
+        broader_params['q'] = self._get_broader_query(category)
+        broader_params['pageSize'] = min(100, page_size * 2)
+        broader_params['from'] = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        broader_params['to'] = datetime.now().strftime('%Y-%m-%d')
+        return broader_params
+    
+    def _select_articles(self, articles, category, page_size):
+        """Classify raw NewsAPI articles and pick the ones to serve for a category.
+        
+        Returns (articles, StoryIndex of every story seen) so a top-up query can skip copies.
+        """
+        # Process and filter articles by detected category
+        processed_articles = []
+        category_matches = []
+        other_articles = []
         
-        # Score each category based on keyword matches
-        category_scores = {}
-        for category, keywords in category_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in text:
-                    score += 1
-            category_scores[category] = score
+        logger.debug("Processing articles from NewsAPI", extra={'articles': len(articles), 'category': category})
         
-        # Find the category with the highest score
-        best_category = max(category_scores, key=category_scores.get)
+        # Detect the actual category of every article
+        with stage('classify'):
+            detected_categories = self.category_classifier.classify_many(articles)
         
-        # Only return the detected category if it has a reasonable score
-        if category_scores[best_category] >= 1:
-            return best_category
+        select_start = time.perf_counter()
+        stories = self.story_index()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for i, article in enumerate(articles):
+            if debug:
+                logger.debug(
+                    "Article %d", i + 1,
+                    extra={'title': article.get('title'), 'description': article.get('description')}
+                )
+            # Filter out foreign language articles (keep only English)
+            title = article.get('title', '') or ''
+            description = article.get('description', '') or ''
+            
+            # Check if article is in English (simple heuristic) - completely disabled for debugging
+            # if not self._is_english(title + ' ' + description):
+            #     continue
+            
+            detected_category = detected_categories[i]
+            
+            processed_article = self._process_article(article, detected_category)
+            processed_article['title'] = title
+            processed_article['description'] = description
+            
+            # Later copies of a story only add their outlet to the first copy's also_covered_by
+            if processed_article['title'] and stories.add(processed_article):
+                # For general category, treat all articles as potential matches
+                if category == 'general':
+                    # When requesting general category, all articles are potential matches
+                    category_matches.append(processed_article)
+                elif detected_category == category:
+                    category_matches.append(processed_article)
+                else:
+                    other_articles.append(processed_article)
+        
+        logger.debug(
+            "Category matches: %d, other articles: %d", len(category_matches), len(other_articles),
+            extra={'first_matches': [a.get('title', 'No title') for a in category_matches[:3]]} if debug else None
+        )
+        
+                        # For general category, be much more inclusive
+        if category == 'general':
+            # For general category, include ALL articles with titles (very broad)
+            all_articles = category_matches + other_articles
+            
+            # For general category, we want to return ALL articles up to page_size
+            # regardless of their detected category (stories are already deduped)
+            result = []
+            selected = set()
+            
+            # Take all articles that have titles and URLs, up to page_size
+            for article in all_articles:
+                if len(result) >= page_size:
+                    break
+                if article.get('title') and article.get('url'):
+                    result.append(article)
+                    selected.add(id(article))
+            
+            # If we still don't have enough, just take any articles with titles
+            if len(result) < page_size:
+                for article in all_articles:
+                    if len(result) >= page_size:
+                        break
+                    if article.get('title') and id(article) not in selected:
+                        result.append(article)
+                        selected.add(id(article))
+            
+            logger.debug("General category - processed %d articles, returning %d", len(all_articles), len(result))
         else:
-            return 'general'  # Default to general if no clear category detected
+            # For other categories, use the existing logic
+            result = category_matches[:page_size]
+            
+            # If we don't have enough exact matches, add articles that might be relevant
+            # even if not exact category match, returning up to 2x page_size
+            result.extend(other_articles[:page_size * 2 - len(result)])
+        
+        record_stage('select', time.perf_counter() - select_start)
+        
+        # If we still don't have enough, be less strict about category matching (for non-general categories)
+        if category != 'general' and len(result) < page_size:
+            # Include articles that are somewhat related to the category
+            selected = {id(article) for article in result}
+            for article in other_articles:
+                if len(result) >= page_size:
+                    break
+                # Check if article has any relevance to the category
+                if id(article) not in selected and self._is_somewhat_relevant(article, category):
+                    result.append(article)
+                    selected.add(id(article))
+        
+        return result, stories
+    
+    def _add_broader_articles(self, result, stories, broader_articles, category, page_size):
+        """Top up result with articles from the broader query that aren't copies of stories already seen"""
+        for article in broader_articles:
+            if len(result) >= page_size:
+                break
+                
+            # Use requested category for broader results
+            processed_article = self._process_article(article, category)
+            
+            if processed_article['title'] and stories.add(processed_article):
+                result.append(processed_article)
     
     def get_articles(self, category='general', page=1, page_size=30, country='us', search_query='', sort_by='publishedAt'):
-        """Fetch articles from NewsAPI with intelligent category filtering"""
+        """Fetch articles from NewsAPI with intelligent category filtering.
+        
+        Raises NewsAPIError when NewsAPI fails or its circuit is open.
+        """
+        self._check_circuit()
         try:
             self._rate_limit()
             
-            # Fetch more articles initially to account for filtering (respecting NewsAPI limits)
-            fetch_size = min(max(page_size * 3, 100), 100)  # Max 100 due to API limits
-            
-            params = {
-                'apiKey': self.api_key,
-                'q': self._get_category_query(category),
-                'pageSize': fetch_size,
-                'page': page,
-                'language': 'en',
-                'sortBy': sort_by,
-                'from': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
-                'to': datetime.now().strftime('%Y-%m-%d')
-            }
-            
+            params = self._articles_params(category, page, page_size, sort_by)
             url = f"{self.base_url}/everything"
-            response = requests.get(url, params=params, timeout=10)
+            response = self._get(url, params, 'primary')
             
             if response.status_code == 200:
-                data = response.json()
-                articles = data.get('articles', [])
+                result, stories = self._select_articles(response.json().get('articles', []), category, page_size)
                 
-                # Process and filter articles by detected category
-                processed_articles = []
-                category_matches = []
-                other_articles = []
-                
-                print(f"DEBUG: Processing {len(articles)} articles from NewsAPI")
-                
-                for i, article in enumerate(articles):
-                    print(f"DEBUG: Article {i+1}: title='{article.get('title', 'None')}', description='{article.get('description', 'None')}'")
-                    # Filter out foreign language articles (keep only English)
-                    title = article.get('title', '') or ''
-                    description = article.get('description', '') or ''
-                    
-                    # Check if article is in English (simple heuristic) - completely disabled for debugging
-                    # if not self._is_english(title + ' ' + description):
-                    #     continue
-                    
-                    # Detect the actual category based on content
-                    detected_category = self._detect_category(
-                        title,
-                        description,
-                        article.get('content', '')
-                    )
-                    
-                    processed_article = {
-                        'title': title,
-                        'description': description,
-                        'content': article.get('content', ''),
-                        'url': article.get('url', ''),
-                        'urlToImage': article.get('urlToImage', ''),
-                        'publishedAt': article.get('publishedAt', ''),
-                        'source': article.get('source', {}).get('name', ''),
-                        'author': article.get('author', ''),
-                        'category': detected_category,
-                        'videoUrl': article.get('videoUrl', None)
-                    }
-                    
-                    if processed_article['title']:
-                        # For general category, treat all articles as potential matches
-                        if category == 'general':
-                            # When requesting general category, all articles are potential matches
-                            category_matches.append(processed_article)
-                        elif detected_category == category:
-                            category_matches.append(processed_article)
-                        else:
-                            other_articles.append(processed_article)
-                
-                print(f"DEBUG: Category matches: {len(category_matches)}, Other articles: {len(other_articles)}")
-                print(f"DEBUG: First few category matches: {[a.get('title', 'No title') for a in category_matches[:3]]}")
-                
-                                # For general category, be much more inclusive
-                if category == 'general':
-                    # For general category, include ALL articles with titles (very broad)
-                    all_articles = category_matches + other_articles
-                    
-                    # For general category, we want to return ALL articles up to page_size
-                    # regardless of their detected category
-                    result = []
-                    seen_urls = set()
-                    
-                    # Take all articles that have titles and URLs, up to page_size
-                    for article in all_articles:
-                        if len(result) >= page_size:
-                            break
-                        if article.get('title') and article.get('url') and article.get('url') not in seen_urls:
-                            result.append(article)
-                            seen_urls.add(article.get('url'))
-                    
-                    # If we still don't have enough, just take any articles with titles
-                    if len(result) < page_size:
-                        for article in all_articles:
-                            if len(result) >= page_size:
-                                break
-                            if article.get('title') and article not in result:
-                                result.append(article)
-                    
-                    print(f"DEBUG: General category - processed {len(all_articles)} articles, returning {len(result)} articles")
-                else:
-                    # For other categories, use the existing logic
-                    result = category_matches[:page_size]
-                    
-                    # If we don't have enough exact matches, add some relevant articles
-                    if len(result) < page_size and other_articles:
-                        remaining = page_size - len(result)
-                        # Take articles that might be relevant even if not exact category match
-                        result.extend(other_articles[:remaining])
-                    
-                    # Always try to return more articles if available (up to 2x page_size)
-                    max_articles = page_size * 2
-                    if len(result) < max_articles and other_articles:
-                        additional = min(max_articles - len(result), len(other_articles))
-                        result.extend(other_articles[:additional])
+                # If still not enough, try to fetch more with broader search
+                if len(result) < page_size:
+                    broader_response = self._get(url, self._broader_params(params, category, page_size), 'broader')
+                    if broader_response.status_code == 200:
+                        self._add_broader_articles(result, stories, broader_response.json().get('articles', []), category, page_size)
                 
-                # If we still don't have enough, be less strict about category matching (for non-general categories)
-                if category != 'general' and len(result) < page_size:
-                    # Include articles that are somewhat related to the category
-                    for article in other_articles:
-                        if len(result) >= page_size:
-                            break
-                        # Check if article has any relevance to the category
-                        if self._is_somewhat_relevant(article, category):
-                            result.append(article)
+                return result
+            logger.error("NewsAPI error: %s - %s", response.status_code, response.text)
+        except Exception as e:
+            logger.error("Error fetching news: %s", e)
+            raise NewsAPIError(f"Error fetching news: {e}") from e
+        raise NewsAPIError(f"NewsAPI error: {response.status_code}")
+    
+    async def get_articles_async(self, category='general', page=1, page_size=30, country='us', search_query='', sort_by='publishedAt'):
+        """get_articles for the async server: the same feed, fetched without blocking the event loop"""
+        self._check_circuit()
+        try:
+            await self._rate_limit_async()
+            
+            params = self._articles_params(category, page, page_size, sort_by)
+            url = f"{self.base_url}/everything"
+            response = await self._get_async(url, params, 'primary')
+            
+            if response.status_code == 200:
+                result, stories = self._select_articles(response.json().get('articles', []), category, page_size)
                 
                 # If still not enough, try to fetch more with broader search
                 if len(result) < page_size:
-                    # Try a broader search for this category
-                    broader_params = params.copy()
-                    broader_params['q'] = self._get_broader_query(category)
-                    broader_params['pageSize'] = min(100, page_size * 2)
-                    broader_params['from'] = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                    broader_params['to'] = datetime.now().strftime('%Y-%m-%d')
-                    
-                    broader_response = requests.get(url, params=broader_params, timeout=10)
+                    broader_response = await self._get_async(url, self._broader_params(params, category, page_size), 'broader')
                     if broader_response.status_code == 200:
-                        broader_data = broader_response.json()
-                        broader_articles = broader_data.get('articles', [])
-                        
-                        for article in broader_articles:
-                            if len(result) >= page_size:
-                                break
-                                
-                            processed_article = {
-                                'title': article.get('title', ''),
-                                'description': article.get('description', ''),
-                                'content': article.get('content', ''),
-                                'url': article.get('url', ''),
-                                'urlToImage': article.get('urlToImage', ''),
-                                'publishedAt': article.get('publishedAt', ''),
-                                'source': article.get('source', {}).get('name', ''),
-                                'author': article.get('author', ''),
-                                'category': category,  # Use requested category for broader results
-                                'videoUrl': article.get('videoUrl', None)
-                            }
-                            
-                            if processed_article['title'] and processed_article not in result:
-                                result.append(processed_article)
+                        self._add_broader_articles(result, stories, broader_response.json().get('articles', []), category, page_size)
                 
                 return result
-            else:
-                print(f"NewsAPI error: {response.status_code} - {response.text}")
-                return []
-                
+            logger.error("NewsAPI error: %s - %s", response.status_code, response.text)
         except Exception as e:
-            print(f"Error fetching news: {str(e)}")
-            return []
+            logger.error("Error fetching news: %s", e)
+            raise NewsAPIError(f"Error fetching news: {e}") from e
+        raise NewsAPIError(f"NewsAPI error: {response.status_code}")
     
     def _is_english(self, text):
         """Check if text is in English (simple heuristic)"""
@@ -260,25 +369,10 @@ class NewsAPI:
     
     def _is_somewhat_relevant(self, article, category):
         """Check if an article is somewhat relevant to a category (less strict than exact match)"""
-        text = f"{article.get('title', '') or ''} {article.get('description', '') or ''}".lower()
-        
-        # Define broader relevance keywords for each category
-        relevance_keywords = {
-            'general': ['news', 'latest', 'breaking', 'update', 'report', 'announcement', 'world', 'national', 'international', 'headline', 'story', 'event'],
-            'business': ['business', 'economy', 'market', 'finance', 'company', 'corporate', 'trade', 'economic', 'financial', 'investment', 'stock', 'ceo', 'startup'],
-            'technology': ['technology', 'tech', 'digital', 'software', 'computer', 'internet', 'ai', 'artificial intelligence', 'innovation', 'startup', 'app', 'mobile'],
-            'entertainment': ['entertainment', 'media', 'culture', 'arts', 'celebrity', 'show', 'performance', 'movie', 'music', 'tv', 'film'],
-            'health': ['health', 'wellness', 'medical', 'fitness', 'nutrition', 'lifestyle', 'medicine', 'doctor', 'hospital', 'treatment'],
-            'science': ['science', 'research', 'discovery', 'innovation', 'study', 'experiment', 'laboratory', 'scientist'],
-            'sports': ['sports', 'athletics', 'competition', 'game', 'match', 'tournament', 'player', 'team', 'champion'],
-            'politics': ['politics', 'government', 'policy', 'law', 'democracy', 'society', 'election', 'congress', 'senate', 'president']
-        }
-        
-        keywords = relevance_keywords.get(category, [])
-        relevance_score = sum(1 for keyword in keywords if keyword in text)
+        text = f"{article.get('title', '') or ''} {article.get('description', '') or ''}"
         
         # Return true if article has at least some relevance
-        return relevance_score >= 1
+        return self.relevance_classifier.score(text, category) >= 1
 
     def _get_broader_query(self, category):
         """Get broader search query terms for each category when we need more articles"""
@@ -308,54 +402,106 @@ class NewsAPI:
         }
         return category_queries.get(category, 'news')
     
-    def search_articles(self, query, page=1, page_size=30, sort_by='publishedAt'):
-        """Search for articles by keyword"""
+    def _get_ingest_query(self):
+        """Get one broad query covering every category, used to fill the shared article pool"""
+        return ('news OR breaking OR world OR business OR economy OR market OR technology OR tech OR AI '
+                'OR entertainment OR movie OR music OR health OR medical OR science OR research '
+                'OR sports OR football OR basketball OR politics OR government OR election')
+    
+    def fetch_stream(self, page=1, page_size=100, sort_by='publishedAt'):
+        """Fetch one page of the broad ingest query, classified by detected category"""
+        if not self.circuit.allow():
+            CIRCUIT_REJECTED.inc(upstream='newsapi')
+            logger.warning("Skipping NewsAPI ingest while its circuit is open")
+            return []
         try:
             self._rate_limit()
             
             params = {
                 'apiKey': self.api_key,
-                'q': query,
-                'pageSize': page_size,
+                'q': self._get_ingest_query(),
+                'pageSize': min(page_size, 100),  # Max 100 due to API limits
                 'page': page,
                 'language': 'en',
-                'sortBy': sort_by
+                'sortBy': sort_by,
+                'from': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
+                'to': datetime.now().strftime('%Y-%m-%d')
             }
             
-            url = f"{self.base_url}/everything"
-            response = requests.get(url, params=params, timeout=10)
+            response = self._get(f"{self.base_url}/everything", params, 'ingest')
             
             if response.status_code == 200:
-                data = response.json()
-                articles = data.get('articles', [])
-                
-                processed_articles = []
-                for article in articles:
-                    processed_article = {
-                        'title': article.get('title', ''),
-                        'description': article.get('description', ''),
-                        'content': article.get('content', ''),
-                        'url': article.get('url', ''),
-                        'urlToImage': article.get('urlToImage', ''),
-                        'publishedAt': article.get('publishedAt', ''),
-                        'source': article.get('source', {}).get('name', ''),
-                        'author': article.get('author', ''),
-                        'category': 'search',
-                        'videoUrl': article.get('videoUrl', None)  # Support for video URLs
-                    }
-                    
-                    if processed_article['title']:  # Temporarily removed image requirement for testing
-                        processed_articles.append(processed_article)
-                
-                return processed_articles
+                articles = [a for a in response.json().get('articles', []) if a.get('title') and a.get('url')]
+                detected_categories = self.category_classifier.classify_many(articles)
+                return [
+                    self._process_article(article, detected_category)
+                    for article, detected_category in zip(articles, detected_categories)
+                ]
             else:
-                print(f"NewsAPI search error: {response.status_code} - {response.text}")
+                logger.error("NewsAPI ingest error: %s - %s", response.status_code, response.text)
                 return []
                 
         except Exception as e:
-            print(f"Error searching news: {str(e)}")
+            logger.error("Error ingesting news: %s", e)
             return []
     
+    def _search_params(self, query, page, page_size, sort_by):
+        return {
+            'apiKey': self.api_key,
+            'q': query,
+            'pageSize': page_size,
+            'page': page,
+            'language': 'en',
+            'sortBy': sort_by
+        }
+    
+    def _process_search_results(self, articles):
+        processed_articles = []
+        stories = self.story_index()
+        for article in articles:
+            processed_article = self._process_article(article, 'search')
+            
+            if processed_article['title'] and stories.add(processed_article):  # Temporarily removed image requirement for testing
+                processed_articles.append(processed_article)
+        
+        return processed_articles
+    
+    def search_articles(self, query, page=1, page_size=30, sort_by='publishedAt'):
+        """Search for articles by keyword; raises NewsAPIError like get_articles"""
+        self._check_circuit()
+        try:
+            self._rate_limit()
+            
+            params = self._search_params(query, page, page_size, sort_by)
+            url = f"{self.base_url}/everything"
+            response = self._get(url, params, 'search')
+            
+            if response.status_code == 200:
+                return self._process_search_results(response.json().get('articles', []))
+            logger.error("NewsAPI search error: %s - %s", response.status_code, response.text)
+        except Exception as e:
+            logger.error("Error searching news: %s", e)
+            raise NewsAPIError(f"Error searching news: {e}") from e
+        raise NewsAPIError(f"NewsAPI error: {response.status_code}")
+    
+    async def search_articles_async(self, query, page=1, page_size=30, sort_by='publishedAt'):
+        """search_articles for the async server"""
+        self._check_circuit()
+        try:
+            await self._rate_limit_async()
+            
+            params = self._search_params(query, page, page_size, sort_by)
+            url = f"{self.base_url}/everything"
+            response = await self._get_async(url, params, 'search')
+            
+            if response.status_code == 200:
+                return self._process_search_results(response.json().get('articles', []))
+            logger.error("NewsAPI search error: %s - %s", response.status_code, response.text)
+        except Exception as e:
+            logger.error("Error searching news: %s", e)
+            raise NewsAPIError(f"Error searching news: {e}") from e
+        raise NewsAPIError(f"NewsAPI error: {response.status_code}")
+    
     def get_categories(self):
         """Get available news categories"""
         return [
@@ -1,28 +1,296 @@
+import asyncio
+import contextvars
 import os
 import json
+import queue
+import re
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from analysis_store import create_analysis_store
+from dedup import content_fingerprint, normalize_url
+from rate_limiter import RateLimiter
+from single_flight import SingleFlight
+from metrics import CLAUDE_COST, CLAUDE_REQUEST_DURATION, CLAUDE_TOKENS, RATE_LIMIT_WAIT, record_cache
+from tracing import get_logger, record_stage, stage
+
+logger = get_logger('openai_service')
+
+CLAUDE_MODEL = "claude-3-haiku-20240307"
+
+SYSTEM_PROMPT = "You are a helpful assistant that simplifies news articles for different reading levels while maintaining accuracy and key information. You MUST respond with valid JSON only."
+
+# Define reading level instructions
+READING_INSTRUCTIONS = {
+    '3rd_grade': 'Rewrite this news article at a 3rd grade reading level. Use simple words, short sentences, and explain any complex terms.',
+    '5th_grade': 'Rewrite this news article at a 5th grade reading level. Use clear language, avoid jargon, and explain important concepts.',
+    '8th_grade': 'Rewrite this news article at an 8th grade reading level. Use accessible language while maintaining the key information.',
+    'adult': 'Rewrite this news article in clear, concise language suitable for adults. Maintain accuracy and key details.'
+}
+
+REQUIRED_FIELDS = ['full_content', 'pros', 'cons', 'simplified_summary', 'reading_level']
+
+# Output token budget per analysis field; max_tokens is derived from these
+FIELD_OUTPUT_TOKENS = {
+    'simplified_summary': 80,
+    'pros': 100,
+    'cons': 100,
+    'full_content': 400,
+    'reading_level': 10
+}
+JSON_OVERHEAD_TOKENS = 40
+
+# Claude Haiku pricing per 1M tokens
+INPUT_COST_PER_MTOK = 0.25
+OUTPUT_COST_PER_MTOK = 1.25
+
+# NewsAPI truncates content and appends e.g. "… [+2345 chars]"
+TRUNCATION_MARKER_PATTERN = re.compile(r'\s*(?:…|\.\.\.)?\s*\[\+\d+ chars\]\s*$')
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# Fields sent to streaming clients as soon as Claude finishes writing each one
+STREAMED_FIELD_PATTERN = re.compile(r'"(simplified_summary|pros|cons|full_content)"\s*:\s*')
 
 class OpenAIService:
-    def __init__(self):
+    def __init__(self, analysis_cache=None, single_flight=None):
         self.anthropic_key = os.environ.get('ANTHROPIC_API_KEY', None)
-        self.last_request_time = 0
-        self.min_request_interval = 0.2  # 200ms between requests for faster processing
-        self.analysis_cache = {}  # Simple in-memory cache for analysis results
+        self.client = None  # Created lazily by _get_client
+        self.async_client = None  # Created lazily by _get_async_client, inside the server's event loop
+        self.client_lock = threading.Lock()
+        # Shared by simplify_article and the concurrent batch path
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=int(os.environ.get('CLAUDE_REQUESTS_PER_MINUTE', 300)),
+            tokens_per_minute=int(os.environ.get('CLAUDE_TOKENS_PER_MINUTE', 100000))
+        )
+        self.batch_concurrency = int(os.environ.get('CLAUDE_BATCH_CONCURRENCY', 4))
+        self.pack_size = int(os.environ.get('CLAUDE_PACK_SIZE', 5))  # Articles per packed prompt
+        # Approximate token budget for the article text sent with each prompt
+        self.input_token_budget = int(os.environ.get('CLAUDE_INPUT_TOKEN_BUDGET', 1000))
+        self.max_output_tokens = int(os.environ.get('CLAUDE_MAX_OUTPUT_TOKENS', 1024))
+        # Running totals from the usage Claude reports on every response
+        self.usage_totals = {'requests': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost': 0.0}
+        self.usage_lock = threading.Lock()
+        # Lookups that missed the URL key and went on to the content-addressed key
+        self.content_lookups = {'hits': 0, 'misses': 0}
+        # Shared analysis store (Redis or SQLite) so results survive restarts and are reused across workers
+        self.analysis_cache = analysis_cache if analysis_cache is not None else create_analysis_store()
+        self.single_flight = single_flight  # Optional SingleFlight to coalesce duplicate analyses
+        # The async server always coalesces analyses running on its event loop
+        self.async_flight = single_flight if single_flight is not None else SingleFlight()
         self.preferred_model = 'claude-haiku'  # Force Claude Haiku only
         
-        # Print startup message
+        # Log startup message
         if self.anthropic_key:
-            print(f"🚀 Claude Haiku initialized - Fastest analysis model")
+            logger.info("Claude Haiku initialized - Fastest analysis model")
         else:
-            print("⚠️  Claude Haiku API key not configured - analysis will fail")
+            logger.warning("Claude Haiku API key not configured - analysis will fail")
         
-    def _rate_limit(self):
+    def _get_client(self):
+        """Return the process-wide Anthropic client, creating it on first use"""
+        if self.client is None:
+            with self.client_lock:
+                if self.client is None:
+                    import anthropic
+                    logger.info("Using Anthropic version: %s", anthropic.__version__)
+                    # One client per process so its HTTP connection pool is reused across calls
+                    self.client = anthropic.Anthropic(
+                        api_key=self.anthropic_key,
+                        max_retries=int(os.environ.get('ANTHROPIC_MAX_RETRIES', 2)),
+                        timeout=float(os.environ.get('ANTHROPIC_TIMEOUT', 30))
+                    )
+        return self.client
+    
+    def _get_async_client(self):
+        """Return the process-wide AsyncAnthropic client used by the async server"""
+        if self.async_client is None:
+            import anthropic
+            self.async_client = anthropic.AsyncAnthropic(
+                api_key=self.anthropic_key,
+                max_retries=int(os.environ.get('ANTHROPIC_MAX_RETRIES', 2)),
+                timeout=float(os.environ.get('ANTHROPIC_TIMEOUT', 30))
+            )
+        return self.async_client
+    
+    def _rate_limit(self, estimated_tokens=0):
         """Ensure we don't exceed rate limits"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+        wait = self.rate_limiter.acquire(estimated_tokens)
+        RATE_LIMIT_WAIT.observe(wait, limiter='claude')
+        return wait
+    
+    async def _rate_limit_async(self, estimated_tokens=0):
+        wait = await self.rate_limiter.acquire_async(estimated_tokens)
+        RATE_LIMIT_WAIT.observe(wait, limiter='claude')
+        return wait
+    
+    def _cache_key(self, article, reading_level):
+        return f"{normalize_url(article.get('url', article.get('id', '')))}_{reading_level}"
+    
+    def _content_key(self, article, reading_level):
+        """Key for the same story at any URL, or None if the article has no text"""
+        fingerprint = content_fingerprint(article)
+        return f"content:{fingerprint[:32]}_{reading_level}" if fingerprint else None
+    
+    def _flight_key(self, article, reading_level):
+        """Single-flight key: concurrent analyses of the same story, even under different URLs, share it"""
+        return f"analysis:{self._content_key(article, reading_level) or self._cache_key(article, reading_level)}"
+    
+    def _cached_analysis(self, article, reading_level, record_misses=True):
+        """Return the cached analysis for an article, or None.
+        
+        The URL key is checked first, then the content key, which finds an
+        analysis of the same story made for another URL. A content hit is
+        copied under this article's URL key, with this article's metadata.
+        With record_misses=False only hits are counted in the metrics.
+        """
+        cache_key = self._cache_key(article, reading_level)
+        with stage('cache'):
+            cached_analysis = self.analysis_cache.get(cache_key)
+        if cached_analysis is not None:
+            record_cache('analysis', True)
+            logger.debug("Cache hit for article", extra={'cache_key': cache_key})
+            return cached_analysis
+        
+        content_key = self._content_key(article, reading_level)
+        if content_key is not None:
+            with stage('cache'):
+                cached_analysis = self.analysis_cache.get(content_key)
+        if cached_analysis is None and not record_misses:
+            return None
+        
+        record_cache('analysis', False)
+        if content_key is not None:
+            hit = cached_analysis is not None
+            record_cache('analysis_content', hit)
+            with self.usage_lock:
+                self.content_lookups['hits' if hit else 'misses'] += 1
+        if cached_analysis is None:
+            return None
+        
+        logger.debug("Content cache hit for article", extra={'cache_key': cache_key, 'content_key': content_key})
+        cached_analysis = self._attach_metadata(dict(cached_analysis), article)
+        self.analysis_cache.set(cache_key, cached_analysis)
+        return cached_analysis
+    
+    def _store_analysis(self, article, reading_level, simplified_data):
+        """Cache an analysis under the article's URL key and its content key"""
+        self.analysis_cache.set(self._cache_key(article, reading_level), simplified_data)
+        content_key = self._content_key(article, reading_level)
+        if content_key is not None:
+            self.analysis_cache.set(content_key, simplified_data)
+    
+    def content_cache_stats(self):
+        """Hit rate of the content-addressed layer and the Claude spend it has saved"""
+        usage = self.usage_stats()
+        with self.usage_lock:
+            hits, misses = self.content_lookups['hits'], self.content_lookups['misses']
+        cost_per_request = usage['cost'] / usage['requests'] if usage['requests'] else 0.0
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+            # Each hit is a Claude call avoided, priced at the average call so far
+            'estimated_cost_saved': round(hits * cost_per_request, 6)
+        }
+    
+    def _estimate_tokens(self, text):
+        """Rough token count (~4 characters per token) used before Claude reports usage"""
+        return len(text) // 4 + 1
+    
+    def _normalize_text(self, text):
+        """Strip HTML tags, NewsAPI's truncation marker and redundant whitespace"""
+        text = HTML_TAG_PATTERN.sub(' ', text or '')
+        text = TRUNCATION_MARKER_PATTERN.sub('', text)
+        return ' '.join(text.split())
+    
+    def _trim_to_budget(self, text, token_budget):
+        """Cut text to about token_budget tokens, ending on a sentence or word boundary"""
+        max_chars = token_budget * 4
+        if len(text) <= max_chars:
+            return text
+        cut = text[:max_chars]
+        sentence_end = cut.rfind('. ')
+        if sentence_end > max_chars // 2:
+            return cut[:sentence_end + 1]
+        return cut.rsplit(' ', 1)[0] + '...'
+    
+    def _format_article(self, article):
+        """Combine title, description and content into the text sent to Claude.
+        
+        Text is normalized and the content is trimmed so the whole article
+        fits in input_token_budget.
+        """
+        title = self._normalize_text(article.get('title', ''))
+        description = self._normalize_text(article.get('description', ''))
+        content = self._normalize_text(article.get('content', ''))
+        
+        full_content = f"Title: {title}\n\nDescription: {description}"
+        remaining_budget = self.input_token_budget - self._estimate_tokens(full_content)
+        # Skip content that merely repeats the description
+        if content and remaining_budget > 0 and not description.startswith(content[:100]):
+            full_content += f"\n\nContent: {self._trim_to_budget(content, remaining_budget)}"
+        return full_content
+    
+    def _max_tokens(self, articles=1):
+        """Output budget for the analysis fields of each article, capped at max_output_tokens"""
+        per_article = sum(FIELD_OUTPUT_TOKENS.values()) + JSON_OVERHEAD_TOKENS
+        return min(per_article * articles, self.max_output_tokens * articles, 4096)
+    
+    def _record_usage(self, usage, label='Claude Haiku'):
+        """Add the token usage reported by Claude to the running totals and log it"""
+        input_tokens = getattr(usage, 'input_tokens', 0) or 0
+        output_tokens = getattr(usage, 'output_tokens', 0) or 0
+        cost = (input_tokens * INPUT_COST_PER_MTOK + output_tokens * OUTPUT_COST_PER_MTOK) / 1000000
+        with self.usage_lock:
+            self.usage_totals['requests'] += 1
+            self.usage_totals['input_tokens'] += input_tokens
+            self.usage_totals['output_tokens'] += output_tokens
+            self.usage_totals['cost'] += cost
+        CLAUDE_TOKENS.observe(input_tokens, direction='input')
+        CLAUDE_TOKENS.observe(output_tokens, direction='output')
+        CLAUDE_COST.inc(cost)
+        logger.info(
+            "%s usage", label,
+            extra={'input_tokens': input_tokens, 'output_tokens': output_tokens, 'cost': round(cost, 6)}
+        )
+        return input_tokens, output_tokens, cost
+    
+    def usage_stats(self):
+        """Return token and cost totals since startup"""
+        with self.usage_lock:
+            return dict(self.usage_totals)
+    
+    def _attach_metadata(self, simplified_data, article):
+        """Fill in article metadata locally instead of paying for Claude to echo it"""
+        simplified_data.update({
+            'original_title': article.get('title', ''),
+            'original_source': article.get('source', ''),
+            'original_url': article.get('url', ''),
+            'original_image': article.get('urlToImage', ''),
+            'published_at': article.get('publishedAt', '')
+        })
+        return simplified_data
+    
+    def _strip_markdown(self, response_text):
+        """Remove ```json fences Claude sometimes wraps around its answer"""
+        if response_text.startswith('```json'):
+            return response_text.replace('```json', '').replace('```', '').strip()
+        if response_text.startswith('```'):
+            return response_text.replace('```', '').strip()
+        return response_text
+    
+    def _validate_analysis(self, simplified_data, check_lists=True):
+        """Raise if an analysis is missing fields or doesn't have exactly 3 pros and cons"""
+        if not isinstance(simplified_data, dict):
+            raise Exception("Analysis must be a JSON object")
+        for field in REQUIRED_FIELDS:
+            if field not in simplified_data:
+                raise Exception(f"Missing required field: {field}")
+        if check_lists:
+            # Validate pros and cons are lists with exactly 3 items
+            if not isinstance(simplified_data['pros'], list) or len(simplified_data['pros']) != 3:
+                raise Exception("Pros must be a list with exactly 3 items")
+            if not isinstance(simplified_data['cons'], list) or len(simplified_data['cons']) != 3:
+                raise Exception("Cons must be a list with exactly 3 items")
     
     def simplify_article(self, article, reading_level='5th_grade'):
         """Simplify an article using OpenAI"""
@@ -30,38 +298,264 @@ class OpenAIService:
             # Claude Haiku only - no validation needed
             
             # Check cache first
-            cache_key = f"{article.get('url', article.get('id', ''))}_{reading_level}"
-            if cache_key in self.analysis_cache:
-                print(f"Cache hit for article: {cache_key}")
-                return self.analysis_cache[cache_key]
-            
-            self._rate_limit()
-            
-            # Track token usage for cost monitoring
-            start_time = time.time()
-            
-            # Prepare the content for simplification
-            title = article.get('title', '')
-            description = article.get('description', '')
-            content = article.get('content', '')
-            
-            # Combine title and description for better context
-            full_content = f"Title: {title}\n\nDescription: {description}"
-            if content:
-                full_content += f"\n\nContent: {content}"
-            
-            # Define reading level instructions
-            reading_instructions = {
-                '3rd_grade': 'Rewrite this news article at a 3rd grade reading level. Use simple words, short sentences, and explain any complex terms.',
-                '5th_grade': 'Rewrite this news article at a 5th grade reading level. Use clear language, avoid jargon, and explain important concepts.',
-                '8th_grade': 'Rewrite this news article at an 8th grade reading level. Use accessible language while maintaining the key information.',
-                'adult': 'Rewrite this news article in clear, concise language suitable for adults. Maintain accuracy and key details.'
-            }
-            
-            instruction = reading_instructions.get(reading_level, reading_instructions['5th_grade'])
-            
-            # Create the prompt
-            prompt = f"""
+            cached_analysis = self._cached_analysis(article, reading_level)
+            if cached_analysis is not None:
+                return cached_analysis
+            
+            if self.single_flight is not None:
+                def analyze_if_missing():
+                    cached_analysis = self._cached_analysis(article, reading_level, record_misses=False)
+                    if cached_analysis is not None:
+                        return cached_analysis
+                    return self._analyze_article(article, reading_level)
+
+                result = self.single_flight.do(
+                    self._flight_key(article, reading_level),
+                    analyze_if_missing,
+                    lookup=lambda: self._cached_analysis(article, reading_level, record_misses=False)
+                )
+                # The leader may have analyzed the same story under another URL
+                return self._attach_metadata(dict(result), article)
+            
+            return self._analyze_article(article, reading_level)
+                
+        except Exception as e:
+            logger.error("Error simplifying article: %s", e)
+            # Re-raise the exception instead of returning fallback
+            raise e
+    
+    async def simplify_article_async(self, article, reading_level='5th_grade'):
+        """simplify_article for the async server, awaiting Claude instead of blocking a thread.
+        
+        Concurrent calls for the same story share one Claude call, on this
+        event loop and (with a Redis-backed SingleFlight) across workers. The
+        analysis store is called in threads so the loop never waits on it.
+        """
+        try:
+            cached_analysis = await asyncio.to_thread(self._cached_analysis, article, reading_level)
+            if cached_analysis is not None:
+                return cached_analysis
+            
+            async def analyze_if_missing():
+                cached_analysis = await asyncio.to_thread(self._cached_analysis, article, reading_level, False)
+                if cached_analysis is not None:
+                    return cached_analysis
+                return await self._analyze_article_async(article, reading_level)
+            
+            result = await self.async_flight.do_async(
+                self._flight_key(article, reading_level),
+                analyze_if_missing,
+                lookup=lambda: self._cached_analysis(article, reading_level, record_misses=False)
+            )
+            # The leader may have analyzed the same story under another URL
+            return self._attach_metadata(dict(result), article)
+                
+        except Exception as e:
+            logger.error("Error simplifying article: %s", e)
+            raise e
+    
+    def stream_simplify_article(self, article, reading_level='5th_grade'):
+        """Simplify an article, yielding (event, data) pairs as Claude writes them.
+        
+        Yields one event per field (simplified_summary, pros, cons,
+        full_content) as soon as its JSON value is complete, then a final
+        'result' event with the validated analysis, which is also cached.
+        A cache hit yields the 'result' event straight away.
+        
+        With a single_flight, concurrent requests for the same story share one
+        Claude call with each other and with simplify_article: the leader
+        streams the field events, and every other request waits and gets only
+        the 'result' event.
+        """
+        cached_analysis = self._cached_analysis(article, reading_level)
+        if cached_analysis is not None:
+            yield 'result', cached_analysis
+            return
+        
+        if self.single_flight is None:
+            yield from self._stream_analysis(article, reading_level)
+            return
+        
+        events = queue.Queue()
+        
+        def stream_if_missing():
+            cached_analysis = self._cached_analysis(article, reading_level, record_misses=False)
+            if cached_analysis is not None:
+                return cached_analysis
+            for event, data in self._stream_analysis(article, reading_level):
+                if event == 'result':
+                    return data
+                events.put((event, data))
+        
+        def run():
+            try:
+                result = self.single_flight.do(
+                    self._flight_key(article, reading_level),
+                    stream_if_missing,
+                    lookup=lambda: self._cached_analysis(article, reading_level, record_misses=False)
+                )
+                # The leader may have analyzed the same story under another URL
+                events.put(('result', self._attach_metadata(dict(result), article)))
+            except Exception as e:
+                events.put((None, e))
+        
+        # single_flight.do blocks until the result is in, so it runs on its own
+        # thread while this generator passes on the events the leader streams.
+        # If the client goes away, the analysis still finishes for the followers.
+        threading.Thread(target=contextvars.copy_context().run, args=(run,), name='analysis-stream', daemon=True).start()
+        while True:
+            event, data = events.get()
+            if event is None:
+                raise data
+            yield event, data
+            if event == 'result':
+                return
+    
+    def _stream_analysis(self, article, reading_level):
+        """Call Claude with streaming, yielding field events and then the parsed 'result'"""
+        if not self.anthropic_key:
+            raise Exception("Claude Haiku API key not configured. Please set ANTHROPIC_API_KEY in your environment.")
+        
+        prompt = self._build_prompt(article, reading_level)
+        max_tokens = self._max_tokens()
+        self._rate_limit(self._estimate_tokens(prompt) + max_tokens)
+        
+        response_text = ''
+        emitted = set()
+        start_time = time.time()
+        outcome = 'error'
+        try:
+            with self._get_client().messages.stream(
+                model=CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                temperature=0.1,
+                system=SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                for text in stream.text_stream:
+                    response_text += text
+                    for name, value in self._completed_fields(response_text, emitted):
+                        emitted.add(name)
+                        yield name, value
+                self._record_usage(stream.get_final_message().usage, 'Claude Haiku (streamed)')
+            outcome = 'success'
+        finally:
+            CLAUDE_REQUEST_DURATION.observe(time.time() - start_time, mode='stream', outcome=outcome)
+        
+        response_text = self._strip_markdown(response_text.strip())
+        logger.debug("Claude Haiku streamed response received", extra={'characters': len(response_text)})
+        yield 'result', self._parse_analysis(response_text, article, reading_level)
+    
+    def _completed_fields(self, partial_text, emitted):
+        """Return (name, value) for streamed fields whose JSON value is now complete"""
+        decoder = json.JSONDecoder()
+        completed = []
+        for match in STREAMED_FIELD_PATTERN.finditer(partial_text):
+            name = match.group(1)
+            if name in emitted:
+                continue
+            try:
+                value, end = decoder.raw_decode(partial_text, match.end())
+            except ValueError:
+                # The value is still being written
+                continue
+            completed.append((name, value))
+        return completed
+    
+    def _prepare_request(self, article, reading_level):
+        """Return (prompt, max_tokens) for a single-article analysis"""
+        prompt = self._build_prompt(article, reading_level)
+        
+        # Use Claude Haiku (fastest model)
+        if not self.anthropic_key:
+            raise Exception("Claude Haiku API key not configured. Please set ANTHROPIC_API_KEY in your environment.")
+        
+        return prompt, self._max_tokens()
+    
+    def _finish_response(self, response, max_tokens, article, reading_level):
+        """Record usage for a Claude response, then parse and cache its analysis"""
+        response_text = response.content[0].text.strip()
+        logger.debug("Claude Haiku response received", extra={'characters': len(response_text)})
+        
+        # Clean up markdown formatting if present
+        response_text = self._strip_markdown(response_text)
+        
+        # Log usage for cost monitoring (Claude Haiku only)
+        self._record_usage(response.usage)
+        if response.stop_reason == 'max_tokens':
+            logger.warning("Claude Haiku response hit max_tokens (%d); it may be truncated", max_tokens)
+        
+        return self._parse_analysis(response_text, article, reading_level)
+    
+    def _analyze_article(self, article, reading_level):
+        """Call Claude for an article that missed the cache and cache the result"""
+        prompt, max_tokens = self._prepare_request(article, reading_level)
+        
+        # Reserve roughly the prompt plus the output budget
+        self._rate_limit(self._estimate_tokens(prompt) + max_tokens)
+        
+        start_time = time.time()
+        response = None
+        try:
+            client = self._get_client()
+            
+            # Create the message with proper formatting
+            response = client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                temperature=0.1,
+                system=SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            elapsed = time.time() - start_time
+            CLAUDE_REQUEST_DURATION.observe(elapsed, mode='single', outcome='success')
+            record_stage('claude', elapsed)
+            
+        except Exception as e:
+            if response is None:
+                CLAUDE_REQUEST_DURATION.observe(time.time() - start_time, mode='single', outcome='error')
+            logger.exception("Error with Claude Haiku API (%s): %s", type(e).__name__, e)
+            raise e
+        
+        return self._finish_response(response, max_tokens, article, reading_level)
+    
+    async def _analyze_article_async(self, article, reading_level):
+        """_analyze_article using the async client"""
+        prompt, max_tokens = self._prepare_request(article, reading_level)
+        await self._rate_limit_async(self._estimate_tokens(prompt) + max_tokens)
+        
+        start_time = time.time()
+        response = None
+        try:
+            response = await self._get_async_client().messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                temperature=0.1,
+                system=SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            elapsed = time.time() - start_time
+            CLAUDE_REQUEST_DURATION.observe(elapsed, mode='async', outcome='success')
+            record_stage('claude', elapsed)
+            
+        except Exception as e:
+            if response is None:
+                CLAUDE_REQUEST_DURATION.observe(time.time() - start_time, mode='async', outcome='error')
+            logger.exception("Error with Claude Haiku API (%s): %s", type(e).__name__, e)
+            raise e
+        
+        # Parsing stores the analysis, so it runs off the event loop
+        return await asyncio.to_thread(self._finish_response, response, max_tokens, article, reading_level)
+    
+    def _build_prompt(self, article, reading_level):
+        """Build the single-article analysis prompt"""
+        # Prepare the content for simplification
+        full_content = self._format_article(article)
+        
+        instruction = READING_INSTRUCTIONS.get(reading_level, READING_INSTRUCTIONS['5th_grade'])
+        
+        # The summary is requested first so streaming clients can show it as soon as possible
+        return f"""
 {instruction}
 
 Analyze this news article and provide the following in valid JSON format only:
@@ -72,16 +566,11 @@ CRITICAL: You must respond with ONLY valid JSON. No explanations, no markdown, n
 
 Required JSON format (copy this exactly and fill in the values):
 {{
-    "full_content": "comprehensive summary or full article content",
+    "simplified_summary": "summary in 1-2 sentences",
     "pros": ["positive aspect 1", "positive aspect 2", "positive aspect 3"],
     "cons": ["concern 1", "concern 2", "concern 3"],
-    "simplified_summary": "summary in 1-2 sentences",
-    "reading_level": "{reading_level}",
-    "original_title": "{title}",
-    "original_source": "{article.get('source', '')}",
-    "original_url": "{article.get('url', '')}",
-    "original_image": "{article.get('urlToImage', '')}",
-    "published_at": "{article.get('publishedAt', '')}"
+    "full_content": "comprehensive summary or full article content",
+    "reading_level": "{reading_level}"
 }}
 
 RULES:
@@ -92,141 +581,282 @@ RULES:
 5. Double-check that your JSON is valid before responding
 6. Use the exact format above - do not modify the structure
 """
+    
+    def _parse_analysis(self, response_text, article, reading_level):
+        """Parse, repair if needed, validate and cache Claude's JSON response"""
+        try:
+            # Try to parse as JSON
+            simplified_data = json.loads(response_text)
             
-            # Use Claude Haiku (fastest model)
-            if not self.anthropic_key:
-                raise Exception("Claude Haiku API key not configured. Please set ANTHROPIC_API_KEY in your environment.")
+            # Validate required fields and exactly 3 pros and cons
+            self._validate_analysis(simplified_data)
             
-            try:
-                import anthropic
-                print(f"Using Anthropic version: {anthropic.__version__}")
-                
-                # Initialize client with proper error handling
-                client = anthropic.Anthropic(
-                    api_key=self.anthropic_key,
-                )
-                
-                # Create the message with proper formatting
-                response = client.messages.create(
-                    model="claude-3-haiku-20240307",
-                    max_tokens=500,
-                    temperature=0.1,
-                    system="You are a helpful assistant that simplifies news articles for different reading levels while maintaining accuracy and key information. You MUST respond with valid JSON only.",
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                
-                response_text = response.content[0].text.strip()
-                print(f"Claude Haiku response received: {len(response_text)} characters")
-                
-            except Exception as e:
-                print(f"Error with Claude Haiku API: {str(e)}")
-                print(f"Error type: {type(e)}")
-                import traceback
-                traceback.print_exc()
-                raise e
-            
-            # Response text is already parsed above
-            
-            # Clean up markdown formatting if present
-            if response_text.startswith('```json'):
-                response_text = response_text.replace('```json', '').replace('```', '').strip()
-            elif response_text.startswith('```'):
-                response_text = response_text.replace('```', '').strip()
-            
-            # Log usage for cost monitoring (Claude Haiku only)
-            input_tokens = len(prompt.split()) * 1.3  # Approximate token count
-            output_tokens = len(response_text.split()) * 1.3
-            input_cost = (input_tokens / 1000000) * 0.25  # $0.25 per 1M tokens
-            output_cost = (output_tokens / 1000000) * 1.25  # $1.25 per 1M tokens
-            total_cost = input_cost + output_cost
-            print(f"🚀 Claude Haiku: ~{int(input_tokens)} input tokens, ~{int(output_tokens)} output tokens, ${total_cost:.4f} cost")
+            # Cache the result for future use
+            self._attach_metadata(simplified_data, article)
+            self._store_analysis(article, reading_level, simplified_data)
+            
+            return simplified_data
+        except json.JSONDecodeError as e:
+            # Try to repair common JSON issues
+            logger.warning("JSON parse error, attempting to repair malformed JSON: %s", e)
             
+            # Try to fix common issues
+            repaired_text = response_text
+            
+            # Fix unterminated strings by finding the last complete quote
+            if '"full_content"' in repaired_text:
+                # Find the start of full_content
+                start_idx = repaired_text.find('"full_content"')
+                if start_idx != -1:
+                    # Find the next quote after the value
+                    quote_start = repaired_text.find('"', start_idx + 15)
+                    if quote_start != -1:
+                        # Find the next quote to close the string
+                        quote_end = repaired_text.find('"', quote_start + 1)
+                        if quote_end == -1:
+                            # String is unterminated, close it
+                            repaired_text = repaired_text + '"'
+            
+            # Try to parse the repaired JSON
             try:
-                # Try to parse as JSON
-                simplified_data = json.loads(response_text)
-                
-                # Validate required fields
-                required_fields = ['full_content', 'pros', 'cons', 'simplified_summary', 'reading_level']
-                for field in required_fields:
-                    if field not in simplified_data:
-                        raise Exception(f"Missing required field: {field}")
+                simplified_data = json.loads(repaired_text)
+                logger.info("JSON repair successful")
                 
-                # Validate pros and cons are lists with exactly 3 items
-                if not isinstance(simplified_data['pros'], list) or len(simplified_data['pros']) != 3:
-                    raise Exception("Pros must be a list with exactly 3 items")
-                if not isinstance(simplified_data['cons'], list) or len(simplified_data['cons']) != 3:
-                    raise Exception("Cons must be a list with exactly 3 items")
+                # Validate and return
+                self._validate_analysis(simplified_data, check_lists=False)
                 
                 # Cache the result for future use
-                self.analysis_cache[cache_key] = simplified_data
-                
+                self._attach_metadata(simplified_data, article)
+                self._store_analysis(article, reading_level, simplified_data)
                 return simplified_data
-            except json.JSONDecodeError as e:
-                # Try to repair common JSON issues
-                print(f"JSON Parse Error: {str(e)}")
-                print(f"Attempting to repair malformed JSON...")
-                
-                # Try to fix common issues
-                repaired_text = response_text
                 
-                # Fix unterminated strings by finding the last complete quote
-                if '"full_content"' in repaired_text:
-                    # Find the start of full_content
-                    start_idx = repaired_text.find('"full_content"')
-                    if start_idx != -1:
-                        # Find the next quote after the value
-                        quote_start = repaired_text.find('"', start_idx + 15)
-                        if quote_start != -1:
-                            # Find the next quote to close the string
-                            quote_end = repaired_text.find('"', quote_start + 1)
-                            if quote_end == -1:
-                                # String is unterminated, close it
-                                repaired_text = repaired_text + '"'
-                
-                # Try to parse the repaired JSON
-                try:
-                    simplified_data = json.loads(repaired_text)
-                    print("JSON repair successful!")
-                    
-                    # Validate and return
-                    required_fields = ['full_content', 'pros', 'cons', 'simplified_summary', 'reading_level']
-                    for field in required_fields:
-                        if field not in simplified_data:
-                            raise Exception(f"Missing required field: {field}")
-                    
-                    # Cache the result for future use
-                    self.analysis_cache[cache_key] = simplified_data
-                    return simplified_data
-                    
-                except:
-                    print("JSON repair failed")
-                    print(f"Original response: {response_text[:500]}...")
-                    raise Exception("Failed to parse Claude Haiku response as JSON")
-                    
-            except Exception as e:
-                print(f"Validation Error: {str(e)}")
-                print(f"Response text: {response_text[:500]}...")
-                raise Exception(f"Invalid response format: {str(e)}")
+            except:
+                logger.error("JSON repair failed", extra={'response': response_text[:500]})
+                raise Exception("Failed to parse Claude Haiku response as JSON")
                 
         except Exception as e:
-            print(f"Error simplifying article: {str(e)}")
-            # Re-raise the exception instead of returning fallback
-            raise e
+            logger.error("Validation error: %s", e, extra={'response': response_text[:500]})
+            raise Exception(f"Invalid response format: {str(e)}")
     
-    def batch_simplify_articles(self, articles, reading_level='5th_grade'):
-        """Simplify multiple articles in batch"""
-        simplified_articles = []
+    def batch_simplify_articles(self, articles, reading_level='5th_grade', concurrency=None):
+        """Simplify multiple articles concurrently.
         
-        for article in articles:
-            simplified = self.simplify_article(article, reading_level)
-            simplified_articles.append(simplified)
+        Results come back in input order. An article that fails yields an
+        {'error': ..., 'original_url': ...} entry instead of aborting the batch.
+        """
+        def simplify_or_error(article):
+            try:
+                return self.simplify_article(article, reading_level)
+            except Exception as e:
+                return {'error': str(e), 'original_url': article.get('url', '')}
+        
+        if not articles:
+            return []
+        
+        max_workers = min(concurrency or self.batch_concurrency, len(articles))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(simplify_or_error, articles))
+    
+    def iter_simplify_articles(self, articles, reading_levels, concurrency=None, pack_size=None):
+        """Yield (index, analysis, error) for each article in completion order.
+        
+        Cached analyses are yielded immediately. The rest are deduplicated by
+        single-flight key, sent pack_size articles per Claude request (see
+        _simplify_pack) on a bounded thread pool and yielded as each request
+        finishes. Articles without a URL, and any a pack doesn't cover, are
+        analyzed one at a time with simplify_article. reading_levels holds one
+        reading level per article. Exactly one of analysis and error is set
+        for every item.
+        """
+        pack_size = pack_size or self.pack_size
+        waiting = {}  # flight key -> [(index, article)]
+        levels = {}  # flight key -> reading level
+        for index, (article, reading_level) in enumerate(zip(articles, reading_levels)):
+            # Misses are counted by whichever call analyzes the article:
+            # _simplify_pack for packed articles, simplify_article for the rest
+            cached_analysis = self._cached_analysis(article, reading_level, record_misses=False)
+            if cached_analysis is not None:
+                yield index, cached_analysis, None
+            else:
+                key = self._flight_key(article, reading_level)
+                waiting.setdefault(key, []).append((index, article))
+                levels[key] = reading_level
+        
+        if not waiting:
+            return
+        
+        # Packed answers are matched by URL, so a pack never holds the same URL twice
+        packable = {}  # reading level -> [(flight key, article)]
+        singles = []
+        seen_urls = set()
+        for key, entries in waiting.items():
+            article = entries[0][1]
+            url = article.get('url')
+            if url and (levels[key], url) not in seen_urls:
+                seen_urls.add((levels[key], url))
+                packable.setdefault(levels[key], []).append((key, article))
+            else:
+                singles.append(key)
+        packs = []
+        for reading_level, items in packable.items():
+            for i in range(0, len(items), pack_size):
+                chunk = items[i:i + pack_size]
+                if len(chunk) > 1:
+                    packs.append((dict(chunk), reading_level))
+                else:
+                    singles.extend(key for key, article in chunk)
+        
+        def answers(key, analysis, error):
+            for index, article in waiting[key]:
+                # Duplicates of a story get the analysis with their own metadata
+                yield index, self._attach_metadata(dict(analysis), article) if analysis is not None else None, error
+        
+        executor = ThreadPoolExecutor(max_workers=min(concurrency or self.batch_concurrency, len(packs) + len(singles)))
+        futures = {}  # future -> (flight keys, packed)
+        
+        def submit_single(key):
+            futures[executor.submit(self.simplify_article, waiting[key][0][1], levels[key])] = ([key], False)
+        
+        try:
+            for pack, reading_level in packs:
+                futures[executor.submit(self._simplify_pack, pack, reading_level)] = (list(pack), True)
+            for key in singles:
+                submit_single(key)
             
-            # Add small delay between requests
-            time.sleep(0.1)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    keys, packed = futures.pop(future)
+                    if packed:
+                        try:
+                            analyses = future.result()
+                        except Exception as e:
+                            logger.warning("Packed analysis failed, falling back to single calls: %s", e)
+                            analyses = {}
+                        for key in keys:
+                            if key in analyses:
+                                yield from answers(key, analyses[key], None)
+                            else:
+                                submit_single(key)
+                    else:
+                        try:
+                            analysis, error = future.result(), None
+                        except Exception as e:
+                            analysis, error = None, str(e)
+                        yield from answers(keys[0], analysis, error)
+        finally:
+            # Stop queued work if the consumer goes away (e.g. the client disconnects)
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _simplify_pack(self, pack, reading_level):
+        """Analyze {flight key: article} with one packed prompt, returning {flight key: analysis}.
+        
+        The articles are claimed through single_flight.do_many, so a concurrent
+        simplify_article for one of them waits for this request instead of
+        calling Claude again. Articles someone else is already analyzing, and
+        entries that fail validation, are left out of the result.
+        """
+        def analyze(keys):
+            results = {}
+            misses = []
+            for key in keys:
+                # Another worker may have finished it since the batch looked.
+                # This lookup records the miss for each article that goes into the pack
+                cached_analysis = self._cached_analysis(pack[key], reading_level)
+                if cached_analysis is not None:
+                    results[key] = cached_analysis
+                else:
+                    misses.append(key)
+            if misses:
+                by_url = self._analyze_pack([pack[key] for key in misses], reading_level)
+                results.update({key: by_url[pack[key]['url']] for key in misses if pack[key]['url'] in by_url})
+            return results
+        
+        if self.single_flight is None:
+            return analyze(list(pack))
+        return self.single_flight.do_many(list(pack), analyze)
+    
+    def _analyze_pack(self, pack, reading_level):
+        """Send one packed prompt and return {url: analysis} for the entries that validate"""
+        if not self.anthropic_key:
+            raise Exception("Claude Haiku API key not configured. Please set ANTHROPIC_API_KEY in your environment.")
+        
+        instruction = READING_INSTRUCTIONS.get(reading_level, READING_INSTRUCTIONS['5th_grade'])
+        article_blocks = "\n\n".join(
+            f"--- Article {i + 1} ---\nURL: {article.get('url', '')}\n{self._format_article(article)}"
+            for i, article in enumerate(pack)
+        )
         
-        return simplified_articles
+        prompt = f"""
+{instruction}
+
+Analyze each of the {len(pack)} news articles below and respond with a JSON array containing one object per article:
+
+{article_blocks}
+
+CRITICAL: You must respond with ONLY a valid JSON array. No explanations, no markdown, no extra text.
+
+Required format for each array element (copy this exactly and fill in the values):
+{{
+    "url": "the article's URL exactly as given above",
+    "full_content": "comprehensive summary or full article content",
+    "pros": ["positive aspect 1", "positive aspect 2", "positive aspect 3"],
+    "cons": ["concern 1", "concern 2", "concern 3"],
+    "simplified_summary": "summary in 1-2 sentences",
+    "reading_level": "{reading_level}"
+}}
+
+RULES:
+1. Respond with ONLY the JSON array
+2. Include exactly one element per article, identified by its URL
+3. Ensure all strings are properly quoted and escaped
+4. Provide exactly 3 pros and 3 cons for every article
+5. Keep content concise but informative
+"""
+        
+        max_tokens = self._max_tokens(articles=len(pack))
+        self._rate_limit(self._estimate_tokens(prompt) + max_tokens)
+        
+        start_time = time.time()
+        try:
+            response = self._get_client().messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                temperature=0.1,
+                system=SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": prompt}]
+            )
+        except Exception:
+            CLAUDE_REQUEST_DURATION.observe(time.time() - start_time, mode='packed', outcome='error')
+            raise
+        CLAUDE_REQUEST_DURATION.observe(time.time() - start_time, mode='packed', outcome='success')
+        response_text = self._strip_markdown(response.content[0].text.strip())
+        logger.debug("Claude Haiku packed response received", extra={'articles': len(pack), 'characters': len(response_text)})
+        self._record_usage(response.usage, f"Claude Haiku (packed x{len(pack)})")
+        
+        entries = json.loads(response_text)
+        if not isinstance(entries, list):
+            raise Exception("Packed response must be a JSON array")
+        
+        articles_by_url = {article.get('url', ''): article for article in pack}
+        results = {}
+        for entry in entries:
+            article = articles_by_url.get(entry.get('url') if isinstance(entry, dict) else None)
+            if article is None:
+                continue
+            try:
+                self._validate_analysis(entry)
+            except Exception as e:
+                logger.warning("Packed entry for %s rejected: %s", entry.get('url'), e)
+                continue
+            
+            simplified_data = {key: value for key, value in entry.items() if key != 'url'}
+            self._attach_metadata(simplified_data, article)
+            self._store_analysis(article, reading_level, simplified_data)
+            results[article.get('url', '')] = simplified_data
+        return results
     
     def clear_cache(self):
         """Clear the analysis cache"""
         self.analysis_cache.clear()
-        print("Analysis cache cleared") 
\ No newline at end of file
+        logger.info("Analysis cache cleared") 
\ No newline at end of file
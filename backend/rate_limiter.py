@@ -0,0 +1,70 @@
+# Thread-safe token-bucket rate limiting for upstream APIs
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate_per_minute, holding at most capacity.
+
+    Callers reserve tokens up front; the level may go negative, in which case
+    the caller is told how long to wait. Reserving under a lock queues
+    concurrent callers fairly instead of letting them all wake at once.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """Take amount tokens and return the seconds to wait before using them"""
+        self._refill(now)
+        # A single request larger than the bucket can never fit; cap it
+        self.level -= min(amount, self.capacity)
+        if self.level >= 0:
+            return 0.0
+        return -self.level / self.rate
+
+
+class RateLimiter:
+    """Limits requests per minute and tokens per minute across threads"""
+
+    def __init__(self, requests_per_minute=300, tokens_per_minute=100000):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.lock = threading.Lock()
+        self.total_wait = 0.0
+
+    def reserve(self, tokens=0):
+        """Reserve one request using about `tokens` tokens and return the seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            wait = self.requests.reserve(1, now)
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            self.total_wait += wait
+        return wait
+
+    def acquire(self, tokens=0):
+        """Block until one request using about `tokens` tokens may be sent.
+
+        Returns the number of seconds spent waiting.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens=0):
+        """acquire() for coroutines: waits without blocking the event loop"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
@@ -0,0 +1,108 @@
+# Pluggable encodings for values stored in the news and analysis caches
+
+import json
+import os
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Every encoded value starts with one tag byte naming its format, so entries
+# written with a different serializer (or before tags existed) still decode
+JSON_TAG = b'J'
+MSGPACK_TAG = b'M'
+ZSTD_TAG = b'Z'
+
+
+class Serializer:
+    """Encodes cache values as JSON or msgpack, optionally zstd-compressed.
+
+    JSON uses orjson when it is installed. Values smaller than
+    compress_min_bytes are stored uncompressed, where zstd saves little.
+    loads() accepts any tagged value and untagged JSON text, whatever this
+    serializer's own settings are.
+    """
+
+    def __init__(self, format='json', compression=None, level=3, compress_min_bytes=256):
+        if format == 'msgpack' and msgpack is None:
+            raise ValueError('msgpack is not installed')
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError('zstandard is not installed')
+        self.format = format
+        self.compression = compression
+        self.level = level
+        self.compress_min_bytes = compress_min_bytes
+        # zstd contexts are costly to create and not thread-safe, so each thread keeps its own
+        self.local = threading.local()
+
+    @property
+    def name(self):
+        return f"{self.format}+{self.compression}" if self.compression else self.format
+
+    def _encode(self, value):
+        if self.format == 'msgpack':
+            return MSGPACK_TAG + msgpack.packb(value, use_bin_type=True)
+        if orjson is not None:
+            return JSON_TAG + orjson.dumps(value)
+        return JSON_TAG + json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, value):
+        data = self._encode(value)
+        if self.compression == 'zstd' and len(data) >= self.compress_min_bytes:
+            compressor = getattr(self.local, 'compressor', None)
+            if compressor is None:
+                compressor = self.local.compressor = zstandard.ZstdCompressor(level=self.level)
+            return ZSTD_TAG + compressor.compress(data)
+        return data
+
+    def loads(self, data):
+        if isinstance(data, str):
+            return json.loads(data)
+        tag, payload = data[:1], data[1:]
+        if tag == ZSTD_TAG:
+            if zstandard is None:
+                raise ValueError('zstandard is not installed')
+            decompressor = getattr(self.local, 'decompressor', None)
+            if decompressor is None:
+                decompressor = self.local.decompressor = zstandard.ZstdDecompressor()
+            return self.loads(decompressor.decompress(payload))
+        if tag == MSGPACK_TAG:
+            if msgpack is None:
+                raise ValueError('msgpack is not installed')
+            return msgpack.unpackb(payload, raw=False)
+        if tag == JSON_TAG:
+            return orjson.loads(payload) if orjson is not None else json.loads(payload)
+        # Untagged JSON written before serializers existed
+        return json.loads(data)
+
+
+def create_serializer(format=None, compression=None):
+    """Build the serializer selected by CACHE_SERIALIZER (json/msgpack) and CACHE_COMPRESSION.
+
+    JSON is the default format: with orjson it is faster than msgpack for
+    article-shaped values at nearly the same size (see
+    benchmarks/serialization.py). CACHE_COMPRESSION 'auto' (the default)
+    uses zstd when it is installed.
+    """
+    format = (format or os.environ.get('CACHE_SERIALIZER', 'json')).lower()
+    compression = (compression or os.environ.get('CACHE_COMPRESSION', 'auto')).lower()
+    if compression == 'auto':
+        compression = 'zstd' if zstandard is not None else 'none'
+    return Serializer(
+        format=format,
+        compression=None if compression == 'none' else compression,
+        level=int(os.environ.get('CACHE_COMPRESSION_LEVEL', 3)),
+        compress_min_bytes=int(os.environ.get('CACHE_COMPRESSION_MIN_BYTES', 256))
+    )
@@ -0,0 +1,244 @@
+# Per-key deduplication of concurrent upstream work
+
+import asyncio
+import threading
+import time
+import uuid
+
+from tracing import get_logger
+
+logger = get_logger('single_flight')
+
+# Delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+# Result of a call whose leader finished without producing one; followers retry
+_MISSING = object()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = _MISSING  # Stays missing if the leader is interrupted (e.g. KeyboardInterrupt)
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one upstream call.
+
+    Within a process, the first caller for a key runs the work and every
+    concurrent caller waits for its result. When a Redis client is given, the
+    leader also takes a Redis lock so leaders in other workers wait instead:
+    they poll ``lookup`` (normally a read of the shared cache the leader
+    fills) until a result appears, the lock is released, or the lock times
+    out, and only then fall back to doing the work themselves.
+
+    do_async does the same for coroutines on an event loop, running the
+    blocking Redis calls and lookup in threads.
+    """
+
+    def __init__(self, redis_client=None, lock_timeout=30, poll_interval=0.05, prefix='singleflight:'):
+        self.redis_client = redis_client
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self.calls = {}
+        self.async_calls = {}  # key -> Future, for do_async on the server's event loop
+        self.lock = threading.Lock()
+        self.coalesced = 0
+        self._release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT) if redis_client is not None else None
+
+    def do(self, key, fn, lookup=None):
+        """Return fn()'s result, running it at most once at a time per key"""
+        while True:
+            with self.lock:
+                call = self.calls.get(key)
+                leader = call is None
+                if leader:
+                    call = _Call()
+                    self.calls[key] = call
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                break
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            if call.result is not _MISSING:
+                return call.result
+            # The leader finished without a result for this key; try again
+
+        try:
+            call.result = self._run_with_lock(key, fn, lookup)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+    def do_many(self, keys, fn):
+        """Run fn once for every key in keys that nobody else is running.
+
+        The keys this caller leads are claimed for the duration of fn like do()
+        claims one, in this process and, with Redis, across workers. fn gets
+        the list of led keys and returns {key: result}; that dict is returned.
+        Keys missing from it, including keys that were already in flight, are
+        for the caller to retry one at a time with do(), which waits for the
+        other leader. Concurrent do() callers for those keys retry the same way.
+        """
+        calls = {}
+        with self.lock:
+            for key in keys:
+                if key not in self.calls:
+                    calls[key] = self.calls[key] = _Call()
+
+        tokens = {}  # led key -> Redis lock token, or None when running without the lock
+        for key in calls:
+            if self.redis_client is None:
+                tokens[key] = None
+                continue
+            token = uuid.uuid4().hex
+            acquired = self._acquire(self.prefix + key, token)
+            if acquired is not False:
+                tokens[key] = token if acquired else None
+
+        results = {}
+        try:
+            if tokens:
+                results = {key: result for key, result in fn(list(tokens)).items() if key in tokens}
+            return results
+        finally:
+            for key, token in tokens.items():
+                if token is not None:
+                    self._release(self.prefix + key, token)
+            with self.lock:
+                for key in calls:
+                    del self.calls[key]
+            for key, call in calls.items():
+                call.result = results.get(key, _MISSING)
+                call.done.set()
+
+    async def do_async(self, key, fn, lookup=None):
+        """Return the result of awaiting fn(), running it at most once at a time per key.
+
+        Callers on the event loop share one in-flight call per key; lookup is
+        a blocking function, called in a thread. If the leader is cancelled,
+        its followers retry instead of waiting for a result that won't come.
+        """
+        while True:
+            pending = self.async_calls.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # This caller was cancelled, not the leader
+
+        pending = asyncio.get_running_loop().create_future()
+        self.async_calls[key] = pending
+        try:
+            result = await self._run_with_lock_async(key, fn, lookup)
+            pending.set_result(result)
+            return result
+        except Exception as e:
+            pending.set_exception(e)
+            pending.exception()  # Mark it retrieved in case no caller was waiting
+            raise
+        finally:
+            del self.async_calls[key]
+            if not pending.done():
+                pending.cancel()
+
+    def _acquire(self, lock_key, token):
+        """Take the Redis lock: True if taken, False if held elsewhere, None if Redis failed"""
+        try:
+            return bool(self.redis_client.set(lock_key, token, nx=True, px=int(self.lock_timeout * 1000)))
+        except Exception as e:
+            logger.warning("Single-flight lock unavailable, running without it: %s", e)
+            return None
+
+    def _release(self, lock_key, token):
+        try:
+            self._release_lock(keys=[lock_key], args=[token])
+        except Exception as e:
+            logger.warning("Failed to release single-flight lock %s: %s", lock_key, e)
+
+    def _run_with_lock(self, key, fn, lookup):
+        """Run fn while holding the cross-process lock for key"""
+        if self.redis_client is None:
+            return fn()
+
+        lock_key = self.prefix + key
+        token = uuid.uuid4().hex
+        acquired = self._acquire(lock_key, token)
+        if acquired is None:
+            return fn()
+        if acquired:
+            try:
+                return fn()
+            finally:
+                self._release(lock_key, token)
+
+        # Another worker is doing the work: wait for it to publish a result
+        self.coalesced += 1
+        deadline = time.time() + self.lock_timeout
+        while time.time() < deadline:
+            if lookup is not None:
+                result = lookup()
+                if result is not None:
+                    return result
+            if not self.redis_client.exists(lock_key):
+                break
+            time.sleep(self.poll_interval)
+
+        if lookup is not None:
+            result = lookup()
+            if result is not None:
+                return result
+        # The other worker failed or timed out; do the work ourselves
+        return fn()
+
+    async def _run_with_lock_async(self, key, fn, lookup):
+        """_run_with_lock for do_async, with the Redis calls and lookup in threads"""
+        if self.redis_client is None:
+            return await fn()
+
+        lock_key = self.prefix + key
+        token = uuid.uuid4().hex
+        acquired = await asyncio.to_thread(self._acquire, lock_key, token)
+        if acquired is None:
+            return await fn()
+        if acquired:
+            try:
+                return await fn()
+            finally:
+                await asyncio.to_thread(self._release, lock_key, token)
+
+        self.coalesced += 1
+        deadline = time.time() + self.lock_timeout
+        while time.time() < deadline:
+            if lookup is not None:
+                result = await asyncio.to_thread(lookup)
+                if result is not None:
+                    return result
+            if not await asyncio.to_thread(self.redis_client.exists, lock_key):
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        if lookup is not None:
+            result = await asyncio.to_thread(lookup)
+            if result is not None:
+                return result
+        return await fn()
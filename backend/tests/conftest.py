@@ -0,0 +1,6 @@
+# Unit tests run from backend/: python -m pytest tests
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -0,0 +1,37 @@
+from analysis_store import MemoryAnalysisStore
+from metrics import CACHE_REQUESTS
+from openai_service import OpenAIService
+from single_flight import SingleFlight
+
+ANALYSIS = {
+    'simplified_summary': 'Short',
+    'pros': ['a', 'b', 'c'],
+    'cons': ['d', 'e', 'f'],
+    'full_content': 'Long',
+    'reading_level': '5th_grade'
+}
+
+
+def article(i):
+    return {'url': f'https://example.com/{i}', 'title': f'Story {i}', 'description': 'A story', 'content': 'Body text'}
+
+
+def analysis_lookups():
+    return CACHE_REQUESTS.get(cache='analysis', result='hit'), CACHE_REQUESTS.get(cache='analysis', result='miss')
+
+
+def test_packed_articles_record_one_miss_each():
+    service = OpenAIService(analysis_cache=MemoryAnalysisStore(), single_flight=SingleFlight())
+    service.anthropic_key = 'test'
+    service._analyze_pack = lambda pack, reading_level: {
+        entry['url']: service._attach_metadata(dict(ANALYSIS), entry) for entry in pack
+    }
+    cached = article(0)
+    service._store_analysis(cached, '5th_grade', service._attach_metadata(dict(ANALYSIS), cached))
+    articles = [cached] + [article(i) for i in range(1, 4)]
+    hits, misses = analysis_lookups()
+
+    results = list(service.iter_simplify_articles(articles, ['5th_grade'] * len(articles), pack_size=3))
+
+    assert sorted(index for index, analysis, error in results if analysis is not None) == [0, 1, 2, 3]
+    assert analysis_lookups() == (hits + 1, misses + 3)
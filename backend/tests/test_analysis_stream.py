@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from analysis_store import MemoryAnalysisStore
+from openai_service import OpenAIService
+from single_flight import SingleFlight
+
+ARTICLE = {'url': 'https://example.com/story', 'title': 'Story', 'description': 'A story', 'content': 'Body text'}
+ANALYSIS = {
+    'simplified_summary': 'Short',
+    'pros': ['a', 'b', 'c'],
+    'cons': ['d', 'e', 'f'],
+    'full_content': 'Long',
+    'reading_level': '5th_grade'
+}
+
+
+@pytest.fixture
+def service():
+    service = OpenAIService(analysis_cache=MemoryAnalysisStore(), single_flight=SingleFlight())
+    service.claude_calls = 0
+
+    def fake_stream(article, reading_level):
+        service.claude_calls += 1
+        time.sleep(0.1)
+        yield 'simplified_summary', ANALYSIS['simplified_summary']
+        if article.get('fail'):
+            raise Exception('Claude failed')
+        analysis = service._attach_metadata(dict(ANALYSIS), article)
+        service._store_analysis(article, reading_level, analysis)
+        yield 'result', analysis
+
+    service._stream_analysis = fake_stream
+    return service
+
+
+def read_concurrently(service, article, count):
+    events = [None] * count
+
+    def read(i):
+        try:
+            events[i] = [event for event, data in service.stream_simplify_article(article)]
+        except Exception as e:
+            events[i] = str(e)
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(2)
+    return events
+
+
+def test_concurrent_streams_share_one_claude_call(service):
+    events = read_concurrently(service, ARTICLE, 5)
+
+    assert service.claude_calls == 1
+    assert sorted(events) == [['result']] * 4 + [['simplified_summary', 'result']]
+
+
+def test_stream_failure_reaches_every_reader(service):
+    events = read_concurrently(service, dict(ARTICLE, fail=True), 3)
+
+    assert service.claude_calls == 1
+    assert events == ['Claude failed'] * 3
+
+
+def test_cached_analysis_is_not_streamed_again(service):
+    read_concurrently(service, ARTICLE, 1)
+
+    assert list(service.stream_simplify_article(ARTICLE))[0][0] == 'result'
+    assert service.claude_calls == 1
@@ -0,0 +1,87 @@
+import pytest
+
+import cache
+from cache import MemoryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    memory = MemoryCache(max_entries=3, sweep_interval=0)
+    for key in ('a', 'b', 'c'):
+        memory.setex(key, 60, key)
+    memory.get('a')  # a is now the most recently used
+    memory.setex('d', 60, 'd')
+
+    assert memory.get('b') is None
+    assert memory.mget(['a', 'c', 'd']) == ['a', 'c', 'd']
+    assert memory.stats()['evictions'] == 1
+
+
+def test_byte_limit_evicts_until_the_new_entry_fits():
+    memory = MemoryCache(max_entries=100, max_bytes=30, sweep_interval=0)
+    memory.setex('a', 60, b'x' * 9)  # 10 bytes with the key
+    memory.setex('b', 60, b'x' * 9)
+    memory.setex('c', 60, b'x' * 9)
+    memory.setex('d', 60, b'x' * 19)  # 20 bytes: a and b have to go
+
+    assert memory.mget(['a', 'b', 'c', 'd']) == [None, None, b'x' * 9, b'x' * 19]
+    assert memory.total_bytes == 30
+
+
+def test_value_larger_than_the_budget_is_not_cached():
+    memory = MemoryCache(max_bytes=10, sweep_interval=0)
+    memory.setex('a', 60, b'x')
+
+    assert memory.setex('big', 60, b'x' * 20) is False
+    assert memory.get('big') is None
+    assert memory.get('a') == b'x'
+
+
+def test_overwrite_replaces_the_entrys_size():
+    memory = MemoryCache(max_bytes=100, sweep_interval=0)
+    memory.setex('a', 60, 'x' * 50)
+    memory.setex('a', 60, 'y' * 10)
+
+    assert memory.total_bytes == 11
+    assert len(memory) == 1
+
+
+def test_expired_entry_is_dropped_on_read(clock):
+    memory = MemoryCache(sweep_interval=0)
+    memory.setex('a', 10, 'value')
+    clock[0] += 9.9
+    assert memory.get('a') == 'value'
+    clock[0] += 0.1
+
+    assert memory.get('a') is None
+    assert memory.total_bytes == 0
+    assert memory.stats()['expirations'] == 1
+
+
+def test_sweep_removes_only_expired_entries(clock):
+    memory = MemoryCache(sweep_interval=0)
+    memory.setex('short', 5, 'x')
+    memory.setex('long', 60, 'y')
+    clock[0] += 10
+
+    assert memory.sweep() == 1
+    assert len(memory) == 1
+    assert memory.get('long') == 'y'
+
+
+def test_delete_and_flush_release_bytes():
+    memory = MemoryCache(sweep_interval=0)
+    memory.setex('a', 60, 'x')
+    memory.setex('b', 60, 'y')
+
+    assert memory.delete('a', 'missing') == 1
+    assert memory.total_bytes == 2
+    memory.flushdb()
+    assert memory.total_bytes == 0
+    assert len(memory) == 0
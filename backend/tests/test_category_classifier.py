@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+from category_classifier import CATEGORY_KEYWORDS, RELEVANCE_KEYWORDS, KeywordClassifier, article_text
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'fixtures')
+
+
+@pytest.fixture(scope='module')
+def articles():
+    loaded = []
+    for name in ('newsapi_everything.json', 'newsapi_everything_broader.json'):
+        with open(os.path.join(FIXTURES, name)) as f:
+            loaded.extend(json.load(f)['articles'])
+    return loaded
+
+
+def test_classify_batch_matches_classify_many(articles):
+    classifier = KeywordClassifier(CATEGORY_KEYWORDS, default='general')
+
+    assert classifier.classify_batch(articles) == classifier.classify_many(articles)
+
+
+@pytest.mark.parametrize('category', list(RELEVANCE_KEYWORDS) + ['unknown'])
+def test_relevant_batch_matches_score(articles, category):
+    classifier = KeywordClassifier(RELEVANCE_KEYWORDS)
+    expected = [
+        classifier.score(article_text(article, ('title', 'description')), category) >= 1
+        for article in articles
+    ]
+
+    assert classifier.relevant_batch(articles, category) == expected
+
+
+def test_score_batch_counts_each_keyword_once_per_text():
+    classifier = KeywordClassifier(CATEGORY_KEYWORDS, default='general')
+    texts = ['Stock market stock market rally', 'Nothing to see', 'NASA studies Mars and the moon']
+
+    assert classifier.score_batch(texts).tolist() == [classifier.score_list(text) for text in texts]
+
+
+def test_empty_batch():
+    classifier = KeywordClassifier(CATEGORY_KEYWORDS, default='general')
+
+    assert classifier.classify_batch([]) == []
+    assert classifier.relevant_batch([], 'business') == []
@@ -0,0 +1,77 @@
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def open_circuit(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()  # A success resets the count
+    open_circuit(breaker)
+
+    assert breaker.state == circuit_breaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['retry_in'] == 30
+    assert breaker.stats()['times_opened'] == 1
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    open_circuit(breaker)
+    clock[0] += 30
+
+    assert breaker.allow()
+    assert breaker.state == circuit_breaker.HALF_OPEN
+    # Other calls wait for the probe's outcome
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    open_circuit(breaker)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state == circuit_breaker.CLOSED
+    assert breaker.allow()
+    assert breaker.stats()['consecutive_failures'] == 0
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    open_circuit(breaker)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == circuit_breaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['times_opened'] == 2
+    clock[0] += 30
+    assert breaker.allow()
+
+
+def test_lost_probe_is_replaced_after_reset_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    open_circuit(breaker)
+    clock[0] += 30
+    assert breaker.allow()  # This probe never reports back
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
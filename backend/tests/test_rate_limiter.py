@@ -0,0 +1,44 @@
+import pytest
+
+from rate_limiter import RateLimiter, TokenBucket
+
+
+def test_bucket_starts_full_and_waits_once_empty():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    bucket.updated = 0.0
+
+    assert bucket.reserve(1, now=0.0) == 0.0
+    assert bucket.reserve(1, now=0.0) == 0.0
+    # Empty: the next token arrives after one second at 1 token per second
+    assert bucket.reserve(1, now=0.0) == pytest.approx(1.0)
+    # Reservations queue behind each other
+    assert bucket.reserve(1, now=0.0) == pytest.approx(2.0)
+
+
+def test_bucket_refills_over_time_up_to_capacity():
+    bucket = TokenBucket(rate_per_minute=60, capacity=5)
+    bucket.updated = 0.0
+    for _ in range(5):
+        bucket.reserve(1, now=0.0)
+
+    bucket.reserve(0, now=2.5)
+    assert bucket.level == pytest.approx(2.5)
+    bucket.reserve(0, now=100.0)
+    assert bucket.level == 5
+
+
+def test_reservation_larger_than_the_bucket_is_capped():
+    bucket = TokenBucket(rate_per_minute=600, capacity=100)
+    bucket.updated = 0.0
+
+    assert bucket.reserve(150, now=0.0) == 0.0
+    assert bucket.level == 0
+    assert bucket.reserve(50, now=0.0) == pytest.approx(5.0)
+
+
+def test_limiter_waits_for_the_scarcer_bucket():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+    assert limiter.reserve(tokens=600) == 0.0
+    # Requests are still available, but 300 tokens take 30 seconds to refill
+    assert limiter.reserve(tokens=300) == pytest.approx(30.0, abs=0.1)
+    assert limiter.total_wait == pytest.approx(30.0, abs=0.1)
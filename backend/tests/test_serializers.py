@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import serializers
+from serializers import Serializer
+
+ARTICLE = {
+    'title': 'Fed holds rates steady',
+    'url': 'https://example.com/fed',
+    'also_covered_by': [{'source': 'Wire', 'url': 'https://wire.example.com/fed'}],
+    'score': 0.75,
+    'content': 'Rates were left unchanged. ' * 40
+}
+
+
+def available_serializers():
+    options = [Serializer()]
+    if serializers.msgpack is not None:
+        options.append(Serializer(format='msgpack'))
+    if serializers.zstandard is not None:
+        options.append(Serializer(compression='zstd'))
+        if serializers.msgpack is not None:
+            options.append(Serializer(format='msgpack', compression='zstd'))
+    return options
+
+
+@pytest.mark.parametrize('serializer', available_serializers(), ids=lambda serializer: serializer.name)
+def test_round_trip(serializer):
+    assert serializer.loads(serializer.dumps(ARTICLE)) == ARTICLE
+
+
+@pytest.mark.parametrize('writer', available_serializers(), ids=lambda serializer: serializer.name)
+def test_any_serializer_reads_tagged_values(writer):
+    # Entries written under another CACHE_SERIALIZER setting still decode
+    assert Serializer().loads(writer.dumps(ARTICLE)) == ARTICLE
+
+
+def test_values_are_tagged_with_their_format():
+    assert Serializer().dumps({'a': 1})[:1] == serializers.JSON_TAG
+    if serializers.msgpack is not None:
+        assert Serializer(format='msgpack').dumps({'a': 1})[:1] == serializers.MSGPACK_TAG
+
+
+def test_small_values_are_not_compressed():
+    if serializers.zstandard is None:
+        pytest.skip('zstandard is not installed')
+    serializer = Serializer(compression='zstd', compress_min_bytes=256)
+
+    assert serializer.dumps({'a': 1})[:1] == serializers.JSON_TAG
+    assert serializer.dumps(ARTICLE)[:1] == serializers.ZSTD_TAG
+
+
+def test_legacy_untagged_json_decodes():
+    legacy = json.dumps(ARTICLE)
+
+    assert Serializer().loads(legacy) == ARTICLE
+    assert Serializer().loads(legacy.encode('utf-8')) == ARTICLE
@@ -0,0 +1,249 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+class Interrupted(BaseException):
+    """Stands in for KeyboardInterrupt or SystemExit in the leader"""
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def start_followers(flight, key, fn, count):
+    results = []
+    errors = []
+
+    def follow():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=follow) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: flight.coalesced == count)
+    return threads, results, errors
+
+
+def test_followers_share_the_leaders_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return 'feed'
+
+    leader = threading.Thread(target=flight.do, args=('news', fetch))
+    leader.start()
+    wait_for(lambda: calls)
+    threads, results, errors = start_followers(flight, 'news', fetch, 3)
+    release.set()
+    for thread in threads + [leader]:
+        thread.join(2)
+
+    assert results == ['feed'] * 3
+    assert not errors
+    assert len(calls) == 1
+    assert flight.calls == {}
+
+
+def test_leader_error_reaches_followers():
+    flight = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(2)
+        raise ValueError('upstream failed')
+
+    leader_errors = []
+
+    def lead():
+        with pytest.raises(ValueError):
+            flight.do('news', fetch)
+        leader_errors.append(True)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(2)
+    threads, results, errors = start_followers(flight, 'news', fetch, 2)
+    release.set()
+    for thread in threads + [leader]:
+        thread.join(2)
+
+    assert leader_errors == [True]
+    assert results == []
+    assert [str(e) for e in errors] == ['upstream failed'] * 2
+    # The next call runs again instead of reusing the failure
+    assert flight.do('news', lambda: 'recovered') == 'recovered'
+
+
+def test_followers_retry_when_the_leader_is_interrupted():
+    flight = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+
+    def interrupted():
+        started.set()
+        release.wait(2)
+        raise Interrupted()
+
+    def lead():
+        with pytest.raises(Interrupted):
+            flight.do('news', interrupted)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(2)
+    threads, results, errors = start_followers(flight, 'news', lambda: 'fetched by a follower', 2)
+    release.set()
+    for thread in threads + [leader]:
+        thread.join(2)
+
+    assert results == ['fetched by a follower'] * 2
+    assert not errors
+
+
+def test_do_many_leaves_keys_in_flight_to_the_caller():
+    flight = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(2)
+        return 'b from do'
+
+    leader = threading.Thread(target=flight.do, args=('b', fetch))
+    leader.start()
+    started.wait(2)
+    led = []
+
+    def pack(keys):
+        led.extend(keys)
+        return {key: key.upper() for key in keys if key != 'c'}
+
+    assert flight.do_many(['a', 'b', 'c'], pack) == {'a': 'A'}
+    assert led == ['a', 'c']
+    release.set()
+    leader.join(2)
+    # Keys the pack didn't answer are free to run again
+    assert flight.do('c', lambda: 'c alone') == 'c alone'
+
+
+def test_redis_lock_makes_other_workers_wait_for_the_result():
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')  # The release script runs as Lua
+    redis_client = fakeredis.FakeRedis()
+    store = {}
+    worker_a = SingleFlight(redis_client, poll_interval=0.01)
+    worker_b = SingleFlight(redis_client, poll_interval=0.01)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        store['news'] = 'feed'
+        return 'feed'
+
+    leader = threading.Thread(target=worker_a.do, args=('news', fetch), kwargs={'lookup': lambda: store.get('news')})
+    leader.start()
+    wait_for(lambda: calls)
+    assert worker_b.do('news', fetch, lookup=lambda: store.get('news')) == 'feed'
+    leader.join(2)
+
+    assert len(calls) == 1
+    assert redis_client.keys() == []
+
+
+def test_async_followers_share_the_leaders_result():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'feed'
+
+        results = await asyncio.gather(*[flight.do_async('news', fetch) for _ in range(4)])
+        return results, calls, flight
+
+    results, calls, flight = asyncio.run(scenario())
+    assert results == ['feed'] * 4
+    assert len(calls) == 1
+    assert flight.async_calls == {}
+
+
+def test_async_leader_error_reaches_followers():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            raise ValueError('upstream failed')
+
+        return await asyncio.gather(*[flight.do_async('news', fetch) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert [str(result) for result in results] == ['upstream failed'] * 3
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_async_followers_retry_when_the_leader_is_cancelled():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return f"fetch {len(calls)}"
+
+        leader = asyncio.create_task(flight.do_async('news', fetch))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(flight.do_async('news', fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.wait_for(asyncio.gather(*followers), 2)
+        return leader, results, calls, flight
+
+    leader, results, calls, flight = asyncio.run(scenario())
+    assert leader.cancelled()
+    # One follower took over as leader and the rest shared its result
+    assert results == ['fetch 2'] * 3
+    assert len(calls) == 2
+    assert flight.async_calls == {}
+
+
+def test_async_follower_cancellation_leaves_the_leader_running():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return 'feed'
+
+        leader = asyncio.create_task(flight.do_async('news', fetch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do_async('news', fetch))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader, follower
+
+    result, follower = asyncio.run(scenario())
+    assert result == 'feed'
+    assert follower.cancelled()
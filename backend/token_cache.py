@@ -0,0 +1,76 @@
+# Cache of verified Firebase ID tokens
+
+import hashlib
+import time
+
+from firebase_admin import auth, _token_gen
+
+from cache import MemoryCache
+from metrics import record_cache
+from tracing import get_logger
+
+logger = get_logger('token_cache')
+
+
+class TokenCache:
+    """Remembers decoded ID tokens until their exp claim.
+
+    Entries are keyed by a SHA-256 of the token, so raw tokens are never
+    held in memory, and bounded by max_entries (least recently used first).
+    Only successfully verified tokens are cached. With check_revoked, a
+    cached token is re-verified against Firebase (including the revocation
+    check) once it is older than revocation_interval seconds.
+    """
+
+    def __init__(self, verify, max_entries=10000, check_revoked=False, revocation_interval=300):
+        self.verify = verify
+        self.check_revoked = check_revoked
+        self.revocation_interval = revocation_interval
+        self.cache = MemoryCache(max_entries=max_entries, sweep_interval=60)
+
+    def _key(self, token):
+        return 'token:' + hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def verify_token(self, token):
+        """Return the decoded token, verifying it only on a cache miss; raises if invalid"""
+        key = self._key(token)
+        now = time.time()
+        entry = self.cache.get(key)
+        if entry is not None:
+            decoded, verified_at = entry
+            if not self.check_revoked or now - verified_at < self.revocation_interval:
+                record_cache('auth_token', True)
+                return decoded
+        record_cache('auth_token', False)
+
+        decoded = self.verify(token, check_revoked=self.check_revoked)
+        ttl = int(decoded.get('exp', 0) - now)
+        if ttl > 0:
+            self.cache.setex(key, ttl, (decoded, now))
+        return decoded
+
+    def clear(self):
+        self.cache.flushdb()
+
+
+def refresh_certificates():
+    """Refetch Google's ID token certificates into firebase_admin's HTTP cache.
+
+    firebase_admin caches the certificates per their Cache-Control max-age
+    and refetches them on the request path once they expire. Forcing a
+    fetch on a schedule keeps that cache warm. This reaches into
+    firebase_admin internals, so failures are logged and ignored.
+    """
+    try:
+        verifier = auth._get_client(None)._token_verifier
+        verifier.request(_token_gen.ID_TOKEN_CERT_URI, headers={'Cache-Control': 'no-cache'})
+    except Exception as e:
+        logger.warning("Failed to refresh ID token certificates: %s", e)
+
+
+def verify_test_token(token, check_revoked=False):
+    """Decode an unsigned 'test:<uid>' token, for load tests running without Firebase"""
+    if not token.startswith('test:') or len(token) <= len('test:'):
+        raise ValueError('Invalid test token')
+    now = int(time.time())
+    return {'uid': token[len('test:'):], 'iat': now, 'exp': now + 3600}
@@ -0,0 +1,128 @@
+# Per-request stage timing and structured logging
+
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+
+_current_trace = contextvars.ContextVar('trace', default=None)
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class Trace:
+    """Accumulated time per stage for one request"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}  # name -> seconds, in first-seen order
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def server_timing(self):
+        """Render the stages and total as a Server-Timing header value (milliseconds)"""
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={self.total() * 1000:.1f}")
+        return ', '.join(parts)
+
+
+def start_trace():
+    trace = Trace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def end_trace():
+    _current_trace.set(None)
+
+
+def record_stage(name, seconds):
+    """Add time to a stage of the current request; a no-op outside a traced request"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as a stage of the current request"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random fraction of records below WARNING; warnings and errors always pass"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """Format records as one JSON object per line, or as text with key=value fields"""
+
+    def __init__(self, as_json=False):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+        self.as_json = as_json
+
+    def format(self, record):
+        fields = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+        if self.as_json:
+            entry = {
+                'time': self.formatTime(record),
+                'level': record.levelname,
+                'logger': record.name,
+                'message': record.getMessage()
+            }
+            entry.update(fields)
+            if record.exc_info:
+                entry['exception'] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str)
+        text = super().format(record)
+        if fields:
+            text += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+def configure_logging(level=None, fmt=None, sample_rate=None):
+    """Set up the 'simply' loggers from LOG_LEVEL, LOG_FORMAT (text/json) and LOG_SAMPLE_RATE"""
+    level = level or os.environ.get('LOG_LEVEL', 'INFO')
+    fmt = fmt or os.environ.get('LOG_FORMAT', 'text')
+    if sample_rate is None:
+        sample_rate = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter(as_json=fmt.lower() == 'json'))
+    handler.addFilter(SamplingFilter(sample_rate))
+
+    logger = logging.getLogger('simply')
+    logger.handlers = [handler]
+    logger.setLevel(level.upper())
+    logger.propagate = False
+    return logger
+
+
+def get_logger(name):
+    return logging.getLogger(f"simply.{name}")
@@ -0,0 +1,55 @@
+// Streams an article analysis from /api/simplify/stream (Server-Sent Events)
+
+// Calls onField(name, value) as each field arrives and resolves with the final analysis
+export const streamAnalysis = async (article, onField) => {
+  const response = await fetch('/api/simplify/stream', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ article })
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error('Failed to generate analysis');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let eventName = 'message';
+      let data = '';
+      rawEvent.split('\n').forEach((line) => {
+        if (line.startsWith('event: ')) {
+          eventName = line.slice(7);
+        } else if (line.startsWith('data: ')) {
+          data += line.slice(6);
+        }
+      });
+
+      const payload = JSON.parse(data);
+      if (eventName === 'result') {
+        return payload;
+      }
+      if (eventName === 'error') {
+        throw new Error(payload.error || 'Failed to generate analysis');
+      }
+      onField(eventName, payload);
+    }
+  }
+
+  throw new Error('Analysis stream ended before a result was received');
+};
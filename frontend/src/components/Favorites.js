@@ -7,6 +7,8 @@ const Favorites = ({ user, viewMode }) => {
   const [favorites, setFavorites] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (user) {
@@ -17,13 +19,19 @@ const Favorites = ({ user, viewMode }) => {
     }
   }, [user]);
 
-  const fetchFavorites = async () => {
+  // Fetches the first page, or the page after cursor when loading more
+  const fetchFavorites = async (cursor = null) => {
     try {
-      setLoading(true);
+      if (cursor) {
+        setLoadingMore(true);
+      } else {
+        setLoading(true);
+      }
       setError(null);
 
       const token = await user.getIdToken();
-      const response = await fetch('/api/user/favorites', {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`/api/user/favorites${query}`, {
         headers: {
           'Authorization': `Bearer ${token}`
         }
@@ -36,7 +44,8 @@ const Favorites = ({ user, viewMode }) => {
           ...article,
           isFavorited: true
         }));
-        setFavorites(favoritesWithFlag);
+        setFavorites(prev => (cursor ? [...prev, ...favoritesWithFlag] : favoritesWithFlag));
+        setNextCursor(data.next_cursor || null);
       } else {
         throw new Error('Failed to fetch favorites');
       }
@@ -44,6 +53,7 @@ const Favorites = ({ user, viewMode }) => {
       setError(err.message);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -96,7 +106,7 @@ const Favorites = ({ user, viewMode }) => {
           <div className="text-red-600 text-lg font-medium mb-2">Error loading favorites</div>
           <div className="text-gray-600 mb-4">{error}</div>
           <button 
-            onClick={fetchFavorites}
+            onClick={() => fetchFavorites()}
             className="btn-primary"
           >
             Try Again
@@ -115,7 +125,7 @@ const Favorites = ({ user, viewMode }) => {
           <p className="text-gray-600">
             {favorites.length === 0 
               ? "You haven't saved any articles yet." 
-              : `${favorites.length} saved article${favorites.length === 1 ? '' : 's'}`
+              : `${favorites.length}${nextCursor ? '+' : ''} saved article${favorites.length === 1 && !nextCursor ? '' : 's'}`
             }
           </p>
         </div>
@@ -160,6 +170,22 @@ const Favorites = ({ user, viewMode }) => {
             </a>
           </div>
         )}
+
+        {/* Load More Button */}
+        {nextCursor && (
+          <div className="flex justify-center py-8">
+            {loadingMore ? (
+              <Loader2 className="w-8 h-8 animate-spin text-primary-600" />
+            ) : (
+              <button
+                onClick={() => fetchFavorites(nextCursor)}
+                className="btn-secondary"
+              >
+                Load More Favorites
+              </button>
+            )}
+          </div>
+        )}
       </div>
     </div>
   );
@@ -1,6 +1,7 @@
 // NewsRow component
 import React, { useState } from 'react';
 import { Heart, ExternalLink, Calendar, User, X, Clock } from 'lucide-react';
+import { streamAnalysis } from '../analysisStream';
 
 const NewsRow = ({ article, user, onFavorite, onRemoveFavorite }) => {
 
@@ -165,15 +166,11 @@ const NewsRow = ({ article, user, onFavorite, onRemoveFavorite }) => {
 
     setIsLoadingAnalysis(true);
     try {
-      const response = await fetch('/api/simplify', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ article })
+      // Show each field (summary first, then pros and cons) as soon as it streams in
+      const data = await streamAnalysis(article, (field, value) => {
+        setSimplified(prev => ({ ...(prev || {}), [field]: value }));
+        setIsLoadingAnalysis(false);
       });
-      if (!response.ok) {
-        throw new Error('Failed to generate analysis');
-      }
-      const data = await response.json();
       setSimplified(data);
       
       // Cache the analysis for future use
@@ -424,6 +421,25 @@ const NewsRow = ({ article, user, onFavorite, onRemoveFavorite }) => {
 
                 {/* Meta Information */}
                 <div className="border-t border-gray-200 pt-4">
+                  {/* Other outlets that ran the same story */}
+                  {article.also_covered_by && article.also_covered_by.length > 0 && (
+                    <p className="text-sm text-gray-500 mb-3">
+                      Also covered by{' '}
+                      {article.also_covered_by.map((coverage, index) => (
+                        <span key={coverage.url || coverage.source}>
+                          {index > 0 && ', '}
+                          <a
+                            href={coverage.url}
+                            target="_blank"
+                            rel="noopener noreferrer"
+                            className="text-blue-600 hover:text-blue-800"
+                          >
+                            {coverage.source}
+                          </a>
+                        </span>
+                      ))}
+                    </p>
+                  )}
                   <div className="flex items-center justify-between text-sm text-gray-500">
                     <div className="flex items-center space-x-6">
                       {getSource() && (